@@ -0,0 +1,351 @@
+"""
+🏴‍☠️ MAROONED - Legal Action Masks
+===================================
+A flat enumeration of every concrete action a sailor can take, and a boolean
+mask over it saying which of them MaroonedEnv would execute right now.
+
+The enumeration (ActionSpace) is fixed by the sailor names and the island's
+resource IDs, so it stays the same all episode (and across episodes with the
+same config). Each slot is an (ActionType, argument) pair:
+
+    WAIT, MOVE_* (4), CLIMB_UP / CLIMB_DOWN
+    GATHER_RESOURCE       per resource_id
+    DEPOSIT_ITEM          per ResourceType (the whole stack held)
+    TAKE_FROM_COMMON      per ResourceType (1 item)
+    DROP_ITEM             per ResourceType (1 item)
+    EAT_FOOD              per food type and poison tablet
+    BUILD_SHIP, CALL_SOS, CALL_VOTE, SHOW_BACKPACK, REFUSE_SHOW
+    VOTE / USE_ANTIDOTE / FRAME_SAILOR   per sailor
+    SABOTAGE_SHIP         per ShipComponent
+    GIVE_ITEM             per (sailor, ResourceType) (1 item)
+    OFFER_FOOD            per (sailor, food type or poison tablet)
+
+SEND_MESSAGE takes free text and is not part of the enumeration.
+
+compute_action_mask() mirrors the checks in the MaroonedEnv._handle_* methods:
+a slot is legal exactly when executing its decoded action would succeed.
+Three actions the env lets through unchecked are left out: giving or offering
+to yourself, depositing an empty stack, and eating a poison tablet you do not
+hold.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from config import (
+    ActionType, ResourceType,
+    BASE_CAMP_POSITION, SHIP_SITE_POSITION, VOTING_ALLOWED_PHASES,
+    ENERGY_COST_WALK, ENERGY_COST_CLIMB_UP, ENERGY_COST_CLIMB_DOWN,
+    ENERGY_COST_GATHER, ENERGY_COST_BUILD, ENERGY_SOS_THRESHOLD,
+    FOOD_ENERGY_VALUES, TRAITOR_ENERGY_MULTIPLIER, MIN_SAILORS_TO_BUILD,
+)
+from models import Action, Sailor
+from game_state import GameState
+from batched_env import RESOURCE_TYPES, RESOURCE_INDEX, SHIP_COMPONENT_ORDER
+
+
+# ============================================================================
+# 🔢 ENUMERATION
+# ============================================================================
+
+MOVES: Tuple[Tuple[ActionType, int, int], ...] = (
+    (ActionType.MOVE_NORTH, 0, -1),
+    (ActionType.MOVE_SOUTH, 0, 1),
+    (ActionType.MOVE_EAST, 1, 0),
+    (ActionType.MOVE_WEST, -1, 0),
+)
+
+# Items EAT_FOOD / OFFER_FOOD accept
+EDIBLE_TYPES: Tuple[ResourceType, ...] = (*FOOD_ENERGY_VALUES, ResourceType.POISON_TABLET)
+_EDIBLE_INDEX = np.array([RESOURCE_INDEX[rt] for rt in EDIBLE_TYPES], dtype=np.int64)
+
+# Action field holding the slot argument, per action type
+_ARGUMENT_FIELDS: Dict[ActionType, Tuple[str, ...]] = {
+    ActionType.GATHER_RESOURCE: ("target_resource_id",),
+    ActionType.DEPOSIT_ITEM: ("resource_type",),
+    ActionType.TAKE_FROM_COMMON: ("resource_type",),
+    ActionType.DROP_ITEM: ("resource_type",),
+    ActionType.EAT_FOOD: ("resource_type",),
+    ActionType.VOTE: ("vote_target",),
+    ActionType.USE_ANTIDOTE: ("target_sailor",),
+    ActionType.FRAME_SAILOR: ("target_sailor",),
+    ActionType.SABOTAGE_SHIP: ("ship_component",),
+    ActionType.GIVE_ITEM: ("target_sailor", "resource_type"),
+    ActionType.OFFER_FOOD: ("target_sailor", "resource_type"),
+}
+
+
+def _argument(action: Action) -> Any:
+    """Slot argument of an action (None for actions without one)"""
+    names = _ARGUMENT_FIELDS.get(action.action_type, ())
+    if len(names) == 1:
+        return getattr(action, names[0])
+    if names:
+        return tuple(getattr(action, name) for name in names)
+    return None
+
+
+class ActionSpace:
+    """
+    Flat action enumeration for one set of sailors and one island.
+
+    Usage:
+        space = env.flat_action_space
+        mask = env.legal_actions("Alice")         # bool (space.size,)
+        index = np.flatnonzero(mask)[k]
+        action = space.decode(index, env.state.sailors["Alice"])
+        space.index(action)                       # back to the slot (None if not enumerated)
+
+    Blocks of slots start at offsets[action_type]; per-argument slots follow
+    the order of sailor_ids, resource_ids, RESOURCE_TYPES, EDIBLE_TYPES and
+    SHIP_COMPONENT_ORDER.
+    """
+
+    def __init__(self, sailor_ids: Sequence[str], resource_ids: Sequence[str]):
+        self.sailor_ids: Tuple[str, ...] = tuple(sailor_ids)
+        self.resource_ids: Tuple[str, ...] = tuple(resource_ids)
+
+        slots: List[Tuple[ActionType, Any]] = []
+        self.offsets: Dict[ActionType, int] = {}
+
+        def block(action_type: ActionType, arguments) -> None:
+            self.offsets[action_type] = len(slots)
+            slots.extend((action_type, argument) for argument in arguments)
+
+        block(ActionType.WAIT, [None])
+        for move, _, _ in MOVES:
+            block(move, [None])
+        block(ActionType.CLIMB_UP, [None])
+        block(ActionType.CLIMB_DOWN, [None])
+        block(ActionType.GATHER_RESOURCE, self.resource_ids)
+        block(ActionType.DEPOSIT_ITEM, RESOURCE_TYPES)
+        block(ActionType.TAKE_FROM_COMMON, RESOURCE_TYPES)
+        block(ActionType.DROP_ITEM, RESOURCE_TYPES)
+        block(ActionType.EAT_FOOD, EDIBLE_TYPES)
+        block(ActionType.BUILD_SHIP, [None])
+        block(ActionType.CALL_SOS, [None])
+        block(ActionType.CALL_VOTE, [None])
+        block(ActionType.VOTE, self.sailor_ids)
+        block(ActionType.USE_ANTIDOTE, self.sailor_ids)
+        block(ActionType.FRAME_SAILOR, self.sailor_ids)
+        block(ActionType.SABOTAGE_SHIP, SHIP_COMPONENT_ORDER)
+        block(ActionType.SHOW_BACKPACK, [None])
+        block(ActionType.REFUSE_SHOW, [None])
+        block(ActionType.GIVE_ITEM, [(sid, rt) for sid in self.sailor_ids for rt in RESOURCE_TYPES])
+        block(ActionType.OFFER_FOOD, [(sid, rt) for sid in self.sailor_ids for rt in EDIBLE_TYPES])
+
+        self.slots: Tuple[Tuple[ActionType, Any], ...] = tuple(slots)
+        self._index: Dict[Tuple[ActionType, Any], int] = {slot: i for i, slot in enumerate(self.slots)}
+        self.sailor_index: Dict[str, int] = {sid: i for i, sid in enumerate(self.sailor_ids)}
+        self.resource_index: Dict[str, int] = {rid: i for i, rid in enumerate(self.resource_ids)}
+
+    @property
+    def size(self) -> int:
+        return len(self.slots)
+
+    def index(self, action: Action) -> Optional[int]:
+        """Slot of an action (quantities are not part of the slot), None if not enumerated"""
+        return self._index.get((action.action_type, _argument(action)))
+
+    def decode(self, index: int, sailor: Sailor) -> Action:
+        """Action for a slot, taken by sailor (deposits take the whole stack held)"""
+        action_type, argument = self.slots[index]
+        action = Action(sailor_id=sailor.sailor_id, action_type=action_type)
+        if action_type == ActionType.DEPOSIT_ITEM:
+            action.quantity = sum(item.quantity for item in sailor.backpack
+                                  if item.resource_type == argument)
+        for name, value in zip(_ARGUMENT_FIELDS.get(action_type, ()),
+                               argument if isinstance(argument, tuple) else (argument,)):
+            setattr(action, name, value)
+        return action
+
+    def command(self, index: int, sailor: Sailor, state: GameState) -> str:
+        """The slot's action as an ACTION: command that parse_llm_response() accepts"""
+        action = self.decode(index, sailor)
+        action_type = action.action_type
+        resource = action.resource_type.value if action.resource_type else None
+        if action_type in _COMMANDS:
+            return _COMMANDS[action_type]
+        if action_type == ActionType.GATHER_RESOURCE:
+            return f"GATHER {action.target_resource_id}"
+        if action_type == ActionType.DEPOSIT_ITEM:
+            return f"DEPOSIT {resource} {action.quantity}"
+        if action_type == ActionType.TAKE_FROM_COMMON:
+            return f"TAKE {resource} 1"
+        if action_type == ActionType.DROP_ITEM:
+            return f"DROP {resource} 1"
+        if action_type == ActionType.EAT_FOOD:
+            return f"EAT {resource}"
+        if action_type == ActionType.BUILD_SHIP:
+            component = state.next_buildable_component() or SHIP_COMPONENT_ORDER[0]
+            return f"BUILD {component.value}"
+        if action_type == ActionType.VOTE:
+            return f"VOTE {action.vote_target}"
+        if action_type == ActionType.USE_ANTIDOTE:
+            return f"USE_ANTIDOTE {action.target_sailor}"
+        if action_type == ActionType.FRAME_SAILOR:
+            return f"FRAME {action.target_sailor}"
+        if action_type == ActionType.SABOTAGE_SHIP:
+            return f"SABOTAGE {action.ship_component.value}"
+        if action_type == ActionType.GIVE_ITEM:
+            return f"GIVE {action.target_sailor} {resource} 1"
+        if action.resource_type == ResourceType.POISON_TABLET:
+            return f"POISON {action.target_sailor}"
+        return f"OFFER {action.target_sailor} {resource}"
+
+    def commands(self, mask: np.ndarray, sailor: Sailor, state: GameState) -> List[str]:
+        """Commands of every legal slot in a sailor's mask, in slot order"""
+        return [self.command(i, sailor, state) for i in np.flatnonzero(mask)]
+
+
+# Commands of slots without an argument
+_COMMANDS: Dict[ActionType, str] = {
+    ActionType.WAIT: "WAIT",
+    ActionType.MOVE_NORTH: "MOVE NORTH",
+    ActionType.MOVE_SOUTH: "MOVE SOUTH",
+    ActionType.MOVE_EAST: "MOVE EAST",
+    ActionType.MOVE_WEST: "MOVE WEST",
+    ActionType.CLIMB_UP: "MOVE UP",
+    ActionType.CLIMB_DOWN: "MOVE DOWN",
+    ActionType.CALL_SOS: "CALL_SOS",
+    ActionType.CALL_VOTE: "CALL_VOTE",
+    ActionType.SHOW_BACKPACK: "SHOW_BACKPACK",
+    ActionType.REFUSE_SHOW: "REFUSE_SHOW",
+}
+
+
+# ============================================================================
+# ✅ MASK
+# ============================================================================
+
+def _traitor_cost(cost: int) -> int:
+    """Movement cost for the traitor (same rounding as MaroonedEnv)"""
+    return max(1, int(cost * TRAITOR_ENERGY_MULTIPLIER))
+
+
+def _counts(items) -> np.ndarray:
+    """Item quantities per RESOURCE_TYPES"""
+    counts = np.zeros(len(RESOURCE_TYPES), dtype=np.int64)
+    for item in items:
+        counts[RESOURCE_INDEX[item.resource_type]] += item.quantity
+    return counts
+
+
+def compute_action_mask(state: GameState, space: ActionSpace,
+                        sailor_ids: Optional[Sequence[str]] = None) -> np.ndarray:
+    """
+    Legal-action mask for several sailors: bool array (sailors, space.size).
+
+    Defaults to space.sailor_ids. Dead sailors (and sailors not in the game)
+    get an all-False row.
+    """
+    sailor_ids = space.sailor_ids if sailor_ids is None else tuple(sailor_ids)
+    mask = np.zeros((len(sailor_ids), space.size), dtype=bool)
+    at = space.offsets
+    num_types = len(RESOURCE_TYPES)
+    world = state.world_map
+
+    # Shared by every sailor this step
+    base_camp = world.position(*BASE_CAMP_POSITION)
+    ship_site = world.position(*SHIP_SITE_POSITION)
+    common = _counts(state.common_inventory)
+    sailors = [state.sailors.get(sid) for sid in space.sailor_ids]
+    targets_alive = np.array([s is not None and s.alive for s in sailors], dtype=bool)
+    at_site = sum(1 for s in state.sailors.values() if s.alive and s.position == ship_site)
+    can_build = at_site >= MIN_SAILORS_TO_BUILD and state.next_buildable_component() is not None
+    vote_open = state.current_vote is not None
+    can_call_vote = (not vote_open
+                     and state.get_current_phase_info()["phase"] in VOTING_ALLOWED_PHASES)
+    damaged = np.array([
+        component in state.ship_progress.components
+        and state.ship_progress.components[component].progress_percentage != 0
+        for component in SHIP_COMPONENT_ORDER
+    ], dtype=bool)
+
+    for row, sailor_id in enumerate(sailor_ids):
+        sailor = state.sailors.get(sailor_id)
+        if sailor is None or not sailor.alive:
+            continue
+        legal = mask[row]
+        position, energy = sailor.position, sailor.energy
+        traitor = state.is_traitor(sailor_id)
+        held = _counts(sailor.backpack)
+        room = sailor.backpack_capacity - int(held.sum())
+        self_slot = space.sailor_index.get(sailor_id)
+
+        legal[at[ActionType.WAIT]] = True
+        legal[at[ActionType.SHOW_BACKPACK]] = True
+        legal[at[ActionType.REFUSE_SHOW]] = True
+
+        # Movement (a move that would use up the last energy fails)
+        walk = _traitor_cost(ENERGY_COST_WALK) if traitor else ENERGY_COST_WALK
+        if energy > walk:
+            for move, dx, dy in MOVES:
+                step = world.position(position.x + dx, position.y + dy, position.level)
+                legal[at[move]] = world.is_walkable(step)
+        for transition in world.get_transitions_at(position):
+            cost = ENERGY_COST_CLIMB_UP if transition.going_up else ENERGY_COST_CLIMB_DOWN
+            if traitor:
+                cost = _traitor_cost(cost)
+            if energy > cost:
+                legal[at[ActionType.CLIMB_UP if transition.going_up else ActionType.CLIMB_DOWN]] = True
+
+        # Gathering: unclaimed resources on this tile that fit in the backpack
+        if energy > ENERGY_COST_GATHER:
+            gather = at[ActionType.GATHER_RESOURCE]
+            for resource in world.get_resources_at(position):
+                slot = space.resource_index.get(resource.resource_id)
+                if slot is not None and resource.quantity <= room:
+                    legal[gather + slot] = True
+
+        # Inventory
+        has = held > 0
+        if position == base_camp:
+            legal[at[ActionType.DEPOSIT_ITEM]:at[ActionType.DEPOSIT_ITEM] + num_types] = has
+            if room >= 1:
+                legal[at[ActionType.TAKE_FROM_COMMON]:at[ActionType.TAKE_FROM_COMMON] + num_types] = common > 0
+        legal[at[ActionType.DROP_ITEM]:at[ActionType.DROP_ITEM] + num_types] = has
+        legal[at[ActionType.EAT_FOOD]:at[ActionType.EAT_FOOD] + len(EDIBLE_TYPES)] = has[_EDIBLE_INDEX]
+
+        # Ship
+        if position == ship_site:
+            legal[at[ActionType.BUILD_SHIP]] = can_build and energy >= ENERGY_COST_BUILD
+            if traitor:
+                sabotage = at[ActionType.SABOTAGE_SHIP]
+                legal[sabotage:sabotage + len(SHIP_COMPONENT_ORDER)] = damaged
+
+        # Communication and voting
+        legal[at[ActionType.CALL_SOS]] = energy <= ENERGY_SOS_THRESHOLD
+        legal[at[ActionType.CALL_VOTE]] = can_call_vote
+        if vote_open:
+            legal[at[ActionType.VOTE]:at[ActionType.VOTE] + len(sailors)] = targets_alive
+
+        # Actions on other sailors
+        near = np.array([s is not None and s.alive and position.is_adjacent(s.position)
+                         for s in sailors], dtype=bool)
+        if self_slot is not None:
+            near[self_slot] = False
+        if held[RESOURCE_INDEX[ResourceType.ANTIDOTE_HERB]]:
+            poisoned = np.array([s is not None and s.is_poisoned() for s in sailors], dtype=bool)
+            reach = near.copy()
+            if self_slot is not None:
+                reach[self_slot] = True
+            antidote = at[ActionType.USE_ANTIDOTE]
+            legal[antidote:antidote + len(sailors)] = reach & poisoned & targets_alive
+        if traitor and not sailor.frame_ability_used:
+            frame = targets_alive.copy()
+            if self_slot is not None:
+                frame[self_slot] = False
+            legal[at[ActionType.FRAME_SAILOR]:at[ActionType.FRAME_SAILOR] + len(sailors)] = frame
+
+        room_for_one = np.array([s is not None and s.has_space(1) for s in sailors], dtype=bool)
+        give = at[ActionType.GIVE_ITEM]
+        legal[give:give + len(sailors) * num_types] = (
+            (near & room_for_one)[:, None] & has[None, :]
+        ).ravel()
+        offer = at[ActionType.OFFER_FOOD]
+        legal[offer:offer + len(sailors) * len(EDIBLE_TYPES)] = (
+            near[:, None] & has[_EDIBLE_INDEX][None, :]
+        ).ravel()
+
+    return mask
@@ -0,0 +1,716 @@
+"""
+🏴‍☠️ MAROONED - Batched Struct-of-Arrays Environment
+=====================================================
+Runs N independent games in one process with all dynamic state held in
+NumPy arrays, so a single step() advances every game at once.
+
+The per-game rules mirror MaroonedEnv / GameState for the subset of actions
+that self-play rollouts use (movement, climbing, gathering, depositing,
+building, eating, waiting), including the daily energy and poison processing
+and the win checks.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from config import (
+    MapLevel, ResourceType, ShipComponent, PoisonState, ActionType, SailorRole,
+    MAP_SIZES, BASE_CAMP_POSITION, SHIP_SITE_POSITION, SHIP_COMPONENTS,
+    TURNS_PER_DAY, MAX_DAYS, MAX_ENERGY, BACKPACK_CAPACITY,
+    ENERGY_COST_WALK, ENERGY_COST_CLIMB_UP, ENERGY_COST_CLIMB_DOWN,
+    ENERGY_COST_GATHER, ENERGY_COST_BUILD, ENERGY_REGEN_WITH_FOOD,
+    ENERGY_LOSS_NO_FOOD, FOOD_ENERGY_VALUES, TRAITOR_ENERGY_MULTIPLIER,
+    MIN_SAILORS_TO_BUILD, MIN_SAILORS_TO_WIN,
+    POISON_SYMPTOM_ONSET, POISON_SEVERE_ONSET, POISON_DEATH_DAY,
+    REWARD_BASE_TURN_PENALTY, REWARD_COLONIST_GATHER_RESOURCE,
+    REWARD_COLONIST_DEPOSIT_RESOURCE, REWARD_COLONIST_BUILD_CONTRIBUTE,
+    REWARD_COLONIST_SHIP_PROGRESS, REWARD_COLONIST_SHIP_COMPLETE,
+    REWARD_COLONIST_TRAITOR_ELIMINATED, REWARD_COLONIST_DEATH,
+    REWARD_SHIP_MILESTONE_25, REWARD_SHIP_MILESTONE_50, REWARD_SHIP_MILESTONE_75,
+    REWARD_EFFICIENT_ENERGY_USE, REWARD_ENERGY_CRITICAL,
+    REWARD_TRAITOR_SHIP_INCOMPLETE, REWARD_TRAITOR_COLONY_COLLAPSE,
+)
+from game_state import GameState, create_initial_game_state
+
+
+# ============================================================================
+# 🔢 ARRAY ENCODINGS
+# ============================================================================
+
+# Level index used in position arrays (x, y, level_index)
+LEVELS: Tuple[MapLevel, ...] = (MapLevel.GROUND, MapLevel.MOUNTAIN, MapLevel.CAVE)
+LEVEL_INDEX: Dict[MapLevel, int] = {level: i for i, level in enumerate(LEVELS)}
+
+RESOURCE_TYPES: Tuple[ResourceType, ...] = tuple(ResourceType)
+RESOURCE_INDEX: Dict[ResourceType, int] = {rt: i for i, rt in enumerate(RESOURCE_TYPES)}
+
+SHIP_COMPONENT_ORDER: Tuple[ShipComponent, ...] = (
+    ShipComponent.HULL,
+    ShipComponent.MAST,
+    ShipComponent.SAIL,
+    ShipComponent.RUDDER,
+    ShipComponent.SUPPLIES,
+)
+
+POISON_STATES: Tuple[PoisonState, ...] = (
+    PoisonState.HEALTHY,
+    PoisonState.EARLY_SYMPTOMS,
+    PoisonState.SEVERE_SYMPTOMS,
+    PoisonState.DEAD,
+)
+POISON_STATE_INDEX: Dict[PoisonState, int] = {ps: i for i, ps in enumerate(POISON_STATES)}
+
+# Flat action codes accepted by BatchedMaroonedEnv.step()
+BATCH_ACTIONS: Tuple[ActionType, ...] = (
+    ActionType.WAIT,
+    ActionType.MOVE_NORTH,
+    ActionType.MOVE_SOUTH,
+    ActionType.MOVE_EAST,
+    ActionType.MOVE_WEST,
+    ActionType.CLIMB_UP,
+    ActionType.CLIMB_DOWN,
+    ActionType.GATHER_RESOURCE,  # Gathers the first ungathered resource on the sailor's tile
+    ActionType.DEPOSIT_ITEM,     # Deposits the whole backpack at base camp
+    ActionType.BUILD_SHIP,
+    ActionType.EAT_FOOD,         # Eats the first food item found in the backpack
+)
+BATCH_ACTION_INDEX: Dict[ActionType, int] = {at: i for i, at in enumerate(BATCH_ACTIONS)}
+
+# Winner codes
+WINNER_NONE = 0
+WINNER_SAILORS = 1
+WINNER_TRAITOR = 2
+
+_MOVE_DX = np.array([0, 0, 0, 1, -1, 0, 0, 0, 0, 0, 0], dtype=np.int16)
+_MOVE_DY = np.array([0, -1, 1, 0, 0, 0, 0, 0, 0, 0, 0], dtype=np.int16)
+_LEVEL_VALUES = np.array([level.value for level in LEVELS], dtype=np.int16)
+_LEVEL_SIZES = np.array([MAP_SIZES[level] for level in LEVELS], dtype=np.int16)  # (width, height)
+_MAX_WIDTH = int(_LEVEL_SIZES[:, 0].max())
+_MAX_HEIGHT = int(_LEVEL_SIZES[:, 1].max())
+
+_FOOD_INDICES = np.array([RESOURCE_INDEX[rt] for rt in FOOD_ENERGY_VALUES], dtype=np.int64)
+_FOOD_VALUES = np.array(list(FOOD_ENERGY_VALUES.values()), dtype=np.int32)
+
+_SHIP_REQUIREMENTS = np.zeros((len(SHIP_COMPONENT_ORDER), len(RESOURCE_TYPES)), dtype=np.int32)
+for _c, _component in enumerate(SHIP_COMPONENT_ORDER):
+    for _rt, _needed in SHIP_COMPONENTS[_component]["required_resources"].items():
+        _SHIP_REQUIREMENTS[_c, RESOURCE_INDEX[_rt]] = _needed
+_SHIP_PERCENTAGES = np.array(
+    [SHIP_COMPONENTS[c]["percentage"] for c in SHIP_COMPONENT_ORDER], dtype=np.int32
+)
+_SHIP_PREREQUISITES = np.array(
+    [SHIP_COMPONENT_ORDER.index(SHIP_COMPONENTS[c]["prerequisite"])
+     if SHIP_COMPONENTS[c]["prerequisite"] is not None else -1
+     for c in SHIP_COMPONENT_ORDER],
+    dtype=np.int64,
+)
+
+# Ship progress milestones (%) and their one-off colonist bonus
+_SHIP_MILESTONES = ((25, REWARD_SHIP_MILESTONE_25), (50, REWARD_SHIP_MILESTONE_50), (75, REWARD_SHIP_MILESTONE_75))
+
+
+def _traitor_cost(cost: int) -> int:
+    """Movement cost for the traitor (same rounding as MaroonedEnv)"""
+    return max(1, int(cost * TRAITOR_ENERGY_MULTIPLIER))
+
+
+class BatchedMaroonedEnv:
+    """
+    🏴‍☠️ MAROONED - N games advanced in lockstep
+
+    All dynamic state lives in arrays whose first axis is the game index:
+
+        positions         (N, S, 3)  x, y, level index (see LEVELS)
+        energy            (N, S)
+        alive             (N, S)
+        poisoned_on_day   (N, S)     -1 when not poisoned
+        poison_state      (N, S)     index into POISON_STATES
+        backpack          (N, S, R)  counts per RESOURCE_TYPES
+        resource_pos      (N, M, 3)
+        resource_gathered (N, M)
+        common_inventory  (N, R)
+        ship_progress     (N, C)     percentage per SHIP_COMPONENT_ORDER
+
+    step() takes an (N, S) integer array of BATCH_ACTIONS codes. Sailors act
+    in index order within a game (the order of sailor_names), exactly like the
+    dict order in MaroonedEnv.step(). Finished games are frozen until
+    reset_games() is called for them.
+
+    Rewards follow MaroonedEnv._calculate_reward for everything these actions
+    can cause: turn penalty, gather/deposit/build signals, ship progress and
+    milestones, ship completion, deaths, energy bands, colony collapse and the
+    game outcome. Terms that need actions outside BATCH_ACTIONS (votes,
+    sabotage, poisoning, communication) or the evidence log (traitor
+    suspicion penalty) are left out.
+    """
+
+    def __init__(
+        self,
+        num_games: int,
+        seeds: Optional[List[int]] = None,
+        sailor_names: Optional[List[str]] = None,
+    ):
+        """
+        Initialize the batched environment.
+
+        Args:
+            num_games: Number of independent games (N)
+            seeds: One seed per game (if None, games are seeded randomly)
+            sailor_names: Custom sailor names (default: Alice, Bob, Charlie, Diana, Eve)
+        """
+        if seeds is not None and len(seeds) != num_games:
+            raise ValueError(f"Expected {num_games} seeds, got {len(seeds)}")
+
+        self.num_games = num_games
+        self.seeds: List[Optional[int]] = list(seeds) if seeds is not None else [None] * num_games
+        self.sailor_names = sailor_names or ["Alice", "Bob", "Charlie", "Diana", "Eve"]
+        self.num_sailors = len(self.sailor_names)
+
+        self._allocated = False
+
+    # ========================================================================
+    # RESET
+    # ========================================================================
+
+    def reset(self, seeds: Optional[List[int]] = None) -> Dict[str, np.ndarray]:
+        """
+        Reset every game.
+
+        Args:
+            seeds: Optional new seeds (one per game)
+
+        Returns:
+            observations: Dict of state arrays (see observe())
+        """
+        if seeds is not None:
+            if len(seeds) != self.num_games:
+                raise ValueError(f"Expected {self.num_games} seeds, got {len(seeds)}")
+            self.seeds = list(seeds)
+
+        states = [create_initial_game_state(seed, self.sailor_names) for seed in self.seeds]
+        self._allocate(max(len(s.world_map.resources) for s in states),
+                       max(len(s.world_map.level_transitions) for s in states))
+        for game, state in enumerate(states):
+            self._load_game(game, state)
+
+        return self.observe()
+
+    def reset_games(self, mask: np.ndarray, seeds: Optional[List[int]] = None) -> Dict[str, np.ndarray]:
+        """
+        Reset only the games selected by a boolean mask (e.g. the finished ones).
+
+        Args:
+            mask: (N,) boolean array of games to reset
+            seeds: Optional seeds, one per selected game
+        """
+        games = np.flatnonzero(mask)
+        if seeds is not None and len(seeds) != len(games):
+            raise ValueError(f"Expected {len(games)} seeds, got {len(seeds)}")
+
+        for i, game in enumerate(games):
+            seed = seeds[i] if seeds is not None else None
+            self.seeds[game] = seed
+            state = create_initial_game_state(seed, self.sailor_names)
+            if (len(state.world_map.resources) > self.resource_type.shape[1]
+                    or len(state.world_map.level_transitions) > self.transitions.shape[1]):
+                raise ValueError("New game does not fit the allocated resource/transition arrays")
+            self._load_game(game, state)
+
+        return self.observe()
+
+    def _allocate(self, num_resources: int, num_transitions: int):
+        """Allocate all state arrays"""
+        n, s = self.num_games, self.num_sailors
+        r, c = len(RESOURCE_TYPES), len(SHIP_COMPONENT_ORDER)
+        m, t = num_resources, num_transitions
+
+        # Static per-game map data
+        self.walkable = np.zeros((n, len(LEVELS), _MAX_HEIGHT, _MAX_WIDTH), dtype=bool)
+        self.transitions = np.zeros((n, t, 2, 3), dtype=np.int16)
+        self.transition_valid = np.zeros((n, t), dtype=bool)
+        self.resource_pos = np.zeros((n, m, 3), dtype=np.int16)
+        self.resource_type = np.zeros((n, m), dtype=np.int8)
+        self.resource_quantity = np.zeros((n, m), dtype=np.int16)
+        self.is_traitor = np.zeros((n, s), dtype=bool)
+
+        # Resources still on the map: per-tile linked list of ungathered resources
+        self.resource_gathered = np.ones((n, m), dtype=bool)
+        self.tile_head = np.full((n, len(LEVELS), _MAX_HEIGHT, _MAX_WIDTH), -1, dtype=np.int32)
+        self.resource_next = np.full((n, m), -1, dtype=np.int32)
+
+        # Sailors
+        self.positions = np.zeros((n, s, 3), dtype=np.int16)
+        self.energy = np.zeros((n, s), dtype=np.int32)
+        self.alive = np.zeros((n, s), dtype=bool)
+        self.poisoned_on_day = np.full((n, s), -1, dtype=np.int32)
+        self.poison_state = np.zeros((n, s), dtype=np.int8)
+        self.ate_food_today = np.zeros((n, s), dtype=bool)
+        self.backpack = np.zeros((n, s, r), dtype=np.int32)
+
+        # Shared
+        self.common_inventory = np.zeros((n, r), dtype=np.int32)
+        self.ship_progress = np.zeros((n, c), dtype=np.int32)
+        self.ship_completed = np.zeros((n, c), dtype=bool)
+        self.ship_total = np.zeros(n, dtype=np.int32)
+
+        # Reward bookkeeping (MaroonedEnv.previous_ship_progress / ship_milestones_reached)
+        self.previous_ship_total = np.zeros(n, dtype=np.int32)
+        self.milestones_reached = np.zeros((n, len(_SHIP_MILESTONES)), dtype=bool)
+
+        # Clock and outcome
+        self.day = np.ones(n, dtype=np.int32)
+        self.turn = np.ones(n, dtype=np.int32)
+        self.done = np.zeros(n, dtype=bool)
+        self.winner = np.zeros(n, dtype=np.int8)
+
+        self._allocated = True
+
+    def _load_game(self, game: int, state: GameState):
+        """Copy one GameState into row `game` of every array"""
+        world = state.world_map
+
+        self.walkable[game] = False
+        for level, grid in world.terrain.items():
+            self.walkable[game, LEVEL_INDEX[level], :grid.height, :grid.width] = grid.walkable
+
+        self.transition_valid[game] = False
+        for t, (pos1, pos2) in enumerate(world.level_transitions):
+            self.transitions[game, t, 0] = (pos1.x, pos1.y, LEVEL_INDEX[pos1.level])
+            self.transitions[game, t, 1] = (pos2.x, pos2.y, LEVEL_INDEX[pos2.level])
+            self.transition_valid[game, t] = True
+
+        # Resources (in insertion order, so tile heads match resource id order)
+        self.resource_gathered[game] = True
+        self.resource_next[game] = -1
+        self.tile_head[game] = -1
+        tile_tail: Dict[Tuple[int, int, int], int] = {}
+        for m, resource in enumerate(world.resources.values()):
+            pos = resource.position
+            key = (LEVEL_INDEX[pos.level], pos.y, pos.x)
+            self.resource_pos[game, m] = (pos.x, pos.y, key[0])
+            self.resource_type[game, m] = RESOURCE_INDEX[resource.resource_type]
+            self.resource_quantity[game, m] = resource.quantity
+            self.resource_gathered[game, m] = resource.gathered
+            if resource.gathered:
+                continue
+            if key in tile_tail:
+                self.resource_next[game, tile_tail[key]] = m
+            else:
+                self.tile_head[(game,) + key] = m
+            tile_tail[key] = m
+
+        # Sailors
+        self.backpack[game] = 0
+        for s, name in enumerate(self.sailor_names):
+            sailor = state.sailors[name]
+            pos = sailor.position
+            self.positions[game, s] = (pos.x, pos.y, LEVEL_INDEX[pos.level])
+            self.energy[game, s] = sailor.energy
+            self.alive[game, s] = sailor.alive
+            self.is_traitor[game, s] = sailor.role == SailorRole.TRAITOR
+            self.poisoned_on_day[game, s] = -1 if sailor.poisoned_on_day is None else sailor.poisoned_on_day
+            self.poison_state[game, s] = POISON_STATE_INDEX[sailor.poison_state]
+            self.ate_food_today[game, s] = sailor.ate_food_today
+            for item in sailor.backpack:
+                self.backpack[game, s, RESOURCE_INDEX[item.resource_type]] += item.quantity
+
+        # Shared state
+        self.common_inventory[game] = 0
+        for item in state.common_inventory:
+            self.common_inventory[game, RESOURCE_INDEX[item.resource_type]] += item.quantity
+        for c, component in enumerate(SHIP_COMPONENT_ORDER):
+            progress = state.ship_progress.components.get(component)
+            self.ship_progress[game, c] = progress.progress_percentage if progress else 0
+            self.ship_completed[game, c] = progress.completed if progress else False
+        self.ship_total[game] = state.ship_progress.total_percentage
+        self.previous_ship_total[game] = state.ship_progress.total_percentage
+        self.milestones_reached[game] = False
+
+        self.day[game] = state.current_day
+        self.turn[game] = state.current_turn
+        self.done[game] = state.game_over
+        self.winner[game] = WINNER_NONE
+
+    # ========================================================================
+    # STEP
+    # ========================================================================
+
+    def step(self, actions: np.ndarray) -> Tuple[
+        Dict[str, np.ndarray],  # observations
+        np.ndarray,             # rewards (N, S)
+        np.ndarray,             # dones (N,)
+        Dict[str, np.ndarray],  # info
+    ]:
+        """
+        Advance every unfinished game by one turn.
+
+        Args:
+            actions: (N, S) integer array of BATCH_ACTIONS codes
+
+        Returns:
+            observations: Dict of state arrays (see observe())
+            rewards: Per-sailor rewards (see the class docstring for the terms)
+            dones: Whether each game is over
+            info: Per-sailor success flags and per-game winner codes
+        """
+        if not self._allocated:
+            raise RuntimeError("Environment not initialized. Call reset() first.")
+
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.num_games, self.num_sailors):
+            raise ValueError(
+                f"Expected actions of shape {(self.num_games, self.num_sailors)}, got {actions.shape}"
+            )
+        if actions.min() < 0 or actions.max() >= len(BATCH_ACTIONS):
+            raise ValueError("Action code out of range")
+
+        running = ~self.done
+        success = np.zeros((self.num_games, self.num_sailors), dtype=bool)
+        rewards = np.zeros((self.num_games, self.num_sailors), dtype=np.float32)
+
+        # Sailors act in turn order within each game, all games at once
+        for s in range(self.num_sailors):
+            act = actions[:, s]
+            acting = running & self.alive[:, s]
+
+            ok_move = self._step_movement(s, acting & (act >= 1) & (act <= 4), act)
+            ok_climb = self._step_climb(s, acting & ((act == 5) | (act == 6)), act == 5)
+            ok_gather = self._step_gather(s, acting & (act == 7))
+            ok_deposit = self._step_deposit(s, acting & (act == 8))
+            ok_build = self._step_build(s, acting & (act == 9))
+            ok_eat = self._step_eat(s, acting & (act == 10))
+
+            success[:, s] = (acting & (act == 0)) | ok_move | ok_climb | ok_gather | ok_deposit | ok_build | ok_eat
+
+            colonist = ~self.is_traitor[:, s]
+            rewards[:, s] += np.where(colonist & ok_gather, REWARD_COLONIST_GATHER_RESOURCE, 0.0)
+            rewards[:, s] += np.where(colonist & ok_deposit, REWARD_COLONIST_DEPOSIT_RESOURCE, 0.0)
+            rewards[:, s] += np.where(colonist & ok_build, REWARD_COLONIST_BUILD_CONTRIBUTE, 0.0)
+
+        self._advance_turn(running)
+        newly_done = self._check_win_conditions(running)
+
+        # Turn penalty for live games, then the state terms and outcome bonuses
+        rewards += np.where(running, REWARD_BASE_TURN_PENALTY, 0.0)[:, None]
+        self._add_state_rewards(rewards, running, newly_done)
+
+        info = {
+            "success": success,
+            "winner": self.winner.copy(),
+            "newly_done": newly_done,
+        }
+        return self.observe(), rewards, self.done.copy(), info
+
+    def _add_state_rewards(self, rewards: np.ndarray, running: np.ndarray, newly_done: np.ndarray):
+        """
+        Vectorized state terms of MaroonedEnv._calculate_reward, settled sailor
+        by sailor in the same order: the first sailor takes the ship progress
+        delta and the first colonist each milestone bonus.
+        """
+        sailors_won = newly_done & (self.winner == WINNER_SAILORS)
+        traitor_won = newly_done & (self.winner == WINNER_TRAITOR)
+        collapse = self.alive.sum(axis=1) < 3
+
+        for s in range(self.num_sailors):
+            colonist = running & ~self.is_traitor[:, s]
+            traitor = running & self.is_traitor[:, s]
+            delta = np.maximum(self.ship_total - self.previous_ship_total, 0).astype(np.float32)
+            energy = self.energy[:, s]
+
+            # Colonists: ship progress, milestones, completion, outcome, death, energy band
+            reward = np.where(colonist, REWARD_COLONIST_SHIP_PROGRESS * delta, 0.0)
+            for i, (milestone, bonus) in enumerate(_SHIP_MILESTONES):
+                reached = colonist & (self.ship_total >= milestone) & ~self.milestones_reached[:, i]
+                reward += np.where(reached, bonus, 0.0)
+                self.milestones_reached[:, i] |= reached
+            reward += np.where(colonist & (self.ship_total >= 100), REWARD_COLONIST_SHIP_COMPLETE, 0.0)
+            reward += np.where(colonist & sailors_won, REWARD_COLONIST_TRAITOR_ELIMINATED, 0.0)
+            reward += np.where(colonist & ~self.alive[:, s], REWARD_COLONIST_DEATH, 0.0)
+            reward += np.where(colonist & (energy > 50), REWARD_EFFICIENT_ENERGY_USE, 0.0)
+            reward += np.where(colonist & (energy < 20), REWARD_ENERGY_CRITICAL, 0.0)
+
+            # Traitor: outcome, colony collapse, half the progress bonus as a penalty
+            reward += np.where(traitor & traitor_won, REWARD_TRAITOR_SHIP_INCOMPLETE, 0.0)
+            reward += np.where(traitor & collapse, REWARD_TRAITOR_COLONY_COLLAPSE, 0.0)
+            reward -= np.where(traitor, REWARD_COLONIST_SHIP_PROGRESS * delta * 0.5, 0.0)
+
+            rewards[:, s] += reward
+            self.previous_ship_total = np.where(running, self.ship_total, self.previous_ship_total)
+
+    def _consume_energy(self, s: int, mask: np.ndarray, cost: np.ndarray) -> np.ndarray:
+        """Vectorized GameState.consume_energy - returns which sailors survived it"""
+        self.energy[:, s] -= np.where(mask, cost, 0)
+        exhausted = mask & (self.energy[:, s] <= 0)
+        self._kill(s, exhausted)
+        return mask & ~exhausted
+
+    def _kill(self, s: int, mask: np.ndarray):
+        """Vectorized GameState.kill_sailor"""
+        mask = mask & self.alive[:, s]
+        self.alive[:, s] &= ~mask
+        self.energy[:, s] = np.where(mask, 0, self.energy[:, s])
+
+    def _step_movement(self, s: int, mask: np.ndarray, act: np.ndarray) -> np.ndarray:
+        """Cardinal movement for sailor s in every game selected by mask"""
+        if not mask.any():
+            return mask
+
+        pos = self.positions[:, s]
+        level = pos[:, 2].astype(np.int64)
+        nx = pos[:, 0] + _MOVE_DX[act]
+        ny = pos[:, 1] + _MOVE_DY[act]
+
+        width, height = _LEVEL_SIZES[level, 0], _LEVEL_SIZES[level, 1]
+        in_bounds = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+        games = np.arange(self.num_games)
+        walkable = np.zeros(self.num_games, dtype=bool)
+        walkable[in_bounds] = self.walkable[games[in_bounds], level[in_bounds],
+                                            ny[in_bounds], nx[in_bounds]]
+
+        cost = np.where(self.is_traitor[:, s], _traitor_cost(ENERGY_COST_WALK), ENERGY_COST_WALK)
+        ok = self._consume_energy(s, mask & walkable, cost)
+
+        pos[:, 0] = np.where(ok, nx, pos[:, 0])
+        pos[:, 1] = np.where(ok, ny, pos[:, 1])
+        return ok
+
+    def _step_climb(self, s: int, mask: np.ndarray, want_up: np.ndarray) -> np.ndarray:
+        """Level transitions for sailor s in every game selected by mask"""
+        if not mask.any():
+            return mask
+
+        pos = self.positions[:, s]
+        dest = np.zeros((self.num_games, 3), dtype=np.int16)
+        found = np.zeros(self.num_games, dtype=bool)
+
+        # First matching transition wins, same as the handler's list scan
+        for t in range(self.transitions.shape[1]):
+            for end in (0, 1):
+                here = self.transitions[:, t, end]
+                there = self.transitions[:, t, 1 - end]
+                at_stairs = self.transition_valid[:, t] & np.all(here == pos, axis=1)
+                going_up = _LEVEL_VALUES[there[:, 2]] > _LEVEL_VALUES[pos[:, 2]]
+                match = mask & ~found & at_stairs & (going_up == want_up)
+                dest[match] = there[match]
+                found |= match
+
+        up_cost = np.where(self.is_traitor[:, s], _traitor_cost(ENERGY_COST_CLIMB_UP), ENERGY_COST_CLIMB_UP)
+        down_cost = np.where(self.is_traitor[:, s], _traitor_cost(ENERGY_COST_CLIMB_DOWN), ENERGY_COST_CLIMB_DOWN)
+        ok = self._consume_energy(s, found, np.where(want_up, up_cost, down_cost))
+
+        pos[ok] = dest[ok]
+        return ok
+
+    def _step_gather(self, s: int, mask: np.ndarray) -> np.ndarray:
+        """Gather the first ungathered resource on the sailor's tile"""
+        if not mask.any():
+            return mask
+
+        games = np.arange(self.num_games)
+        pos = self.positions[:, s].astype(np.int64)
+        head = self.tile_head[games, pos[:, 2], pos[:, 1], pos[:, 0]]
+        has_resource = head >= 0
+        safe_head = np.where(has_resource, head, 0)
+
+        quantity = self.resource_quantity[games, safe_head].astype(np.int32)
+        has_space = self.backpack[:, s].sum(axis=1) + quantity <= BACKPACK_CAPACITY
+        ok = self._consume_energy(s, mask & has_resource & has_space, ENERGY_COST_GATHER)
+
+        g = games[ok]
+        m = safe_head[ok]
+        self.backpack[g, s, self.resource_type[g, m].astype(np.int64)] += quantity[ok]
+        self.resource_gathered[g, m] = True
+        self.tile_head[g, pos[ok, 2], pos[ok, 1], pos[ok, 0]] = self.resource_next[g, m]
+        return ok
+
+    def _step_deposit(self, s: int, mask: np.ndarray) -> np.ndarray:
+        """Deposit the whole backpack into common inventory at base camp"""
+        if not mask.any():
+            return mask
+
+        ok = mask & self._at(s, BASE_CAMP_POSITION) & (self.backpack[:, s].sum(axis=1) > 0)
+        self.common_inventory[ok] += self.backpack[ok, s]
+        self.backpack[ok, s] = 0
+        return ok
+
+    def _step_build(self, s: int, mask: np.ndarray) -> np.ndarray:
+        """Build the next buildable component (same priority order as the handler)"""
+        if not mask.any():
+            return mask
+
+        at_site = self._at(s, SHIP_SITE_POSITION)
+        everyone_at_site = self._all_at(SHIP_SITE_POSITION) & self.alive
+        crew = everyone_at_site.sum(axis=1)
+        can_try = mask & at_site & (self.energy[:, s] >= ENERGY_COST_BUILD) & (crew >= MIN_SAILORS_TO_BUILD)
+
+        chosen = np.full(self.num_games, -1, dtype=np.int64)
+        for c in range(len(SHIP_COMPONENT_ORDER)):
+            prereq = _SHIP_PREREQUISITES[c]
+            prereq_met = self.ship_completed[:, prereq] if prereq >= 0 else np.ones(self.num_games, dtype=bool)
+            affordable = np.all(self.common_inventory >= _SHIP_REQUIREMENTS[c], axis=1)
+            pick = can_try & (chosen < 0) & ~self.ship_completed[:, c] & prereq_met & affordable
+            chosen[pick] = c
+
+        ok = chosen >= 0
+        g = np.flatnonzero(ok)
+        c = chosen[ok]
+        self.common_inventory[g] -= _SHIP_REQUIREMENTS[c]
+        self.energy[g] = np.where(everyone_at_site[g],
+                                  np.maximum(0, self.energy[g] - ENERGY_COST_BUILD),
+                                  self.energy[g])
+        self.ship_completed[g, c] = True
+        self.ship_progress[g, c] = _SHIP_PERCENTAGES[c]
+        self.ship_total[g] = self.ship_progress[g].sum(axis=1)
+        return ok
+
+    def _step_eat(self, s: int, mask: np.ndarray) -> np.ndarray:
+        """Eat the first available food item (FOOD_ENERGY_VALUES order)"""
+        if not mask.any():
+            return mask
+
+        food = self.backpack[:, s][:, _FOOD_INDICES] > 0
+        has_food = food.any(axis=1)
+        first = np.argmax(food, axis=1)
+        ok = mask & has_food
+
+        g = np.flatnonzero(ok)
+        self.backpack[g, s, _FOOD_INDICES[first[ok]]] -= 1
+        self.energy[g, s] = np.minimum(MAX_ENERGY, self.energy[g, s] + _FOOD_VALUES[first[ok]])
+        self.ate_food_today[g, s] = True
+        return ok
+
+    def _at(self, s: int, position: Tuple[int, int, MapLevel]) -> np.ndarray:
+        """(N,) mask of games where sailor s stands on position"""
+        x, y, level = position
+        pos = self.positions[:, s]
+        return (pos[:, 0] == x) & (pos[:, 1] == y) & (pos[:, 2] == LEVEL_INDEX[level])
+
+    def _all_at(self, position: Tuple[int, int, MapLevel]) -> np.ndarray:
+        """(N, S) mask of sailors standing on position"""
+        x, y, level = position
+        pos = self.positions
+        return (pos[..., 0] == x) & (pos[..., 1] == y) & (pos[..., 2] == LEVEL_INDEX[level])
+
+    # ========================================================================
+    # CLOCK, DAILY PROCESSING & WIN CHECKS
+    # ========================================================================
+
+    def _advance_turn(self, running: np.ndarray):
+        """Vectorized GameState.advance_turn plus MaroonedEnv's end-of-day poison update"""
+        self.turn[running] += 1
+        turn_in_day = ((self.turn - 1) % TURNS_PER_DAY) + 1
+
+        new_day = running & (turn_in_day == 1) & (self.turn > 1)
+        if new_day.any():
+            self.day[new_day] += 1
+            self._on_new_day(new_day)
+
+        end_of_day = running & (self.turn % TURNS_PER_DAY == 0)
+        if end_of_day.any():
+            self._update_poison_states(end_of_day)
+
+    def _on_new_day(self, games: np.ndarray):
+        """Vectorized GameState._on_new_day (same ordering of effects)"""
+        living = games[:, None] & self.alive
+
+        # Reset daily flags
+        self.ate_food_today &= ~living
+
+        # Process poison progression (GameState._update_poison_states)
+        poisoned = living & (self.poisoned_on_day >= 0)
+        days_since = self.day[:, None] - self.poisoned_on_day
+        self.poison_state[poisoned & (days_since == POISON_SYMPTOM_ONSET)] = POISON_STATE_INDEX[PoisonState.EARLY_SYMPTOMS]
+        self.poison_state[poisoned & (days_since == POISON_SEVERE_ONSET)] = POISON_STATE_INDEX[PoisonState.SEVERE_SYMPTOMS]
+        for s in range(self.num_sailors):
+            self._kill(s, poisoned[:, s] & (days_since[:, s] >= POISON_DEATH_DAY))
+
+        # Process energy changes (GameState._process_daily_energy)
+        living = games[:, None] & self.alive
+        regen = np.minimum(MAX_ENERGY, self.energy + ENERGY_REGEN_WITH_FOOD)
+        drained = self.energy + ENERGY_LOSS_NO_FOOD
+        self.energy = np.where(living, np.where(self.ate_food_today, regen, drained), self.energy)
+        for s in range(self.num_sailors):
+            self._kill(s, living[:, s] & (self.energy[:, s] <= 0))
+
+    def _update_poison_states(self, games: np.ndarray):
+        """Vectorized MaroonedEnv._update_poison_states"""
+        poisoned = games[:, None] & self.alive & (self.poisoned_on_day >= 0)
+        days_since = self.day[:, None] - self.poisoned_on_day
+
+        for s in range(self.num_sailors):
+            self._kill(s, poisoned[:, s] & (days_since[:, s] >= POISON_DEATH_DAY))
+        severe = poisoned & (days_since < POISON_DEATH_DAY) & (days_since >= POISON_SEVERE_ONSET)
+        early = poisoned & (days_since < POISON_SEVERE_ONSET) & (days_since >= POISON_SYMPTOM_ONSET)
+        self.poison_state[severe] = POISON_STATE_INDEX[PoisonState.SEVERE_SYMPTOMS]
+        self.poison_state[early] = POISON_STATE_INDEX[PoisonState.EARLY_SYMPTOMS]
+
+    def _check_win_conditions(self, running: np.ndarray) -> np.ndarray:
+        """Vectorized MaroonedEnv._check_win_conditions - returns games that just ended"""
+        traitor_dead = np.any(self.is_traitor & ~self.alive, axis=1)
+        ship_complete = self.ship_total >= 100
+        living_honest = (self.alive & ~self.is_traitor).sum(axis=1)
+        living = self.alive.sum(axis=1)
+        time_expired = (self.day >= MAX_DAYS) & ~ship_complete
+
+        sailors_win = running & (traitor_dead | ship_complete)
+        traitor_win = running & ~sailors_win & (
+            (living_honest == 0) | (living < MIN_SAILORS_TO_WIN) | time_expired
+        )
+
+        self.winner[sailors_win] = WINNER_SAILORS
+        self.winner[traitor_win] = WINNER_TRAITOR
+        newly_done = sailors_win | traitor_win
+        self.done |= newly_done
+        return newly_done
+
+    # ========================================================================
+    # OBSERVATION
+    # ========================================================================
+
+    def observe(self) -> Dict[str, np.ndarray]:
+        """
+        Current state of every game as a dict of arrays.
+
+        Returned arrays are views into the live state - copy them if they
+        need to outlive the next step().
+        """
+        return {
+            "positions": self.positions,
+            "energy": self.energy,
+            "alive": self.alive,
+            "poison_state": self.poison_state,
+            "poisoned_on_day": self.poisoned_on_day,
+            "backpack": self.backpack,
+            "resource_pos": self.resource_pos,
+            "resource_type": self.resource_type,
+            "resource_gathered": self.resource_gathered,
+            "common_inventory": self.common_inventory,
+            "ship_progress": self.ship_progress,
+            "ship_total": self.ship_total,
+            "day": self.day,
+            "turn": self.turn,
+            "done": self.done,
+        }
+
+
+# ============================================================================
+# 🧪 TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    num_games = 256
+    env = BatchedMaroonedEnv(num_games, seeds=list(range(num_games)))
+    env.reset()
+
+    rng = np.random.default_rng(0)
+    steps = 200
+    start = time.perf_counter()
+    for _ in range(steps):
+        actions = rng.integers(0, len(BATCH_ACTIONS), size=(num_games, env.num_sailors))
+        env.step(actions)
+    elapsed = time.perf_counter() - start
+
+    sailor_steps = num_games * env.num_sailors * steps
+    print(f"✅ {sailor_steps} sailor-steps in {elapsed:.2f}s ({sailor_steps / elapsed:,.0f}/s)")
@@ -25,6 +25,9 @@ MAP_SIZES: Dict[MapLevel, Tuple[int, int]] = {
     MapLevel.CAVE: (15, 15),       # Medium, dark environment
 }
 
+# Terrain type codes stored in WorldMap terrain arrays (index = uint8 code)
+TERRAIN_TYPES = ["beach", "forest", "mountain", "cave", "rock"]
+
 # Base camp and ship location (always on ground level)
 BASE_CAMP_POSITION = (15, 15, MapLevel.GROUND)  # Center of ground map
 SHIP_SITE_POSITION = (15, 15, MapLevel.GROUND)  # Same as base camp
@@ -34,6 +37,13 @@ SPATIAL_VIEW_RADIUS = 5         # Normal conditions
 SPATIAL_VIEW_RADIUS_FOG = 2     # During fog weather
 SPATIAL_VIEW_RADIUS_CAVE = 3    # Reduced in caves (dark)
 
+# Spatial index bucket size (tiles per cell side) for resource/poison lookups
+SPATIAL_INDEX_CELL_SIZE = 4
+
+# Navigation caches (see navigation.py)
+NAV_FIELD_CACHE_SIZE = 64       # Non-landmark distance fields kept per episode
+NAV_PATH_CACHE_SIZE = 1024      # Point-to-point paths kept per episode
+
 
 # ============================================================================
 # ⚡ ENERGY SYSTEM
@@ -288,6 +298,9 @@ PHASE_DISCUSSION_START = 86
 PHASE_DISCUSSION_END = 100
 PHASE_DISCUSSION_DURATION = 15
 
+# Phase names in daily order
+DAILY_PHASES = ["morning", "exploration", "evening_return", "discussion"]
+
 # Communication limits during exploration
 EXPLORATION_MESSAGE_FREQUENCY = 10  # Can send 1 message per 10 turns
 
@@ -493,6 +506,32 @@ class ActionType(Enum):
     
     # Passive
     WAIT = "wait"                       # Do nothing this turn
+    
+    # Macros (expanded by MaroonedEnv and run over several turns, see macros.py)
+    # A MOVE_* action with quantity > 1 is a multi-tile move macro
+    GOTO = "goto"                       # Walk/climb to target_position
+    GATHER_NEAREST = "gather_nearest"   # Walk to the nearest visible resource_type and gather it
+
+
+# Macro actions stop early when one of these interrupts fires (MaroonedEnv(macro_interrupts=...))
+MACRO_INTERRUPTS = (
+    "low_energy",      # Energy drops below MACRO_INTERRUPT_ENERGY
+    "sailor_visible",  # Another sailor comes into view
+    "phase_change",    # The day moves on to another phase
+    "sos",             # Someone called SOS
+)
+MACRO_INTERRUPT_ENERGY = ENERGY_SOS_THRESHOLD  # Same threshold as the plan interrupt
+MACRO_MAX_STEPS = 100           # Longest macro (moves + climbs + gather) accepted
+
+# Plans (MaroonedEnv.set_plan) are cut short when one of these fires (MaroonedEnv(plan_interrupts=...))
+PLAN_INTERRUPTS = (
+    "new_evidence",    # Evidence was added to the log
+    "vote_called",     # A vote was called
+    "low_energy",      # Energy drops below ENERGY_SOS_THRESHOLD
+    "poisoned",        # The sailor shows poison symptoms
+    "target_gone",     # A queued GATHER target was gathered by someone else
+)
+PLAN_MAX_STEPS = 10             # Most actions (single or macro) in one plan
 
 
 # ============================================================================
@@ -519,6 +558,52 @@ TRAITOR_OBSERVATION_EXTRAS = {
     "other_inventories": False,     # Cannot see private backpacks
 }
 
+# Token-budgeted prompts (see prompt_builder.py): when a prompt is over budget,
+# the lowest-priority sections are summarized/truncated first
+PROMPT_PRIORITY_REQUIRED = 100      # Sections at this priority are never cut
+PROMPT_SECTION_PRIORITIES = {
+    "header": PROMPT_PRIORITY_REQUIRED,
+    "phase_context": PROMPT_PRIORITY_REQUIRED,
+    "personal_status": PROMPT_PRIORITY_REQUIRED,
+    "instructions": PROMPT_PRIORITY_REQUIRED,
+    "spatial_view": 80,
+    "voting": 75,
+    "spatial_grid": 70,
+    "team_status": 65,
+    "messages": 60,
+    "alerts": 55,
+    "evidence": 50,
+    "ship_and_inventory": 45,
+    "weather": 40,
+    "shared_knowledge": 20,
+    "island_map": 10,               # Static map: the same every turn, and the largest section
+}
+PROMPT_TOKEN_CACHE_SIZE = 4096      # Section texts whose token counts are remembered
+PROMPT_PREFIX_CACHE_SIZE = 8        # Stable prompt prefixes kept as token IDs (per tokenizer)
+
+# Teacher client (see teacher_client.py): pooled keep-alive connections to the vLLM server
+TEACHER_MAX_CONCURRENCY = 16        # Validations in flight at once (and pooled connections)
+TEACHER_TIMEOUT = 30.0              # Seconds per teacher request
+
+# Teacher replicas (see teacher_client.TeacherEndpoint): hedging and circuit breaker
+TEACHER_HEDGE_MIN_SAMPLES = 20      # Latencies an endpoint needs before its p95 triggers hedges
+TEACHER_LATENCY_WINDOW = 512        # Recent latencies per endpoint behind p50/p95
+TEACHER_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)  # Histogram upper bounds (s)
+TEACHER_BREAKER_FAILURES = 3        # Consecutive failures before an endpoint is marked down
+TEACHER_BREAKER_COOLDOWN = 30.0     # Seconds down before one trial request is let through
+
+# Teacher verdict cache (see teacher_cache.py)
+TEACHER_CACHE_SIZE = 4096           # Verdicts kept in memory
+TEACHER_CACHE_DIR = "~/.cache/marooned/teacher_verdicts"  # Persistent tier (diskcache)
+TEACHER_CACHE_DISK_LIMIT = 2 ** 28  # Bytes on disk before diskcache evicts
+
+# Process rewards for outputs validated locally, without the teacher (see local_validator.py):
+# action type value -> reward for a canonical, legal REASONING + ACTION answer
+LOCAL_PROCESS_REWARDS = {
+    "default": 0.3,                 # Documented ceiling of the teacher's process reward
+    "wait": 0.0,                    # Legal but idle: no bonus
+}
+
 
 # ============================================================================
 # 💬 COMMUNICATION SYSTEM
@@ -0,0 +1,168 @@
+"""
+🏴‍☠️ MAROONED - Early Stop on Parsed Answers
+===========================================
+Stop generating as soon as an answer holds everything its parser reads.
+
+The student answers with two lines (REASONING, ACTION) and the teacher with
+four (VALID, ACTION, PENALTY, CRITIQUE), but both keep generating until
+end-of-sequence or max_tokens. A FieldWatcher reads the text as it streams
+in and, each time a line is finished, looks for the fields still missing with
+the parsers' own regexes (llm_interface.ACTION_FIELD, TEACHER_PENALTY_FIELD,
+...). A field counts once its value ends before the text received so far, so
+more text cannot change it: most fields end at their line break, CRITIQUE
+(read up to a blank line) at the blank line. Once every field is settled,
+generation can stop, and the answer parses as the full text would.
+
+Student generation (transformers):
+
+    criteria = ActionStoppingCriteria(tokenizer, prompt_length=input_ids.shape[1])
+    output = model.generate(input_ids, stopping_criteria=StoppingCriteriaList([criteria]))
+    answer = criteria.answer(0)  # Finished lines only, for parse_llm_response()
+
+Teacher: TeacherClient(stream=True) streams the reply and closes the
+connection once the verdict is complete.
+"""
+
+from typing import Any, Dict, List, Optional, Pattern
+
+from llm_interface import (
+    ACTION_FIELD, REASONING_FIELD, PLAN_STEP_FIELD,
+    TEACHER_VALID_FIELD, TEACHER_ACTION_FIELD, TEACHER_PENALTY_FIELD, TEACHER_CRITIQUE_FIELD,
+)
+
+
+# Fields an answer needs before generation may stop
+STUDENT_FIELDS: Dict[str, Pattern] = {
+    "reasoning": REASONING_FIELD,
+    "action": ACTION_FIELD,
+}
+TEACHER_FIELDS: Dict[str, Pattern] = {
+    "valid": TEACHER_VALID_FIELD,
+    "action": TEACHER_ACTION_FIELD,
+    "penalty": TEACHER_PENALTY_FIELD,
+    "critique": TEACHER_CRITIQUE_FIELD,
+}
+
+
+# ============================================================================
+# 👀 FIELD WATCHER
+# ============================================================================
+
+class FieldWatcher:
+    """Incremental parser over streamed text: done once every field is settled on finished lines"""
+
+    def __init__(self, fields: Dict[str, Pattern], plan_steps: int = 0):
+        """
+        Args:
+            fields: Field name -> parser regex (group 1 is the value)
+            plan_steps: If > 0, the answer may be a plan (ACTION 1: ..., ACTION 2: ...):
+                it is done after plan_steps steps or the first finished line
+                after the action that is not a step
+        """
+        self.fields = fields
+        self.plan_steps = plan_steps
+        self.reset()
+
+    def reset(self):
+        self.text = ""
+        self.captured: Dict[str, str] = {}
+        self._finished = 0  # Length of text up to its last line break
+        self._done = False
+
+    def feed(self, chunk: str) -> bool:
+        """Add streamed text; True once the answer is complete"""
+        self.text += chunk
+        if self._done or "\n" not in chunk:
+            return self._done
+
+        self._finished = self.text.rfind("\n") + 1
+        finished = self.text[:self._finished]
+        for name, pattern in self.fields.items():
+            if name not in self.captured:
+                match = pattern.search(finished)
+                # A value running to the end of the text could still grow (e.g. CRITIQUE before its blank line)
+                if match is not None and match.end(1) < len(finished):
+                    self.captured[name] = match.group(1).strip()
+        self._done = len(self.captured) == len(self.fields) and self._plan_done(finished)
+        return self._done
+
+    def update(self, text: str) -> bool:
+        """feed() from the whole text so far (e.g. a re-decoded token sequence)"""
+        if not text.startswith(self.text):
+            # Decoding changed earlier text (e.g. a multi-byte character completed)
+            self.reset()
+        return self.feed(text[len(self.text):])
+
+    def _plan_done(self, finished: str) -> bool:
+        if self.plan_steps <= 0:
+            return True
+        steps = PLAN_STEP_FIELD.findall(finished)
+        if len(steps) >= self.plan_steps:
+            return True
+        last_line = finished.rstrip("\n").rsplit("\n", 1)[-1]
+        return PLAN_STEP_FIELD.search(last_line) is None
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def answer(self) -> str:
+        """The finished lines once done (the whole text otherwise)"""
+        return (self.text[:self._finished] if self._done else self.text).strip()
+
+
+# ============================================================================
+# 🛑 STUDENT STOPPING CRITERIA
+# ============================================================================
+
+class ActionStoppingCriteria:
+    """
+    transformers stopping criteria that ends each sequence once its REASONING
+    and ACTION lines are finished.
+
+    Pass it (a new one per generate() call) in a StoppingCriteriaList to
+    model.generate(). Each call decodes
+    the generated tokens (after prompt_length) of the sequences not yet done;
+    the result holds one flag per sequence.
+    """
+
+    def __init__(self, tokenizer, prompt_length: int, plan_steps: int = 0,
+                 fields: Optional[Dict[str, Pattern]] = None):
+        """
+        Args:
+            tokenizer: Tokenizer with decode(ids, skip_special_tokens=True)
+            prompt_length: Prompt tokens at the start of every row of input_ids
+            plan_steps: PLAN_MAX_STEPS if PLAN_INSTRUCTIONS is in the prompt (0: single action)
+            fields: Fields to wait for (default STUDENT_FIELDS)
+        """
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.plan_steps = plan_steps
+        self.fields = fields if fields is not None else STUDENT_FIELDS
+        self.watchers: List[FieldWatcher] = []
+
+    def __call__(self, input_ids, scores=None, **kwargs) -> Any:
+        while len(self.watchers) < len(input_ids):
+            self.watchers.append(FieldWatcher(self.fields, self.plan_steps))
+
+        done = []
+        for row, watcher in enumerate(self.watchers[:len(input_ids)]):
+            if not watcher.done:
+                generated = input_ids[row][self.prompt_length:]
+                watcher.update(self.tokenizer.decode(generated, skip_special_tokens=True))
+            done.append(watcher.done)
+
+        # transformers wants a bool tensor with one flag per row
+        new_tensor = getattr(input_ids, "new_tensor", None)
+        return new_tensor(done).bool() if new_tensor is not None else done
+
+    def answer(self, row: int = 0) -> str:
+        """Generated answer of a row, without text past the stopping line"""
+        return self.watchers[row].answer
+
+    @property
+    def stopped(self) -> int:
+        """Rows stopped early so far"""
+        return sum(watcher.done for watcher in self.watchers)
+
@@ -5,16 +5,19 @@ Main environment class for the Marooned game.
 Compatible with OpenAI Gym / Gymnasium interface.
 """
 
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Iterator
+from collections import deque
+from collections.abc import Mapping
 import numpy as np
-from dataclasses import asdict
+from dataclasses import asdict, replace
 
 from config import (
     TOTAL_SAILORS, MAX_DAYS, TURNS_PER_DAY,
     SPATIAL_VIEW_RADIUS, ActionType, ResourceType,
     ENERGY_COST_WALK, ENERGY_COST_CLIMB_UP, ENERGY_COST_CLIMB_DOWN,
-    ENERGY_COST_GATHER, ENERGY_COST_BUILD, FOOD_ENERGY_VALUES,
-    SHIP_SITE_POSITION, BASE_CAMP_POSITION, VOTING_ALLOWED_PHASES, MapLevel,
+    ENERGY_COST_GATHER, ENERGY_COST_BUILD, FOOD_ENERGY_VALUES, MACRO_INTERRUPTS,
+    PLAN_INTERRUPTS, PLAN_MAX_STEPS,
+    SHIP_SITE_POSITION, BASE_CAMP_POSITION, VOTING_ALLOWED_PHASES, DAILY_PHASES, MapLevel,
     # Phase 4: Reward constants
     REWARD_BASE_TURN_PENALTY,
     REWARD_COLONIST_GATHER_RESOURCE,
@@ -46,9 +49,45 @@ from models import (
     Action, Observation, Position, SpatialView, 
     Message, MessageType, Evidence, EvidenceType,
     PoisonState, ShipComponent, VotingSession, DeathCause, Sailor,
+    PublicSnapshot, ReadOnlyDict, InventoryItem, ShipProgress, EvidenceLog, SharedKnowledge,
 )
 
 from game_state import GameState, create_initial_game_state
+from navigation import NavigationService
+from action_mask import ActionSpace, compute_action_mask
+from macros import (
+    MacroState, PlanState, is_macro, plan_macro, macro_interrupt, start_plan, plan_interrupt,
+)
+
+
+class LazyObservations(Mapping):
+    """
+    Observations for one step, built only when a sailor's entry is accessed.
+    
+    Valid until the env steps, resets or rolls back again; accessing an entry
+    that was not built before then raises RuntimeError instead of silently
+    observing a different state.
+    """
+    
+    def __init__(self, env: 'MaroonedEnv'):
+        self._env = env
+        self._generation = env._observation_generation
+        self._built: Dict[str, Observation] = {}
+    
+    def __getitem__(self, sailor_id: str) -> Observation:
+        if sailor_id not in self._built:
+            if sailor_id not in self._env.sailor_names:
+                raise KeyError(sailor_id)
+            if self._generation != self._env._observation_generation:
+                raise RuntimeError("Observation requested after the environment advanced")
+            self._built[sailor_id] = self._env._generate_observation(sailor_id)
+        return self._built[sailor_id]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._env.sailor_names)
+    
+    def __len__(self) -> int:
+        return len(self._env.sailor_names)
 
 
 class MaroonedEnv:
@@ -72,6 +111,10 @@ class MaroonedEnv:
         render_mode: Optional[str] = None,
         seed: Optional[int] = None,
         sailor_names: Optional[List[str]] = None,
+        fast_forward: bool = False,
+        lazy_observations: bool = False,
+        macro_interrupts: Optional[Tuple[str, ...]] = None,
+        plan_interrupts: Optional[Tuple[str, ...]] = None,
     ):
         """
         Initialize the Marooned environment.
@@ -80,8 +123,28 @@ class MaroonedEnv:
             render_mode: How to render the environment ("human", "rgb_array", "ansi")
             seed: Random seed for reproducibility (if None, will be random)
             sailor_names: Custom sailor names (default: Alice, Bob, Charlie, Diana, Eve)
+            fast_forward: If True, a step where every sailor in agents_to_act()
+                sends WAIT runs on to the next phase boundary (or event) instead
+                of a single turn
+            lazy_observations: If True, reset/step return LazyObservations that
+                only build a sailor's observation when it is accessed
+            macro_interrupts: Events that stop a running macro action early
+                (default config.MACRO_INTERRUPTS, () to only stop on failure)
+            plan_interrupts: Events that cut a plan (set_plan) short
+                (default config.PLAN_INTERRUPTS)
         """
         self.render_mode = render_mode
+        self.fast_forward = fast_forward
+        self.lazy_observations = lazy_observations
+        self.macro_interrupts = tuple(MACRO_INTERRUPTS if macro_interrupts is None else macro_interrupts)
+        unknown = set(self.macro_interrupts) - set(MACRO_INTERRUPTS)
+        if unknown:
+            raise ValueError(f"Unknown macro interrupts: {sorted(unknown)}")
+        self.plan_interrupts = tuple(PLAN_INTERRUPTS if plan_interrupts is None else plan_interrupts)
+        unknown = set(self.plan_interrupts) - set(PLAN_INTERRUPTS)
+        if unknown:
+            raise ValueError(f"Unknown plan interrupts: {sorted(unknown)}")
+        self._observation_generation = 0
         self.seed = seed  # Can be None for random behavior
         self.sailor_names = sailor_names or ["Alice", "Bob", "Charlie", "Diana", "Eve"]
         
@@ -97,6 +160,29 @@ class MaroonedEnv:
         self.ship_milestones_reached: set = set()  # Track 25%, 50%, 75% milestones
         self.action_rewards: Dict[str, Dict[str, float]] = {}  # Track rewards per action
         
+        # Running macro actions and plans (see macros.py): sailor_id -> state
+        self._macros: Dict[str, MacroState] = {}
+        self._plans: Dict[str, PlanState] = {}
+        
+        # Open checkpoints: token -> env-level state (reward tracking, macros, plans) saved alongside the journal mark
+        self._checkpoints: List[Tuple[
+            float, set, Dict[str, Dict[str, float]], Dict[str, MacroState], Dict[str, PlanState]
+        ]] = []
+        
+        # Distance fields / path cache for the current map (built on first use)
+        self._navigation: Optional[NavigationService] = None
+        
+        # Flat action enumeration (per episode) and this step's legal-action mask
+        self._action_space: Optional[ActionSpace] = None
+        self._action_mask: Optional[Tuple[int, np.ndarray]] = None
+        
+        # Public observation snapshot: per-episode static part, last step's snapshot,
+        # and frozen copies of the append-only logs (name -> (length, last entry, tuple))
+        self._episode_static: Optional[Dict[str, Any]] = None
+        self._snapshot: Optional[Tuple[int, PublicSnapshot]] = None
+        self._frozen_logs: Dict[str, Tuple[int, Any, Tuple[Any, ...]]] = {}
+        self._frozen_knowledge: Optional[SharedKnowledge] = None
+        
     # ========================================================================
     # CORE ENVIRONMENT INTERFACE
     # ========================================================================
@@ -122,15 +208,21 @@ class MaroonedEnv:
         self.previous_ship_progress = 0.0
         self.ship_milestones_reached = set()
         self.action_rewards = {sailor_id: {} for sailor_id in self.sailor_names}
+        self._macros = {}
+        self._plans = {}
+        self._checkpoints = []
+        self._navigation = None
+        self._action_space = None
+        self._action_mask = None
+        self._episode_static = None
+        self._snapshot = None
+        self._frozen_logs = {}
+        self._frozen_knowledge = None
         
         # Generate initial observations for all sailors
-        observations = {}
-        for sailor_id in self.sailor_names:
-            observations[sailor_id] = self._generate_observation(sailor_id)
-        
-        return observations
+        return self._generate_observations()
     
-    def step(self, actions: Dict[str, Action]) -> Tuple[
+    def step(self, actions: Dict[str, Action], idle_until: Optional[str] = None) -> Tuple[
         Dict[str, Observation],  # observations
         Dict[str, float],         # rewards
         Dict[str, bool],          # dones
@@ -140,46 +232,91 @@ class MaroonedEnv:
         """
         Execute one environment step with actions from all agents.
         
+        Sailors with a running macro action or plan (set_plan) can be left out
+        of `actions`: it takes its next step for them. Any action given
+        replaces it.
+        
         Args:
-            actions: Dict mapping sailor_id -> Action
+            actions: Dict mapping sailor_id -> Action (MOVE_* with quantity > 1,
+                GOTO and GATHER_NEAREST start a macro, see macros.py)
+            idle_until: Optional phase name ("morning", "exploration", ...). After
+                this turn's actions, keep idling until that phase starts (or an
+                event interrupts). Also enables fast-forward for this step.
+                Ignored while a macro is running.
             
         Returns:
             observations: New observations for each agent
-            rewards: Rewards for each agent
+            rewards: Rewards for each agent (summed over all turns elapsed)
             dones: Whether each agent's episode is done
             truncated: Whether episode was truncated
-            info: Additional info for each agent
+            info: Additional info for each agent (including "turns_elapsed", and
+                "macro" / "plan" with the status of the sailor's macro action or
+                plan if it has one, e.g. {"status": "interrupted", "reason": "new_evidence", ...})
         """
+        if idle_until is not None and idle_until not in DAILY_PHASES:
+            raise ValueError(f"Unknown phase for idle_until: {idle_until}")
+        
         # Phase 4: Reset action rewards for this step
         self.action_rewards = {sailor_id: {} for sailor_id in self.sailor_names}
         
-        # Process all actions
+        # Fast-forward needs a WAIT from every sailor with a decision this turn
+        deciders = self.agents_to_act()
+        
+        # Planned steps are checked against the state every sailor observed
+        if self._plans:
+            self.action_mask()
+        
+        # Process all actions (a new action replaces a running macro or plan)
         action_results = {}
         for sailor_id, action in actions.items():
-            result = self._execute_action(sailor_id, action)
+            replaced = self._macros.pop(sailor_id, None)
+            replaced_plan = self._plans.pop(sailor_id, None)
+            if is_macro(action):
+                result = self._start_macro(sailor_id, action)
+            else:
+                result = self._execute_action(sailor_id, action)
+                if replaced is not None:
+                    result["macro"] = replaced.report("replaced")
+            if replaced_plan is not None:
+                result["plan"] = replaced_plan.report("replaced")
             action_results[sailor_id] = result
         
-        # Advance turn
-        self.state.advance_turn()
-        
-        # Update poison states (at end of each day)
-        if self.state.current_turn % TURNS_PER_DAY == 0:
-            self._update_poison_states()
-        
-        # Check win conditions
-        win_result = self._check_win_conditions()
+        # Sailors left out of this step carry on with their plan or macro
+        for sailor_id in self.sailor_names:
+            if sailor_id in actions:
+                continue
+            if sailor_id in self._plans:
+                action_results[sailor_id] = self._continue_plan(sailor_id)
+            elif sailor_id in self._macros:
+                action_results[sailor_id] = self._continue_macro(sailor_id)
+        
+        # Advance turn (and check poison / win conditions)
+        clock_before = self._clock_marker()
+        win_result = self._advance_clock()
+        self._check_macro_interrupts(action_results)
+        self._check_plan_interrupts(action_results)
+        
+        # Fast-forward through idle turns (never past a running macro or plan)
+        turns_elapsed = 1
+        skipped_rewards = {sailor_id: 0.0 for sailor_id in self.sailor_names}
+        all_waiting = (
+            bool(actions) and all(sid in actions for sid in deciders)
+            and all(a.action_type == ActionType.WAIT for a in actions.values())
+        )
+        busy = self._macros or self._plans
+        if not busy and (idle_until is not None or (self.fast_forward and all_waiting)):
+            win_result, turns_elapsed = self._fast_forward(win_result, clock_before, idle_until, skipped_rewards)
         winner = win_result.get("winner") if win_result else None
         
         # Generate observations for all sailors
-        observations = {}
+        observations = self._generate_observations()
         rewards = {}
         dones = {}
         truncated = {}
         info = {}
         
         for sailor_id in self.sailor_names:
-            observations[sailor_id] = self._generate_observation(sailor_id)
-            rewards[sailor_id] = self._calculate_reward(sailor_id, winner)
+            rewards[sailor_id] = skipped_rewards[sailor_id] + self._calculate_reward(sailor_id, winner)
             dones[sailor_id] = self.state.game_over or sailor_id in self.state.dead_sailors
             truncated[sailor_id] = self.state.current_day > MAX_DAYS
             
@@ -188,11 +325,79 @@ class MaroonedEnv:
             action_result.update({
                 "alive": sailor_id in self.state.living_sailors,
                 "is_traitor": self.state.is_traitor(sailor_id),
+                "turns_elapsed": turns_elapsed,
             })
             info[sailor_id] = action_result
         
         return observations, rewards, dones, truncated, info
     
+    def _advance_clock(self) -> Optional[Dict]:
+        """Advance one turn with its end-of-turn effects, return win result (if any)"""
+        self.state.advance_turn()
+        
+        # Update poison states (at end of each day)
+        if self.state.current_turn % TURNS_PER_DAY == 0:
+            self._update_poison_states()
+        
+        # Check win conditions
+        return self._check_win_conditions()
+    
+    def _clock_marker(self) -> Tuple[str, int, int]:
+        """(phase, death count, evidence count) - what fast-forward watches for changes"""
+        return (
+            self.state.current_phase,
+            len(self.state.dead_sailors),
+            len(self.state.evidence_log.all_evidence),
+        )
+    
+    def _fast_forward(
+        self,
+        win_result: Optional[Dict],
+        clock_before: Tuple[str, int, int],
+        idle_until: Optional[str],
+        skipped_rewards: Dict[str, float],
+    ) -> Tuple[Optional[Dict], int]:
+        """
+        Keep advancing idle turns until the next phase boundary (or the start
+        of `idle_until`), a death, new evidence, or game over.
+        
+        Every skipped turn goes through the same advance_turn / poison / win
+        path as a WAIT step, and its reward is added to skipped_rewards, so
+        totals match stepping turn by turn.
+        
+        Args:
+            win_result: Win result of the turn already taken this step
+            clock_before: _clock_marker() from before that turn
+            idle_until: Phase to idle until (None = next phase boundary)
+            skipped_rewards: Per-sailor reward accumulator (updated in place)
+        
+        Returns:
+            (win_result, turns_elapsed)
+        """
+        turns_elapsed = 1
+        phase_before, deaths, evidence = clock_before
+        
+        while win_result is None and not self.state.game_over:
+            # Stop once the last turn crossed into the target phase
+            entered = self.state.current_phase if self.state.current_phase != phase_before else None
+            if entered is not None and (idle_until is None or entered == idle_until):
+                break
+            
+            # Stop on events the agents should react to
+            if self._clock_marker()[1:] != (deaths, evidence):
+                break
+            
+            # Settle the reward of the turn just completed, then idle one more
+            for sailor_id in self.sailor_names:
+                skipped_rewards[sailor_id] += self._calculate_reward(sailor_id, None)
+            self.action_rewards = {sailor_id: {} for sailor_id in self.sailor_names}
+            
+            phase_before = self.state.current_phase
+            win_result = self._advance_clock()
+            turns_elapsed += 1
+        
+        return win_result, turns_elapsed
+    
     def render(self) -> Optional[Any]:
         """
         Render the current state of the environment.
@@ -212,6 +417,270 @@ class MaroonedEnv:
         """Clean up environment resources."""
         pass
     
+    # ========================================================================
+    # CHECKPOINT / ROLLBACK
+    # ========================================================================
+    
+    def checkpoint(self) -> int:
+        """
+        Start journaling changes so the current state can be restored later.
+        
+        Typical use is scoring several candidate actions from one state:
+        
+            token = env.checkpoint()
+            for action in candidates:
+                env.step({sailor_id: action})
+                ...score...
+                env.rollback(token)
+            env.release(token)
+        
+        Returns:
+            token: Handle for rollback() / release(). Checkpoints nest.
+        """
+        if self.state is None:
+            raise RuntimeError("Environment not initialized. Call reset() first.")
+        
+        token = self.state.journal.mark()
+        self._checkpoints.append((
+            self.previous_ship_progress,
+            set(self.ship_milestones_reached),
+            self.action_rewards,
+            {sailor_id: macro.copy() for sailor_id, macro in self._macros.items()},
+            {sailor_id: plan.copy() for sailor_id, plan in self._plans.items()},
+        ))
+        return token
+    
+    def rollback(self, token: int):
+        """
+        Undo every change made since checkpoint(token).
+        
+        The checkpoint stays open, so it can be rolled back to again.
+        Checkpoints opened after it are discarded.
+        """
+        self.state.journal.rollback(token)
+        del self._checkpoints[token + 1:]
+        
+        previous_progress, milestones, action_rewards, macros, plans = self._checkpoints[token]
+        self.previous_ship_progress = previous_progress
+        self.ship_milestones_reached = set(milestones)
+        self.action_rewards = action_rewards
+        self._macros = {sailor_id: macro.copy() for sailor_id, macro in macros.items()}
+        self._plans = {sailor_id: plan.copy() for sailor_id, plan in plans.items()}
+        # A new generation: lazy handles, the public snapshot and the action
+        # mask of the discarded branch all go stale
+        self._observation_generation += 1
+    
+    def release(self, token: int):
+        """Close checkpoint(token) (and any opened after it), keeping the current state."""
+        self.state.journal.release(token)
+        del self._checkpoints[token:]
+    
+    # ========================================================================
+    # NAVIGATION
+    # ========================================================================
+    
+    @property
+    def navigation(self) -> NavigationService:
+        """
+        Shortest-path queries over the current island (one service per episode).
+        
+            env.navigation.distance_to_base(sailor.position)
+            env.navigation.next_step(sailor.position, target)
+        """
+        if self.state is None:
+            raise RuntimeError("Environment not initialized. Call reset() first.")
+        if self._navigation is None:
+            self._navigation = NavigationService(self.state.world_map)
+        return self._navigation
+    
+    # ========================================================================
+    # LEGAL ACTIONS
+    # ========================================================================
+    
+    @property
+    def flat_action_space(self) -> ActionSpace:
+        """Flat enumeration of every concrete action (see action_mask.py), one per episode"""
+        if self.state is None:
+            raise RuntimeError("Environment not initialized. Call reset() first.")
+        if self._action_space is None:
+            self._action_space = ActionSpace(self.sailor_names, list(self.state.world_map.resources))
+        return self._action_space
+    
+    def action_mask(self) -> np.ndarray:
+        """
+        Legal-action mask of every sailor, in sailor_names order.
+        
+        Returns:
+            mask: Read-only bool array (sailors, flat_action_space.size).
+                Computed once per step from the current state; dead sailors
+                get all-False rows.
+        """
+        space = self.flat_action_space
+        if self._action_mask is None or self._action_mask[0] != self._observation_generation:
+            mask = compute_action_mask(self.state, space)
+            mask.flags.writeable = False  # Shared by every caller this step
+            self._action_mask = (self._observation_generation, mask)
+        return self._action_mask[1]
+    
+    def legal_actions(self, sailor_id: str) -> np.ndarray:
+        """One sailor's row of action_mask()"""
+        return self.action_mask()[self.flat_action_space.sailor_index[sailor_id]]
+    
+    def is_legal(self, sailor_id: str, action: Action) -> bool:
+        """
+        True if the action's slot is legal for the sailor (SEND_MESSAGE always is).
+        A macro action is legal if it can be planned and its first step is legal.
+        """
+        if action.action_type == ActionType.SEND_MESSAGE or is_macro(action):
+            sailor = self.state.get_sailor(sailor_id)
+            if sailor is None or not sailor.alive:
+                return False
+            if action.action_type == ActionType.SEND_MESSAGE:
+                return True
+            macro, _ = plan_macro(self.state, self.navigation, sailor, action)
+            return macro is not None and self.is_legal(sailor_id, macro.steps[0])
+        index = self.flat_action_space.index(action)
+        return index is not None and bool(self.legal_actions(sailor_id)[index])
+    
+    def legal_commands(self, sailor_id: str) -> List[str]:
+        """Legal actions of a sailor as ACTION: commands (for prompts and the teacher)"""
+        return self.flat_action_space.commands(
+            self.legal_actions(sailor_id), self.state.sailors[sailor_id], self.state
+        )
+    
+    # ========================================================================
+    # MACRO ACTIONS
+    # ========================================================================
+    
+    def _start_macro(self, sailor_id: str, action: Action) -> Dict[str, Any]:
+        """Plan a macro action and run its first step"""
+        sailor = self.state.get_sailor(sailor_id)
+        if not sailor or not sailor.alive:
+            return {"success": False, "reason": "Sailor is dead"}
+        
+        macro, reason = plan_macro(self.state, self.navigation, sailor, action)
+        if macro is None:
+            return {"success": False, "reason": reason,
+                    "macro": MacroState(action, deque()).report("failed", reason)}
+        
+        self._macros[sailor_id] = macro
+        return self._continue_macro(sailor_id)
+    
+    def _continue_macro(self, sailor_id: str) -> Dict[str, Any]:
+        """Run the next step of a sailor's macro; drop the macro once it is done or a step fails"""
+        macro = self._macros[sailor_id]
+        result = self._execute_action(sailor_id, macro.steps.popleft())
+        macro.turns += 1
+        
+        if not result.get("success", False):
+            del self._macros[sailor_id]
+            result["macro"] = macro.report("failed", result.get("reason"))
+        elif not macro.steps:
+            del self._macros[sailor_id]
+            result["macro"] = macro.report("done")
+        else:
+            result["macro"] = macro.report("running")
+        return result
+    
+    def _check_macro_interrupts(self, action_results: Dict[str, Dict[str, Any]]):
+        """After a turn, stop the macros whose interrupts fired (reported in action_results)"""
+        for sailor_id in list(self._macros):
+            macro = self._macros[sailor_id]
+            reason = macro_interrupt(self.state, sailor_id, macro, self.macro_interrupts)
+            if reason is not None:
+                del self._macros[sailor_id]
+                action_results.setdefault(sailor_id, {})["macro"] = macro.report("interrupted", reason)
+    
+    def running_macro(self, sailor_id: str) -> Optional[Dict[str, Any]]:
+        """Status of the sailor's running macro action (None if it has none)"""
+        macro = self._macros.get(sailor_id)
+        return None if macro is None else macro.report("running")
+    
+    # ========================================================================
+    # PLANS
+    # ========================================================================
+    
+    def set_plan(self, sailor_id: str, actions: List[Action]) -> Dict[str, Any]:
+        """
+        Queue actions for a sailor to run on the following steps, one per step
+        (macros take as many steps as they need), without another decision.
+        
+        Each action is checked with is_legal() when its turn comes. The plan is
+        cut short when a step is illegal or fails, when the sailor is given an
+        action in step(), or when one of self.plan_interrupts fires; step()
+        reports why in info[sailor_id]["plan"].
+        
+        Args:
+            sailor_id: Sailor who commits to the plan (replaces any plan or macro it has)
+            actions: 1..PLAN_MAX_STEPS actions of that sailor (see llm_interface.parse_llm_plan)
+        
+        Returns:
+            The plan's status report
+        """
+        sailor = self.state.get_sailor(sailor_id)
+        if sailor is None or not sailor.alive:
+            raise ValueError(f"{sailor_id} cannot make plans")
+        if not 0 < len(actions) <= PLAN_MAX_STEPS:
+            raise ValueError(f"A plan has 1 to {PLAN_MAX_STEPS} actions, got {len(actions)}")
+        if any(action.sailor_id != sailor_id for action in actions):
+            raise ValueError(f"Every action of {sailor_id}'s plan must be {sailor_id}'s")
+        
+        self._macros.pop(sailor_id, None)
+        self._plans[sailor_id] = start_plan(self.state, sailor, actions)
+        return self._plans[sailor_id].report("running")
+    
+    def running_plan(self, sailor_id: str) -> Optional[Dict[str, Any]]:
+        """Status of the sailor's plan (None if it has none)"""
+        plan = self._plans.get(sailor_id)
+        return None if plan is None else plan.report("running")
+    
+    def _continue_plan(self, sailor_id: str) -> Dict[str, Any]:
+        """Run one turn of a sailor's plan: the running macro's next step, or the next queued action"""
+        plan = self._plans[sailor_id]
+        plan.turns += 1
+        
+        if sailor_id in self._macros:
+            result = self._continue_macro(sailor_id)
+        else:
+            action = plan.steps.popleft()
+            if not self.is_legal(sailor_id, action):
+                del self._plans[sailor_id]
+                return {"success": False, "reason": f"Planned {action.action_type.value} is not legal",
+                        "plan": plan.report("failed", "illegal_step")}
+            if is_macro(action):
+                result = self._start_macro(sailor_id, action)
+            else:
+                result = self._execute_action(sailor_id, action)
+        
+        if not result.get("success", False):
+            del self._plans[sailor_id]
+            result["plan"] = plan.report("failed", "step_failed")
+        elif not plan.steps and sailor_id not in self._macros:
+            del self._plans[sailor_id]
+            result["plan"] = plan.report("done")
+        else:
+            result["plan"] = plan.report("running")
+        return result
+    
+    def _check_plan_interrupts(self, action_results: Dict[str, Dict[str, Any]]):
+        """After a turn, cut the plans whose interrupts fired (an interrupted macro cuts its plan too)"""
+        for sailor_id in list(self._plans):
+            plan = self._plans[sailor_id]
+            result = action_results.setdefault(sailor_id, {})
+            reason = plan_interrupt(self.state, sailor_id, plan, self.plan_interrupts)
+            
+            macro_report = result.get("macro")
+            if reason is None and macro_report is not None and macro_report["status"] == "interrupted":
+                reason = macro_report["reason"]
+            if reason is None:
+                continue
+            
+            del self._plans[sailor_id]
+            macro = self._macros.pop(sailor_id, None)
+            if macro is not None:
+                result["macro"] = macro.report("interrupted", reason)
+            result["plan"] = plan.report("interrupted", reason)
+    
     # ========================================================================
     # REWARD SIGNAL TRACKING (PHASE 4)
     # ========================================================================
@@ -331,7 +800,7 @@ class MaroonedEnv:
         elif direction == ActionType.MOVE_WEST:
             dx = -1
         
-        new_pos = Position(current_pos.x + dx, current_pos.y + dy, current_pos.level)
+        new_pos = self.state.world_map.position(current_pos.x + dx, current_pos.y + dy, current_pos.level)
         
         # Check if walkable
         if not self.state.world_map.is_walkable(new_pos):
@@ -347,6 +816,7 @@ class MaroonedEnv:
             return {"success": False, "reason": "Not enough energy"}
         
         # Move sailor
+        self.state.touch(sailor)
         sailor.position = new_pos
         
         return {
@@ -361,12 +831,7 @@ class MaroonedEnv:
         current_pos = sailor.position
         
         # Find all available transitions from current position
-        available_transitions = []
-        for pos1, pos2 in self.state.world_map.level_transitions:
-            if pos1 == current_pos:
-                available_transitions.append((pos2, pos2.level.value > current_pos.level.value))
-            elif pos2 == current_pos:
-                available_transitions.append((pos1, pos1.level.value > current_pos.level.value))
+        available_transitions = self.state.world_map.get_transitions_at(current_pos)
         
         if not available_transitions:
             return {"success": False, "reason": "No stairs/entrance here"}
@@ -376,14 +841,14 @@ class MaroonedEnv:
         
         # Find matching transition
         new_pos = None
-        for dest_pos, is_upward in available_transitions:
-            if is_upward == want_to_go_up:
-                new_pos = dest_pos
+        for transition in available_transitions:
+            if transition.going_up == want_to_go_up:
+                new_pos = transition.destination
                 break
         
         if new_pos is None:
             direction_str = "up" if want_to_go_up else "down"
-            available_dir = "up" if available_transitions[0][1] else "down"
+            available_dir = "up" if available_transitions[0].going_up else "down"
             return {"success": False, "reason": f"These stairs go {available_dir}, not {direction_str}"}
         
         # Determine energy cost based on direction
@@ -398,6 +863,7 @@ class MaroonedEnv:
             return {"success": False, "reason": "Not enough energy"}
         
         # Update sailor's position to the new level
+        self.state.touch(sailor)
         sailor.position = new_pos
         
         return {
@@ -428,12 +894,17 @@ class MaroonedEnv:
             return {"success": False, "reason": "Not enough energy"}
         
         # Add to backpack
+        self.state.touch_backpack(sailor)
         sailor.add_to_backpack(resource.resource_type, resource.quantity)
-        resource.gathered = True
+        self.state.world_map.mark_gathered(resource, self.state.journal)
         resource.discovered_by = sailor_id
         
         # Update shared knowledge
-        self.state.shared_knowledge.report_resource(resource, sailor_id)
+        knowledge = self.state.shared_knowledge
+        if self.state.journal.recording:
+            self.state.journal.touch_key(knowledge.discovered_resources, resource.resource_id)
+            self.state.journal.touch_length(knowledge.resource_reports)
+        knowledge.report_resource(resource, sailor_id)
         
         # TIER 2 FIX: Check for witnesses if gathering poison
         if resource.resource_type == ResourceType.POISON_TABLET:
@@ -443,10 +914,12 @@ class MaroonedEnv:
                     continue
                 
                 # Check if other sailor can see this position
-                if other.position.distance_to(sailor.position) <= SPATIAL_VIEW_RADIUS:
+                if other.position.distance_sq_to(sailor.position) <= SPATIAL_VIEW_RADIUS ** 2:
                     witnesses.append(other_id)
             
             # Generate evidence for EACH witness
+            if witnesses:
+                self.state.touch_evidence()
             for witness_id in witnesses:
                 self.state.evidence_log.add_evidence(
                     day=self.state.current_day,
@@ -459,6 +932,7 @@ class MaroonedEnv:
                 )
         
         # Track statistics
+        self.state.touch(self.state.statistics, self.state.sailor_gathered_resources)
         if resource.resource_type == ResourceType.WOOD:
             self.state.statistics.total_wood_gathered += resource.quantity
         elif resource.resource_type == ResourceType.METAL:
@@ -467,6 +941,7 @@ class MaroonedEnv:
         # Phase 3: Track gathered resources for theft detection
         if sailor_id not in self.state.sailor_gathered_resources:
             self.state.sailor_gathered_resources[sailor_id] = {}
+        self.state.touch(self.state.sailor_gathered_resources[sailor_id])
         if resource.resource_type not in self.state.sailor_gathered_resources[sailor_id]:
             self.state.sailor_gathered_resources[sailor_id][resource.resource_type] = 0
         self.state.sailor_gathered_resources[sailor_id][resource.resource_type] += resource.quantity
@@ -495,6 +970,7 @@ class MaroonedEnv:
         
         # Phase 3: Check for resource theft (depositing less than gathered)
         if sailor_id in self.state.sailor_gathered_resources:
+            self.state.touch(self.state.sailor_gathered_resources[sailor_id])
             if resource_type in self.state.sailor_gathered_resources[sailor_id]:
                 total_gathered = self.state.sailor_gathered_resources[sailor_id][resource_type]
                 
@@ -509,6 +985,7 @@ class MaroonedEnv:
                     # Only flag if significant (>20% discrepancy)
                     if missing_amount / total_gathered > 0.2:
                         # Generate evidence using the add_evidence method
+                        self.state.touch_evidence()
                         self.state.evidence_log.add_evidence(
                             day=self.state.current_day,
                             turn=self.state.current_turn,
@@ -522,6 +999,7 @@ class MaroonedEnv:
                 self.state.sailor_gathered_resources[sailor_id][resource_type] = 0
         
         # Remove from backpack
+        self.state.touch_backpack(sailor)
         sailor.remove_from_backpack(resource_type, quantity)
         
         # Add to common inventory
@@ -564,42 +1042,7 @@ class MaroonedEnv:
             }
         
         # Find which component to build next
-        from models import ShipComponent
-        
-        # Priority order for building
-        component_order = [
-            ShipComponent.HULL,
-            ShipComponent.MAST,
-            ShipComponent.SAIL,
-            ShipComponent.RUDDER,
-            ShipComponent.SUPPLIES,
-        ]
-        
-        component_to_build = None
-        for component in component_order:
-            # Check if already completed
-            progress = self.state.ship_progress.components.get(component)
-            if progress and progress.completed:
-                continue
-            
-            # Check prerequisite
-            component_data = SHIP_COMPONENTS[component]
-            if not self.state.ship_progress.can_build_component(component):
-                continue  # Prerequisite not met
-            
-            # Check if we have required resources
-            required_resources = component_data.get("required_resources", {})
-            has_all_resources = True
-            
-            for resource_type, needed in required_resources.items():
-                have = self.state.get_common_inventory_count(resource_type)
-                if have < needed:
-                    has_all_resources = False
-                    break
-            
-            if has_all_resources:
-                component_to_build = component
-                break
+        component_to_build = self.state.next_buildable_component()
         
         if component_to_build is None:
             return {
@@ -617,10 +1060,12 @@ class MaroonedEnv:
         # Deduct energy from ALL sailors at ship site
         for s in self.state.sailors.values():
             if s.alive and s.position == ship_site:
+                self.state.touch(s)
                 s.energy = max(0, s.energy - ENERGY_COST_BUILD)
         
         # Update ship progress
         percentage = component_data.get("percentage", 0)
+        self.state.touch(self.state.ship_progress, self.state.ship_progress.components)
         
         if component_to_build not in self.state.ship_progress.components:
             from models import ShipComponentProgress
@@ -631,6 +1076,7 @@ class MaroonedEnv:
             )
         else:
             progress = self.state.ship_progress.components[component_to_build]
+            self.state.touch(progress)
             progress.progress_percentage = percentage
             progress.completed = True
         
@@ -667,6 +1113,7 @@ class MaroonedEnv:
             is_broadcast=(recipient is None),
         )
         
+        self.state.touch_messages()
         self.state.message_history.append(message)
         
         return {"success": True, "message_id": message.message_id}
@@ -702,6 +1149,7 @@ class MaroonedEnv:
         if food_type not in FOOD_ENERGY_VALUES:
             # Might be poison!
             if food_type == ResourceType.POISON_TABLET:
+                self.state.touch_backpack(sailor)
                 sailor.remove_from_backpack(food_type, 1)
                 # Will be poisoned (but don't know yet from whom - self-poisoning)
                 self.state.poison_sailor(sailor_id, sailor_id)
@@ -713,6 +1161,8 @@ class MaroonedEnv:
             return {"success": False, "reason": "Don't have that food"}
         
         # Consume food
+        self.state.touch(sailor, self.state.statistics)
+        self.state.touch_backpack(sailor)
         sailor.remove_from_backpack(food_type, 1)
         energy_gain = FOOD_ENERGY_VALUES[food_type]
         sailor.energy = min(MAX_ENERGY, sailor.energy + energy_gain)
@@ -748,6 +1198,8 @@ class MaroonedEnv:
             return {"success": False, "reason": "Recipient's backpack full"}
         
         # Transfer items
+        self.state.touch_backpack(giver)
+        self.state.touch_backpack(receiver)
         giver.remove_from_backpack(resource_type, quantity)
         receiver.add_to_backpack(resource_type, quantity)
         
@@ -784,6 +1236,7 @@ class MaroonedEnv:
             return {"success": False, "reason": "Target is not poisoned"}
         
         # Use antidote
+        self.state.touch_backpack(user)
         user.remove_from_backpack(ResourceType.ANTIDOTE_HERB, 1)
         self.state.cure_poison(target_id)
         
@@ -810,6 +1263,8 @@ class MaroonedEnv:
             return {"success": False, "reason": f"Don't have {item_type.value}"}
         
         # Remove from giver
+        self.state.touch_backpack(giver)
+        self.state.touch(receiver)
         giver.remove_from_backpack(item_type, 1)
         
         # If poison, mark the receiver
@@ -819,6 +1274,7 @@ class MaroonedEnv:
             receiver.poisoned_by = giver_id
             
             # Add to evidence log
+            self.state.touch_evidence()
             self.state.evidence_log.add_evidence(
                 day=self.state.current_day,
                 evidence_type=EvidenceType.SUSPICIOUS_DEATH,
@@ -863,6 +1319,8 @@ class MaroonedEnv:
             return {"success": False, "reason": "Component has no progress to damage"}
         
         # Sabotage: reduce progress by 20-40%
+        self.state.touch(self.state.rng, comp_progress, self.state.ship_progress)
+        self.state.touch_evidence()
         damage = self.state.rng.randint(20, 40)
         comp_progress.progress_percentage = max(0, comp_progress.progress_percentage - damage)
         
@@ -920,6 +1378,7 @@ class MaroonedEnv:
         
         # If traitor hid items, add subtle evidence
         if hidden_items and self.state.is_traitor(sailor_id):
+            self.state.touch_evidence()
             self.state.evidence_log.add_evidence(
                 day=self.state.current_day,
                 turn=self.state.current_turn,
@@ -938,6 +1397,7 @@ class MaroonedEnv:
     def _handle_refuse_show(self, sailor_id: str) -> Dict:
         """Refuse to show backpack - generates suspicion."""
         # Auto-generate evidence
+        self.state.touch_evidence()
         self.state.evidence_log.add_evidence(
             day=self.state.current_day,
             turn=self.state.current_turn,
@@ -981,6 +1441,8 @@ class MaroonedEnv:
             (EvidenceType.LOCATION_MISMATCH, "was seen far from where they claimed to be", 55),
         ]
         
+        self.state.touch(self.state.rng, traitor)
+        self.state.touch_evidence()
         evidence_type, description, strength = self.state.rng.choice(evidence_types)
         
         self.state.evidence_log.add_evidence(
@@ -1029,6 +1491,8 @@ class MaroonedEnv:
             return {"success": False, "reason": "Backpack full"}
         
         # Transfer from common to personal
+        self.state.touch_common_inventory()
+        self.state.touch_backpack(sailor)
         remaining_to_take = quantity
         for item in self.state.common_inventory[:]:  # Use slice to allow removal during iteration
             if item.resource_type == resource_type and remaining_to_take > 0:
@@ -1058,6 +1522,7 @@ class MaroonedEnv:
             return {"success": False, "reason": "Don't have that many items"}
         
         # Remove from backpack
+        self.state.touch_backpack(sailor)
         sailor.remove_from_backpack(resource_type, quantity)
         
         return {
@@ -1080,6 +1545,7 @@ class MaroonedEnv:
             return {"success": False, "reason": "Vote already in progress"}
         
         # Create new voting session
+        self.state.touch(self.state)
         self.state.current_vote = VotingSession(
             initiated_by=caller_id,
             day=self.state.current_day,
@@ -1110,6 +1576,7 @@ class MaroonedEnv:
             return {"success": False, "reason": "Cannot vote for dead sailor"}
         
         # Cast vote
+        self.state.touch(self.state.current_vote.votes)
         self.state.current_vote.votes[voter_id] = accused_id
         
         # Check if all living sailors have voted
@@ -1136,6 +1603,10 @@ class MaroonedEnv:
         for voted_for in self.state.current_vote.votes.values():
             vote_counts[voted_for] = vote_counts.get(voted_for, 0) + 1
         
+        self.state.touch(self.state, self.state.current_vote)
+        if self.state.journal.recording:
+            self.state.journal.touch_length(self.state.voting_history)
+        
         # Find sailor with most votes
         if not vote_counts:
             self.state.current_vote = None
@@ -1202,6 +1673,8 @@ class MaroonedEnv:
     
     def _check_win_conditions(self) -> Optional[Dict]:
         """Check if game has reached a win/loss condition."""
+        self.state.touch(self.state)
+        
         # Colonists win if traitor eliminated
         if self.state.traitor_id and not self.state.get_sailor(self.state.traitor_id).alive:
             self.state.game_over = True
@@ -1267,6 +1740,7 @@ class MaroonedEnv:
                 continue
             
             days_since_poison = self.state.current_day - sailor.poisoned_on_day
+            self.state.touch(sailor)
             
             if days_since_poison >= POISON_DEATH_DAY:
                 # Death from poison
@@ -1278,6 +1752,7 @@ class MaroonedEnv:
                 
                 # Add evidence
                 if sailor.poisoned_by:
+                    self.state.touch_evidence()
                     self.state.evidence_log.add_evidence(
                         day=self.state.current_day,
                         evidence_type=EvidenceType.SUSPICIOUS_DEATH,
@@ -1294,6 +1769,42 @@ class MaroonedEnv:
     # OBSERVATION GENERATION
     # ========================================================================
     
+    def _generate_observations(self) -> Dict[str, Observation]:
+        """Observations for every sailor (lazy handles if lazy_observations is set)."""
+        self._observation_generation += 1
+        if self.lazy_observations:
+            return LazyObservations(self)
+        return {sailor_id: self._generate_observation(sailor_id) for sailor_id in self.sailor_names}
+    
+    def agents_to_act(self, turn_based: bool = False) -> List[str]:
+        """
+        Sailors who have a decision to make this turn.
+        
+        Args:
+            turn_based: If True, only the active sailor in the turn order acts
+            
+        Returns:
+            Sailor IDs in sailor_names order: nobody once the game is over,
+            living sailors who have not voted while a vote is open, otherwise
+            the living sailors (or just the active one when turn_based) who are
+            not running a macro action or plan.
+        """
+        if self.state is None or self.state.game_over:
+            return []
+        
+        if self.state.current_vote is not None:
+            voted = self.state.current_vote.votes
+            return [sid for sid in self.sailor_names
+                    if sid in self.state.living_sailors and sid not in voted]
+        
+        if turn_based:
+            active = self.state.get_active_sailor()
+            busy = active in self._macros or active in self._plans
+            return [active] if active in self.state.living_sailors and not busy else []
+        
+        return [sid for sid in self.sailor_names
+                if sid in self.state.living_sailors and sid not in self._macros and sid not in self._plans]
+    
     def _generate_observation(self, sailor_id: str) -> Observation:
         """Generate observation for a specific sailor."""
         sailor = self.state.get_sailor(sailor_id)
@@ -1302,51 +1813,42 @@ class MaroonedEnv:
             # Dead sailors get minimal observation
             return self._generate_dead_observation(sailor_id)
         
+        # Public part is shared by every sailor this step
+        public = self._public_snapshot()
+        
         # Generate spatial view
         spatial_view = self._generate_spatial_view(sailor)
         
-        # Collect all sailors' public info
-        all_sailors_energy = {}
-        all_sailors_poison = {}
-        for sid, s in self.state.sailors.items():
-            all_sailors_energy[sid] = s.energy if s.alive else 0
-            all_sailors_poison[sid] = s.poison_state
-        
-        # Get recent messages
-        recent_messages = self.state.message_history[-20:]  # Last 20 messages
-        
-        # Static map shows INITIAL snapshot (frozen at game start, never updates)
-        all_resources = list(self.state.initial_resources)  # Frozen snapshot
-        
-        # Collect ALL poison positions for static map (also frozen)
-        all_poison_positions = list(self.state.initial_poison_positions)
-        
         # Create observation
         obs = Observation(
             sailor_id=sailor_id,
-            day=self.state.current_day,
-            turn=self.state.current_turn,
-            phase=self.state.current_phase,
+            day=public.day,
+            turn=public.turn,
+            phase=public.phase,
             position=sailor.position,
             energy=sailor.energy,
-            backpack=sailor.backpack.copy(),
+            backpack=[InventoryItem(item.resource_type, item.quantity) for item in sailor.backpack],
             poison_state=sailor.poison_state,
             spatial_view=spatial_view,
-            terrain_map=self.state.world_map.terrain,  # Full island terrain map
-            level_transitions=self.state.world_map.level_transitions,  # Staircase locations
-            base_camp_position=Position(*BASE_CAMP_POSITION),  # Base camp location
-            common_inventory=self.state.common_inventory.copy(),
-            ship_progress=self.state.ship_progress,
-            all_sailors_energy=all_sailors_energy,
-            all_sailors_poison_state=all_sailors_poison,
-            shared_knowledge=self.state.shared_knowledge,
-            evidence_log=self.state.evidence_log,
-            recent_messages=recent_messages,
-            weather=self.state.weather,
-            current_vote=self.state.current_vote,  # TIER 2 FIX: Active voting session
-            voting_history=self.state.voting_history.copy(),  # TIER 2 FIX: Past votes
-            all_resources=all_resources,  # For static map rendering
-            all_poison_positions=all_poison_positions,  # For static map rendering
+            terrain_map=public.terrain_map,  # Full island terrain map
+            level_transitions=public.level_transitions,  # Staircase locations
+            transition_table=public.transition_table,  # Position -> transitions
+            base_camp_position=public.base_camp_position,  # Base camp location
+            common_inventory=public.common_inventory,
+            ship_progress=public.ship_progress,
+            all_sailors_energy=public.all_sailors_energy,
+            all_sailors_poison_state=public.all_sailors_poison_state,
+            shared_knowledge=public.shared_knowledge,
+            evidence_log=public.evidence_log,
+            recent_messages=public.recent_messages,
+            weather=public.weather,
+            current_vote=public.current_vote,  # TIER 2 FIX: Active voting session
+            voting_history=public.voting_history,  # TIER 2 FIX: Past votes
+            all_resources=public.all_resources,  # For static map rendering
+            all_poison_positions=public.all_poison_positions,  # For static map rendering
+            static_map_cache=public.static_map_cache,
+            section_cache=public.section_cache,
+            public=public,
         )
         
         # Traitor gets enhanced vision
@@ -1359,6 +1861,103 @@ class MaroonedEnv:
         
         return obs
     
+    def _public_snapshot(self) -> PublicSnapshot:
+        """Public observation data for the current step (built once, shared by all sailors)"""
+        if self._snapshot is not None and self._snapshot[0] == self._observation_generation:
+            return self._snapshot[1]
+        
+        state = self.state
+        static = self._episode_static
+        if static is None:
+            # Static map shows INITIAL snapshot (frozen at game start, never updates)
+            world = state.world_map
+            static = self._episode_static = {
+                "terrain_map": world.terrain,
+                "level_transitions": tuple(world.level_transitions),
+                "transition_table": dict(world.get_transition_table()),
+                "base_camp_position": world.position(*BASE_CAMP_POSITION),
+                "all_resources": tuple(replace(r) for r in state.initial_resources),
+                "all_poison_positions": tuple(state.initial_poison_positions),
+                "static_map_cache": {},  # Filled by the first observation that renders it
+                "section_cache": {},  # Prompt sections, reused while their inputs are unchanged
+            }
+        
+        # Collect all sailors' public info
+        all_sailors_energy = ReadOnlyDict(
+            (sid, s.energy if s.alive else 0) for sid, s in state.sailors.items()
+        )
+        all_sailors_poison = ReadOnlyDict((sid, s.poison_state) for sid, s in state.sailors.items())
+        
+        progress = state.ship_progress
+        ship_progress = ShipProgress(
+            total_percentage=progress.total_percentage,
+            components=ReadOnlyDict(
+                (component, replace(comp, resources_contributed=ReadOnlyDict(comp.resources_contributed)))
+                for component, comp in progress.components.items()
+            ),
+            current_builders=frozenset(progress.current_builders),
+            build_turns_remaining=progress.build_turns_remaining,
+        )
+        
+        evidence_log = EvidenceLog(
+            all_evidence=self._freeze_log(
+                "evidence", state.evidence_log.all_evidence,
+                lambda e: replace(e, details=ReadOnlyDict(e.details)),
+            ),
+            _evidence_counter=state.evidence_log._evidence_counter,
+        )
+        
+        # Discovered resources only change together with a new report
+        knowledge = state.shared_knowledge
+        reports = self._freeze_log("resource_reports", knowledge.resource_reports, ReadOnlyDict)
+        if self._frozen_knowledge is None or self._frozen_knowledge.resource_reports is not reports:
+            self._frozen_knowledge = SharedKnowledge(
+                discovered_resources=ReadOnlyDict(
+                    (resource_id, ReadOnlyDict(report))
+                    for resource_id, report in knowledge.discovered_resources.items()
+                ),
+                resource_reports=reports,
+            )
+        
+        messages = self._freeze_log("messages", state.message_history, replace)
+        current_vote = state.current_vote
+        
+        snapshot = PublicSnapshot(
+            day=state.current_day,
+            turn=state.current_turn,
+            phase=state.current_phase,
+            weather=replace(state.weather),
+            common_inventory=tuple(
+                InventoryItem(item.resource_type, item.quantity) for item in state.common_inventory
+            ),
+            ship_progress=ship_progress,
+            all_sailors_energy=all_sailors_energy,
+            all_sailors_poison_state=all_sailors_poison,
+            shared_knowledge=self._frozen_knowledge,
+            evidence_log=evidence_log,
+            recent_messages=messages[-20:],  # Last 20 messages
+            current_vote=(replace(current_vote, votes=ReadOnlyDict(current_vote.votes))
+                          if current_vote is not None else None),
+            voting_history=self._freeze_log(
+                "voting_history", state.voting_history,
+                lambda v: replace(v, votes=ReadOnlyDict(v.votes)),
+            ),
+            **static,
+        )
+        self._snapshot = (self._observation_generation, snapshot)
+        return snapshot
+    
+    def _freeze_log(self, name: str, log: List[Any], freeze) -> Tuple[Any, ...]:
+        """Tuple of frozen copies of an append-only log, only copying new entries"""
+        count, last, frozen = self._frozen_logs.get(name, (0, None, ()))
+        # A rollback can truncate the log and grow it again with different entries
+        if count > len(log) or (count and log[count - 1] is not last):
+            count, frozen = 0, ()
+        if count < len(log):
+            frozen = frozen + tuple(freeze(entry) for entry in log[count:])
+            self._frozen_logs[name] = (len(log), log[-1], frozen)
+        return frozen
+    
     def _generate_spatial_view(self, sailor: 'Sailor') -> SpatialView:
         """Generate what sailor can see around them."""
         radius = SPATIAL_VIEW_RADIUS
@@ -1367,16 +1966,16 @@ class MaroonedEnv:
             sailor.position, radius
         )
         
-        visible_poison = []
-        for poison_id, pos in self.state.world_map.poison_tablets.items():
-            if pos.distance_to(sailor.position) <= radius:
-                visible_poison.append(pos)
+        visible_poison = [
+            self.state.world_map.poison_tablets[poison_id]
+            for poison_id in self.state.world_map.get_poison_at(sailor.position, radius)
+        ]
         
         visible_sailors = []
         visible_sailor_positions = {}  # NEW: Track positions for grid rendering
         for sid, s in self.state.sailors.items():
             if s.alive and sid != sailor.sailor_id:
-                if s.position.distance_to(sailor.position) <= radius:
+                if s.position.distance_sq_to(sailor.position) <= radius * radius:
                     visible_sailors.append(sid)
                     visible_sailor_positions[sid] = s.position  # Store position
         
@@ -1392,24 +1991,26 @@ class MaroonedEnv:
         """Generate minimal observation for dead sailor."""
         from config import MapLevel
         
+        public = self._public_snapshot()
         return Observation(
             sailor_id=sailor_id,
-            day=self.state.current_day,
-            turn=self.state.current_turn,
-            phase=self.state.current_phase,
+            day=public.day,
+            turn=public.turn,
+            phase=public.phase,
             position=Position(0, 0, MapLevel.GROUND),
             energy=0,
             backpack=[],
             poison_state=PoisonState.DEAD,
             spatial_view=SpatialView(Position(0, 0, MapLevel.GROUND)),
-            common_inventory=self.state.common_inventory.copy(),
-            ship_progress=self.state.ship_progress,
+            common_inventory=public.common_inventory,
+            ship_progress=public.ship_progress,
             all_sailors_energy={},
             all_sailors_poison_state={},
-            shared_knowledge=self.state.shared_knowledge,
-            evidence_log=self.state.evidence_log,
+            shared_knowledge=public.shared_knowledge,
+            evidence_log=public.evidence_log,
             recent_messages=[],
-            weather=self.state.weather,
+            weather=public.weather,
+            public=public,
         )
     
     # ========================================================================
@@ -1629,18 +2230,13 @@ class MaroonedEnv:
             if pos.level == level:
                 grid[pos.y][pos.x] = '☠️' if use_emoji else 'P'
         
-        # Mark level transitions
-        for pos1, pos2 in self.state.world_map.level_transitions:
-            if pos1.level == level:
-                if use_emoji:
-                    grid[pos1.y][pos1.x] = '⬆️' if pos2.level.value > level.value else '⬇️'
-                else:
-                    grid[pos1.y][pos1.x] = '^' if pos2.level.value > level.value else 'v'
-            if pos2.level == level:
+        # Mark level transitions (last transition listed at a tile decides the glyph)
+        for pos, transitions in self.state.world_map.get_transition_table().items():
+            if pos.level == level:
                 if use_emoji:
-                    grid[pos2.y][pos2.x] = '⬆️' if pos1.level.value > level.value else '⬇️'
+                    grid[pos.y][pos.x] = '⬆️' if transitions[-1].going_up else '⬇️'
                 else:
-                    grid[pos2.y][pos2.x] = '^' if pos1.level.value > level.value else 'v'
+                    grid[pos.y][pos.x] = '^' if transitions[-1].going_up else 'v'
         
         # Mark base camp
         base_pos = Position(*BASE_CAMP_POSITION)
@@ -7,9 +7,10 @@ Central game state and world state classes.
 from dataclasses import dataclass, field
 from typing import List, Dict, Set, Optional, Tuple, Any
 import random
+import numpy as np
 
 from config import (
-    MapLevel, MAP_SIZES, BASE_CAMP_POSITION, SHIP_SITE_POSITION,
+    MapLevel, MAP_SIZES, BASE_CAMP_POSITION, SHIP_SITE_POSITION, SPATIAL_INDEX_CELL_SIZE,
     TOTAL_SAILORS, TRAITOR_COUNT, POISON_TABLET_COUNT,
     POISON_SPAWN_DISTRIBUTION, RESOURCE_SPAWNS,
     MAX_DAYS, TURNS_PER_DAY, WeatherType, EvidenceType,
@@ -20,12 +21,15 @@ from config import (
 )
 
 from models import (
-    Position, TerrainTile, Resource, Sailor, SailorRole,
+    Position, PositionTable, TerrainTile, TerrainGrid, TERRAIN_CODES,
+    Resource, Sailor, SailorRole,
+    LevelTransition, build_transition_table,
     ShipProgress, ShipComponent, ShipComponentProgress,
     EvidenceLog, SharedKnowledge, Message, VotingSession,
     Weather, GameStatistics, ResourceType, InventoryItem,
     DeathCause, PoisonState,
 )
+from journal import MutationJournal
 
 
 # ============================================================================
@@ -36,8 +40,8 @@ from models import (
 class WorldMap:
     """The island map with all terrain and resources"""
     
-    # Terrain tiles for each level
-    terrain: Dict[MapLevel, List[List[TerrainTile]]] = field(default_factory=dict)
+    # Terrain arrays for each level (terrain[level][y][x] gives a TerrainTile view)
+    terrain: Dict[MapLevel, TerrainGrid] = field(default_factory=dict)
     
     # All resources on the map
     resources: Dict[str, Resource] = field(default_factory=dict)
@@ -48,56 +52,163 @@ class WorldMap:
     # Level transitions (stairs, cave entrances, etc.)
     level_transitions: List[Tuple[Position, Position]] = field(default_factory=list)
     
+    # Interned Position instances for this map (see position())
+    positions: PositionTable = field(default_factory=PositionTable, repr=False)
+    
+    # Level transitions indexed by position (see get_transitions_at)
+    transition_table: Dict[Position, Tuple[LevelTransition, ...]] = field(default_factory=dict, repr=False)
+    _transition_count: int = field(default=0, repr=False)
+    
+    # Spatial index: (level, cell_x, cell_y) -> ids in insertion order
+    resource_grid: Dict[Tuple[MapLevel, int, int], List[str]] = field(default_factory=dict, repr=False)
+    poison_grid: Dict[Tuple[MapLevel, int, int], List[str]] = field(default_factory=dict, repr=False)
+    _resource_order: Dict[str, int] = field(default_factory=dict, repr=False)
+    _poison_order: Dict[str, int] = field(default_factory=dict, repr=False)
+    _index_built: bool = field(default=False, repr=False)
+    
+    def position(self, x: int, y: int, level: MapLevel) -> Position:
+        """Interned Position for (x, y, level) - avoids allocating in hot loops"""
+        return self.positions.get(x, y, level)
+    
     def get_tile(self, position: Position) -> Optional[TerrainTile]:
-        """Get terrain tile at position"""
-        if position.level not in self.terrain:
-            return None
-        
-        width, height = MAP_SIZES[position.level]
-        if not (0 <= position.x < width and 0 <= position.y < height):
+        """Get terrain tile at position (built on demand from the terrain arrays)"""
+        grid = self.terrain.get(position.level)
+        if grid is None or not grid.in_bounds(position.x, position.y):
             return None
-        
-        return self.terrain[position.level][position.y][position.x]
+        return grid.tile(position.x, position.y)
     
     def is_walkable(self, position: Position) -> bool:
         """Check if position is walkable"""
-        tile = self.get_tile(position)
-        return tile is not None and tile.walkable
+        grid = self.terrain.get(position.level)
+        return grid is not None and grid.is_walkable(position.x, position.y)
+    
+    def build_spatial_index(self):
+        """(Re)build the bucketed grid index over resources and poison tablets"""
+        self.resource_grid = {}
+        self.poison_grid = {}
+        self._resource_order = {}
+        self._poison_order = {}
+        
+        for order, (resource_id, resource) in enumerate(self.resources.items()):
+            self._resource_order[resource_id] = order
+            if not resource.gathered:
+                self.resource_grid.setdefault(self._cell_of(resource.position), []).append(resource_id)
+        
+        # Poison tablets stay listed even after being picked up (same as poison_tablets)
+        for order, (poison_id, pos) in enumerate(self.poison_tablets.items()):
+            self._poison_order[poison_id] = order
+            self.poison_grid.setdefault(self._cell_of(pos), []).append(poison_id)
+        
+        self._index_built = True
+    
+    def mark_gathered(self, resource: Resource, journal: Optional[MutationJournal] = None):
+        """Mark a resource as gathered and drop it from the spatial index"""
+        if journal is not None:
+            journal.touch(resource)
+        resource.gathered = True
+        if not self._index_built:
+            return
+        bucket = self.resource_grid.get(self._cell_of(resource.position))
+        if bucket and resource.resource_id in bucket:
+            if journal is not None:
+                journal.touch(bucket)
+            bucket.remove(resource.resource_id)
+    
+    @staticmethod
+    def _cell_of(position: Position) -> Tuple[MapLevel, int, int]:
+        """Index cell containing a position"""
+        return (
+            position.level,
+            position.x // SPATIAL_INDEX_CELL_SIZE,
+            position.y // SPATIAL_INDEX_CELL_SIZE,
+        )
+    
+    @staticmethod
+    def _cells_in_radius(position: Position, radius: float) -> List[Tuple[MapLevel, int, int]]:
+        """Index cells that intersect the disk of `radius` around position"""
+        size = SPATIAL_INDEX_CELL_SIZE
+        reach = int(radius)
+        cells = []
+        for cell_y in range((position.y - reach) // size, (position.y + reach) // size + 1):
+            # Distance from the centre to the nearest row of this cell
+            dy = max(cell_y * size - position.y, 0, position.y - (cell_y * size + size - 1))
+            for cell_x in range((position.x - reach) // size, (position.x + reach) // size + 1):
+                dx = max(cell_x * size - position.x, 0, position.x - (cell_x * size + size - 1))
+                if dx * dx + dy * dy <= radius * radius:
+                    cells.append((position.level, cell_x, cell_y))
+        return cells
     
     def get_resources_at(self, position: Position, radius: int = 0) -> List[Resource]:
-        """Get resources at or near a position"""
+        """Get resources at or near a position (in resource insertion order)"""
+        if not self._index_built:
+            self.build_spatial_index()
+        
+        if radius == 0:
+            found = []
+            for resource_id in self.resource_grid.get(self._cell_of(position), ()):
+                resource = self.resources[resource_id]
+                if not resource.gathered and resource.position == position:
+                    found.append(resource)
+            return found
+        
+        candidate_ids = []
+        for cell in self._cells_in_radius(position, radius):
+            candidate_ids.extend(self.resource_grid.get(cell, ()))
+        candidate_ids.sort(key=self._resource_order.__getitem__)
+        
+        radius_sq = radius * radius
         found = []
-        for resource in self.resources.values():
+        for resource_id in candidate_ids:
+            resource = self.resources[resource_id]
             if resource.gathered:
                 continue
-            if radius == 0:
-                if resource.position == position:
-                    found.append(resource)
-            else:
-                if resource.position.distance_to(position) <= radius:
-                    found.append(resource)
+            if resource.position.distance_sq_to(position) <= radius_sq:
+                found.append(resource)
         return found
     
     def get_poison_at(self, position: Position, radius: int = 0) -> List[str]:
-        """Get poison tablets at or near a position"""
-        found = []
-        for poison_id, pos in self.poison_tablets.items():
-            if radius == 0:
-                if pos == position:
-                    found.append(poison_id)
-            else:
-                if pos.distance_to(position) <= radius:
-                    found.append(poison_id)
-        return found
+        """Get poison tablets at or near a position (in spawn order)"""
+        if not self._index_built:
+            self.build_spatial_index()
+        
+        if radius == 0:
+            return [
+                poison_id for poison_id in self.poison_grid.get(self._cell_of(position), ())
+                if self.poison_tablets[poison_id] == position
+            ]
+        
+        candidate_ids = []
+        for cell in self._cells_in_radius(position, radius):
+            candidate_ids.extend(self.poison_grid.get(cell, ()))
+        candidate_ids.sort(key=self._poison_order.__getitem__)
+        
+        radius_sq = radius * radius
+        return [
+            poison_id for poison_id in candidate_ids
+            if self.poison_tablets[poison_id].distance_sq_to(position) <= radius_sq
+        ]
+    
+    def build_transition_table(self):
+        """(Re)build the position -> transitions lookup from level_transitions"""
+        self.transition_table = build_transition_table(self.level_transitions)
+        self._transition_count = len(self.level_transitions)
+    
+    def get_transition_table(self) -> Dict[Position, Tuple[LevelTransition, ...]]:
+        """Position -> transitions lookup, rebuilt if level_transitions grew"""
+        if self._transition_count != len(self.level_transitions):
+            self.build_transition_table()
+        return self.transition_table
+    
+    def get_transitions_at(self, position: Position) -> Tuple[LevelTransition, ...]:
+        """Level transitions usable from a position, in level_transitions order"""
+        return self.get_transition_table().get(position, ())
     
     def can_transition_level(self, from_pos: Position, to_level: MapLevel) -> bool:
         """Check if can move between levels at this position"""
-        for pos1, pos2 in self.level_transitions:
-            if pos1 == from_pos and pos2.level == to_level:
-                return True
-            if pos2 == from_pos and pos1.level == to_level:
-                return True
-        return False
+        return any(
+            transition.destination.level == to_level
+            for transition in self.get_transitions_at(from_pos)
+        )
 
 
 # ============================================================================
@@ -166,10 +277,48 @@ class GameState:
     initial_resources: List['Resource'] = field(default_factory=list)
     initial_poison_positions: List['Position'] = field(default_factory=list)
     
+    # Undo log for checkpoint/rollback (only records while a checkpoint is open)
+    journal: MutationJournal = field(default_factory=MutationJournal, repr=False)
+    
     def __post_init__(self):
         """Initialize RNG with seed"""
         self.rng.seed(self.seed)
     
+    # ========================================================================
+    # MUTATION JOURNAL
+    # ========================================================================
+    
+    def touch(self, *objects: Any):
+        """Record objects in the journal right before mutating them"""
+        if self.journal.recording:
+            for obj in objects:
+                self.journal.touch(obj)
+    
+    def touch_backpack(self, sailor: Sailor):
+        """Record a sailor's backpack (list and stacks) before changing it"""
+        if self.journal.recording:
+            self.journal.touch(sailor.backpack)
+            for item in sailor.backpack:
+                self.journal.touch(item)
+    
+    def touch_common_inventory(self):
+        """Record the common inventory (list and stacks) before changing it"""
+        if self.journal.recording:
+            self.journal.touch(self.common_inventory)
+            for item in self.common_inventory:
+                self.journal.touch(item)
+    
+    def touch_evidence(self):
+        """Record the evidence log before new evidence is added"""
+        if self.journal.recording:
+            self.journal.touch(self.evidence_log)
+            self.journal.touch_length(self.evidence_log.all_evidence)
+    
+    def touch_messages(self):
+        """Record the message history before a message is appended"""
+        if self.journal.recording:
+            self.journal.touch_length(self.message_history)
+    
     # ========================================================================
     # PHASE MANAGEMENT
     # ========================================================================
@@ -200,6 +349,7 @@ class GameState:
         """Move to next turn, handle day transitions"""
         old_phase = self.current_phase
         
+        self.touch(self)
         self.current_turn += 1
         self.total_turns_elapsed += 1
         
@@ -223,6 +373,7 @@ class GameState:
         # Reset daily flags
         for sailor in self.sailors.values():
             if sailor.alive:
+                self.touch(sailor)
                 sailor.ate_food_today = False
                 sailor.declared_location = None
         
@@ -248,6 +399,9 @@ class GameState:
         """Mark sailor as dead"""
         sailor = self.get_sailor(sailor_id)
         if sailor and sailor.alive:
+            self.touch(sailor, self.living_sailors, self.dead_sailors)
+            if self.journal.recording:
+                self.journal.touch_length(self.statistics.deaths)
             sailor.alive = False
             sailor.death_day = self.current_day
             sailor.death_cause = cause
@@ -269,6 +423,7 @@ class GameState:
     
     def initialize_turn_order(self):
         """Initialize the turn order with all living sailors"""
+        self.touch(self)
         self.sailor_turn_order = sorted(list(self.living_sailors))
         self.active_sailor_index = 0
     
@@ -283,6 +438,8 @@ class GameState:
         if not self.sailor_turn_order:
             return
         
+        self.touch(self)
+        
         # Try up to len(sailors) times to find a living sailor
         for _ in range(len(self.sailor_turn_order)):
             self.active_sailor_index = (self.active_sailor_index + 1) % len(self.sailor_turn_order)
@@ -298,6 +455,7 @@ class GameState:
     def rebuild_turn_order(self):
         """Rebuild turn order when sailors die (remove dead sailors from rotation)"""
         current_sailor = self.get_active_sailor()
+        self.touch(self)
         
         # Rebuild list with only living sailors
         self.sailor_turn_order = sorted(list(self.living_sailors))
@@ -321,6 +479,7 @@ class GameState:
                 continue
             
             days_since_poison = self.current_day - sailor.poisoned_on_day
+            self.touch(sailor)
             
             if days_since_poison == POISON_SYMPTOM_ONSET:
                 sailor.poison_state = PoisonState.EARLY_SYMPTOMS
@@ -333,6 +492,7 @@ class GameState:
         """Poison a sailor"""
         sailor = self.get_sailor(sailor_id)
         if sailor and sailor.alive:
+            self.touch(sailor)
             sailor.poisoned_on_day = self.current_day
             sailor.poisoned_by = poisoner_id
             sailor.poison_state = PoisonState.HEALTHY  # Symptoms come later
@@ -341,6 +501,7 @@ class GameState:
         """Cure a poisoned sailor with antidote"""
         sailor = self.get_sailor(sailor_id)
         if sailor and sailor.is_poisoned():
+            self.touch(sailor)
             sailor.poison_state = PoisonState.HEALTHY
             sailor.poisoned_on_day = None
             sailor.poisoned_by = None
@@ -376,6 +537,7 @@ class GameState:
             
             if distance > MISMATCH_THRESHOLD:
                 # Generate evidence
+                self.touch_evidence()
                 self.evidence_log.add_evidence(
                     day=self.current_day,
                     evidence_type=EvidenceType.LOCATION_MISMATCH,
@@ -393,6 +555,7 @@ class GameState:
         from config import ENERGY_REGEN_WITH_FOOD, ENERGY_LOSS_NO_FOOD, MAX_ENERGY
         
         for sailor in self.get_living_sailors():
+            self.touch(sailor)
             if sailor.ate_food_today:
                 sailor.energy = min(MAX_ENERGY, sailor.energy + ENERGY_REGEN_WITH_FOOD)
             else:
@@ -408,6 +571,7 @@ class GameState:
         if not sailor or not sailor.alive:
             return False
         
+        self.touch(sailor)
         sailor.energy -= amount
         
         # Check for exhaustion death
@@ -423,6 +587,8 @@ class GameState:
     
     def add_to_common_inventory(self, resource_type: ResourceType, quantity: int):
         """Add items to common inventory"""
+        self.touch_common_inventory()
+        
         # Try to stack
         for item in self.common_inventory:
             if item.resource_type == resource_type:
@@ -434,6 +600,7 @@ class GameState:
     
     def remove_from_common_inventory(self, resource_type: ResourceType, quantity: int) -> bool:
         """Remove items from common inventory"""
+        self.touch_common_inventory()
         for item in self.common_inventory:
             if item.resource_type == resource_type and item.quantity >= quantity:
                 item.quantity -= quantity
@@ -470,12 +637,45 @@ class GameState:
         
         return True
     
+    def next_buildable_component(self) -> Optional[ShipComponent]:
+        """Next component BUILD_SHIP would complete (None if nothing is buildable)"""
+        from config import SHIP_COMPONENTS
+        
+        # Priority order for building
+        component_order = [
+            ShipComponent.HULL,
+            ShipComponent.MAST,
+            ShipComponent.SAIL,
+            ShipComponent.RUDDER,
+            ShipComponent.SUPPLIES,
+        ]
+        
+        for component in component_order:
+            # Check if already completed
+            progress = self.ship_progress.components.get(component)
+            if progress and progress.completed:
+                continue
+            
+            # Check prerequisite
+            if not self.ship_progress.can_build_component(component):
+                continue
+            
+            # Check if we have required resources
+            required_resources = SHIP_COMPONENTS[component].get("required_resources", {})
+            if all(self.get_common_inventory_count(resource_type) >= needed
+                   for resource_type, needed in required_resources.items()):
+                return component
+        
+        return None
+
     def progress_ship_building(self, component: ShipComponent, resources: Dict[ResourceType, int]):
         """Add resources to ship component"""
+        self.touch(self.ship_progress, self.ship_progress.components)
         if component not in self.ship_progress.components:
             self.ship_progress.components[component] = ShipComponentProgress(component)
         
         comp_progress = self.ship_progress.components[component]
+        self.touch(comp_progress, comp_progress.resources_contributed)
         
         # Add resources
         for resource_type, quantity in resources.items():
@@ -498,6 +698,7 @@ class GameState:
     
     def start_vote(self):
         """Start a voting session"""
+        self.touch(self)
         self.current_vote = VotingSession(day=self.current_day)
     
     def cast_vote(self, voter: str, accused: str, reasoning: Optional[str] = None):
@@ -508,6 +709,7 @@ class GameState:
             self.start_vote()
         
         vote = Vote(voter, accused, self.current_day, reasoning)
+        self.touch(self.current_vote.votes)
         self.current_vote.votes.append(vote)
     
     def resolve_vote(self) -> Optional[Tuple[str, bool]]:
@@ -531,6 +733,9 @@ class GameState:
         eliminated = self.current_vote.get_most_voted()
         was_traitor = self.is_traitor(eliminated)
         
+        self.touch(self, self.current_vote)
+        if self.journal.recording:
+            self.journal.touch_length(self.voting_history)
         self.current_vote.eliminated = eliminated
         self.current_vote.was_traitor = was_traitor
         
@@ -551,6 +756,8 @@ class GameState:
         """Check if game is over, return winner"""
         from config import MIN_SAILORS_TO_WIN, MAX_DAYS
         
+        self.touch(self)
+        
         # Sailors win: Ship complete
         if self.ship_progress.is_complete():
             self.game_over = True
@@ -622,7 +829,7 @@ def create_initial_game_state(seed: int = None, sailor_names: List[str] = None)
     state.world_map = _create_world_map(state.rng)
     
     # Initialize sailors
-    base_pos = Position(*BASE_CAMP_POSITION)
+    base_pos = state.world_map.position(*BASE_CAMP_POSITION)
     for name in sailor_names:
         sailor = Sailor(
             sailor_id=name,
@@ -660,26 +867,20 @@ def _create_world_map(rng: random.Random) -> WorldMap:
     world = WorldMap()
     
     # Generate terrain for each level
+    forest, beach = TERRAIN_CODES["forest"], TERRAIN_CODES["beach"]
     for level, (width, height) in MAP_SIZES.items():
-        terrain_grid = []
-        for y in range(height):
-            row = []
-            for x in range(width):
-                pos = Position(x, y, level)
-                
-                # Determine terrain type (simplified for now)
-                if level == MapLevel.MOUNTAIN:
-                    terrain = "mountain"
-                elif level == MapLevel.CAVE:
-                    terrain = "cave"
-                else:
-                    terrain = "forest" if rng.random() > 0.5 else "beach"
-                
-                tile = TerrainTile(pos, terrain, walkable=True)
-                row.append(tile)
-            terrain_grid.append(row)
+        # Determine terrain type (simplified for now)
+        if level == MapLevel.MOUNTAIN:
+            types = np.full((height, width), TERRAIN_CODES["mountain"], dtype=np.uint8)
+        elif level == MapLevel.CAVE:
+            types = np.full((height, width), TERRAIN_CODES["cave"], dtype=np.uint8)
+        else:
+            types = np.array(
+                [forest if rng.random() > 0.5 else beach for _ in range(width * height)],
+                dtype=np.uint8,
+            ).reshape(height, width)
         
-        world.terrain[level] = terrain_grid
+        world.terrain[level] = TerrainGrid(level, types, positions=world.positions)
     
     # Spawn resources
     resource_id_counter = 0
@@ -699,7 +900,7 @@ def _create_world_map(rng: random.Random) -> WorldMap:
                     
                     break  # Valid position found
                 
-                pos = Position(x, y, level)
+                pos = world.position(x, y, level)
                 
                 resource_id = f"{resource_type.value.upper()}_{resource_id_counter}"
                 resource_id_counter += 1
@@ -724,7 +925,7 @@ def _create_world_map(rng: random.Random) -> WorldMap:
                 
                 break  # Valid position found
             
-            pos = Position(x, y, level)
+            pos = world.position(x, y, level)
             
             poison_id = f"POISON_{poison_id_counter}"
             poison_id_counter += 1
@@ -756,8 +957,8 @@ def _create_world_map(rng: random.Random) -> WorldMap:
     ground_to_mountain_y = rng.randint(0, ground_height - 1)
     
     mountain_entry = (
-        Position(ground_to_mountain_x, ground_to_mountain_y, MapLevel.GROUND),  # Stairs UP on ground
-        Position(0, 0, MapLevel.MOUNTAIN)  # Stairs DOWN at (0,0) on mountain
+        world.position(ground_to_mountain_x, ground_to_mountain_y, MapLevel.GROUND),  # Stairs UP on ground
+        world.position(0, 0, MapLevel.MOUNTAIN)  # Stairs DOWN at (0,0) on mountain
     )
     
     # Cave transition: Ground level random position <-> Cave (0,0)
@@ -766,13 +967,18 @@ def _create_world_map(rng: random.Random) -> WorldMap:
     ground_to_cave_y = rng.randint(0, ground_height - 1)
     
     cave_entry = (
-        Position(ground_to_cave_x, ground_to_cave_y, MapLevel.GROUND),  # Stairs DOWN on ground
-        Position(0, 0, MapLevel.CAVE)  # Stairs UP at (0,0) on cave
+        world.position(ground_to_cave_x, ground_to_cave_y, MapLevel.GROUND),  # Stairs DOWN on ground
+        world.position(0, 0, MapLevel.CAVE)  # Stairs UP at (0,0) on cave
     )
     
     world.level_transitions.append(mountain_entry)
     world.level_transitions.append(cave_entry)
     
+    world.build_transition_table()
+    
+    # Bucket resources and poison once so radius queries only touch nearby cells
+    world.build_spatial_index()
+    
     return world
 
 
@@ -0,0 +1,135 @@
+"""
+🏴‍☠️ MAROONED - Mutation Journal
+=================================
+Undo log used by MaroonedEnv.checkpoint() / rollback() to branch from a
+game state without deep-copying it.
+
+While a checkpoint is open, game code calls touch() on every object right
+before changing it. The first touch per checkpoint stores a shallow snapshot
+(or, for append-only logs, just the length), so undoing a step costs time
+proportional to what the step changed.
+"""
+
+from typing import Any, Dict, List, Set, Tuple
+import random
+
+
+# Entry kinds
+_OBJECT = 0   # Dataclass / plain object: saved __dict__ copy
+_LIST = 1     # List: saved contents
+_DICT = 2     # Dict: saved contents
+_SET = 3      # Set: saved contents
+_LENGTH = 4   # Append-only list: saved length
+_KEY = 5      # Single dict key: saved value (or _MISSING)
+_RNG = 6      # random.Random: saved getstate()
+
+_MISSING = object()
+
+
+class MutationJournal:
+    """Stack of checkpoints over a log of pre-mutation snapshots"""
+
+    def __init__(self):
+        self._entries: List[Tuple[int, Any, Any]] = []
+        self._marks: List[int] = []  # Entry index where each open checkpoint starts
+        self._touched: List[Set[Tuple[int, Any]]] = []  # Already-saved targets per checkpoint
+
+    @property
+    def recording(self) -> bool:
+        """True while at least one checkpoint is open"""
+        return bool(self._marks)
+
+    # ========================================================================
+    # RECORDING
+    # ========================================================================
+
+    def _first_touch(self, key: Tuple[int, Any]) -> bool:
+        """True if target has not been saved since the innermost checkpoint"""
+        touched = self._touched[-1]
+        if key in touched:
+            return False
+        touched.add(key)
+        return True
+
+    def touch(self, obj: Any):
+        """Save obj (shallow) before it is mutated"""
+        if not self._marks or not self._first_touch((id(obj), None)):
+            return
+
+        if isinstance(obj, list):
+            self._entries.append((_LIST, obj, obj[:]))
+        elif isinstance(obj, dict):
+            self._entries.append((_DICT, obj, dict(obj)))
+        elif isinstance(obj, set):
+            self._entries.append((_SET, obj, set(obj)))
+        elif isinstance(obj, random.Random):
+            self._entries.append((_RNG, obj, obj.getstate()))
+        else:
+            self._entries.append((_OBJECT, obj, obj.__dict__.copy()))
+
+    def touch_length(self, log: List[Any]):
+        """Save the length of an append-only list before it grows"""
+        if not self._marks or not self._first_touch((id(log), len)):
+            return
+        self._entries.append((_LENGTH, log, len(log)))
+
+    def touch_key(self, mapping: Dict[Any, Any], key: Any):
+        """Save a single dict entry before it is set"""
+        if not self._marks or not self._first_touch((id(mapping), ("key", key))):
+            return
+        self._entries.append((_KEY, (mapping, key), mapping.get(key, _MISSING)))
+
+    # ========================================================================
+    # CHECKPOINTS
+    # ========================================================================
+
+    def mark(self) -> int:
+        """Open a checkpoint, returns its token"""
+        self._marks.append(len(self._entries))
+        self._touched.append(set())
+        return len(self._marks) - 1
+
+    def rollback(self, token: int):
+        """Undo every change since checkpoint `token` (which stays open)"""
+        self._check_token(token)
+        start = self._marks[token]
+
+        for kind, target, saved in reversed(self._entries[start:]):
+            if kind == _OBJECT:
+                target.__dict__.clear()
+                target.__dict__.update(saved)
+            elif kind == _LIST:
+                target[:] = saved
+            elif kind == _DICT or kind == _SET:
+                target.clear()
+                target.update(saved)
+            elif kind == _LENGTH:
+                del target[saved:]
+            elif kind == _KEY:
+                mapping, key = target
+                if saved is _MISSING:
+                    mapping.pop(key, None)
+                else:
+                    mapping[key] = saved
+            elif kind == _RNG:
+                target.setstate(saved)
+
+        del self._entries[start:]
+        del self._marks[token + 1:]
+        del self._touched[token + 1:]
+        self._touched[token] = set()
+
+    def release(self, token: int):
+        """Close checkpoint `token` (and any opened after it), keeping changes"""
+        self._check_token(token)
+        del self._marks[token:]
+        del self._touched[token:]
+        if not self._marks:
+            self._entries.clear()
+
+    def _check_token(self, token: int):
+        if not 0 <= token < len(self._marks):
+            raise ValueError(f"Unknown or released checkpoint: {token}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -10,10 +10,12 @@ Teacher LLM (Ollama Mixtral) validates student outputs and provides:
 """
 
 import re
+import time
 import requests
-from typing import Optional, Dict, Any, Tuple
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Sequence, Tuple
 from models import Observation, Action, Position
-from config import ActionType, ResourceType, ShipComponent, MapLevel
+from config import ActionType, ResourceType, ShipComponent, MapLevel, PLAN_MAX_STEPS
 
 # vLLM Teacher API Configuration (OpenAI-compatible)
 VLLM_API_URL = "http://localhost:8000/v1/chat/completions"
@@ -833,46 +835,34 @@ You are the expert teacher. Parse precisely, penalize appropriately, guide strat
 """
 
 
+# Role -> system prompt. Each prompt starts with one of these, so a prefix-caching
+# server keeps their KV state across turns and episodes.
+SYSTEM_PROMPTS = {
+    "colonist": COLONIST_SYSTEM_PROMPT,
+    "traitor": TRAITOR_SYSTEM_PROMPT,
+    "teacher": TEACHER_SYSTEM_PROMPT,
+}
+
+
 def get_system_prompt(role: str) -> str:
     """
     Get the appropriate system prompt based on role.
     
     Args:
-        role: "colonist" or "traitor"
+        role: "colonist", "traitor" or "teacher" (anything else gets the colonist prompt)
     
     Returns:
         System prompt string
     """
-    if role == "traitor":
-        return TRAITOR_SYSTEM_PROMPT
-    else:
-        return COLONIST_SYSTEM_PROMPT
+    return SYSTEM_PROMPTS.get(role, COLONIST_SYSTEM_PROMPT)
 
 
 # ============================================================================
 # 6.1 OBSERVATION → PROMPT TEXT
 # ============================================================================
 
-def observation_to_prompt(obs: Observation, include_role: bool = False, sailor_role: str = None) -> str:
-    """
-    Convert an Observation into a user prompt (observation only, no system prompt).
-    
-    NOTE: System prompt with game rules/objectives should be set separately in chat template!
-    This function ONLY converts the current observation to text.
-    
-    Args:
-        obs: The observation object
-        include_role: Deprecated (role info now in system prompt)
-        sailor_role: Deprecated (role info now in system prompt)
-    
-    Returns:
-        Formatted observation text (user prompt only)
-    """
-    # Use the built-in to_text() method as base
-    base_text = obs.to_text()
-    
-    # Add action format instructions
-    action_instructions = """
+# Action format instructions appended to every observation prompt
+ACTION_INSTRUCTIONS = """
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 YOUR TURN - CHOOSE ONE ACTION
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -884,6 +874,10 @@ MOVEMENT:
     - direction: NORTH, SOUTH, EAST, WEST, UP, DOWN
     - levels: optional, for vertical movement (UP 2, DOWN 1)
     - Examples: MOVE NORTH, MOVE EAST 3, MOVE UP, MOVE DOWN
+  GOTO <x> <y> [<level>]
+    - Walk (and climb) to a tile over the next turns, cheapest route
+    - Stops early if something happens (low energy, sailor spotted, SOS, new phase)
+    - Example: GOTO 15 15 GROUND
 
 RESOURCE GATHERING:
   GATHER <resource_id>
@@ -891,6 +885,9 @@ RESOURCE GATHERING:
     - Must be adjacent (within 1 tile)
     - Costs 5 energy
     - Example: GATHER WOOD_001
+  GATHER_NEAREST <resource_type>
+    - Walk to the nearest visible resource of that type and gather it
+    - Example: GATHER_NEAREST wood
 
 INVENTORY MANAGEMENT:
   DEPOSIT <resource_type> <quantity>
@@ -957,8 +954,82 @@ Example:
 REASONING: Wood pile WOOD_003 is adjacent at position (16,16). Gathering it will help build the hull which requires 50 wood total.
 ACTION: GATHER WOOD_003
 """
+
+
+# Optional addendum to ACTION_INSTRUCTIONS when the student may plan ahead (parse_llm_plan)
+PLAN_INSTRUCTIONS = f"""
+PLANNING AHEAD (optional):
+  Instead of one ACTION line you may give up to {PLAN_MAX_STEPS} numbered actions.
+  They run on the next turns without asking you again, and stop early if
+  something important happens (new evidence, a vote, low energy, poison, or
+  your gather target is taken).
+
+Example:
+REASONING: Wood to the north, then bring it back to base.
+ACTION 1: GATHER_NEAREST wood
+ACTION 2: GATHER_NEAREST wood
+ACTION 3: GOTO 15 15 GROUND
+ACTION 4: DEPOSIT wood 2
+"""
+
+
+# Sections of Observation.to_text() that stay the same for a whole episode
+STABLE_SECTIONS = ("island_map",)
+
+# The instructions as they open a stable-prefix prompt
+STABLE_INSTRUCTIONS = ACTION_INSTRUCTIONS.lstrip("\n") + "\n"
+
+
+@dataclass(frozen=True)
+class PromptParts:
+    """A user prompt split into a stable prefix and the per-turn suffix"""
+    prefix: str  # Same text every turn of an episode
+    suffix: str  # Changes from turn to turn
+    
+    @property
+    def text(self) -> str:
+        return self.prefix + self.suffix
+
+
+def observation_to_prompt_parts(obs: Observation) -> PromptParts:
+    """
+    Lay out the user prompt as a stable prefix plus a dynamic suffix.
+    
+    The prefix is the action instructions followed by the episode's island map
+    (base camp, staircases, terrain map), always in that order. The suffix is
+    every other to_text() section, in the usual order. Together with the role's
+    system prompt, the prefix is identical on every turn of an episode, so its
+    KV state can be reused.
+    """
+    stable = [STABLE_INSTRUCTIONS]
+    dynamic = []
+    for name, text in obs.prompt_sections():
+        (stable if name in STABLE_SECTIONS else dynamic).append(text)
+    return PromptParts(prefix="".join(stable), suffix="".join(dynamic))
+
+
+def observation_to_prompt(obs: Observation, include_role: bool = False, sailor_role: str = None,
+                          stable_prefix: bool = False) -> str:
+    """
+    Convert an Observation into a user prompt (observation only, no system prompt).
+    
+    NOTE: System prompt with game rules/objectives should be set separately in chat template!
+    This function ONLY converts the current observation to text.
+    
+    Args:
+        obs: The observation object
+        include_role: Deprecated (role info now in system prompt)
+        sailor_role: Deprecated (role info now in system prompt)
+        stable_prefix: Use the observation_to_prompt_parts() layout (instructions and
+            island map first) so prefix-caching servers can reuse the prompt's KV state
     
-    return base_text + "\n" + action_instructions
+    Returns:
+        Formatted observation text (user prompt only)
+    """
+    if stable_prefix:
+        return observation_to_prompt_parts(obs).text
+    # to_text() reuses cached sections; the instructions never change
+    return "\n".join((obs.to_text(), ACTION_INSTRUCTIONS))
 
 
 def observation_to_condensed_prompt(obs: Observation) -> str:
@@ -1028,10 +1099,17 @@ Backpack: {len(obs.backpack)}/20 items
 # TEACHER-GUIDED ACTION PARSING (Process Reward Modeling)
 # ============================================================================
 
+# Teacher outputs used when the API call fails
+TEACHER_ERROR_RESPONSE = "VALID: NO\nACTION: WAIT\nPENALTY: -2.0\nCRITIQUE: Teacher API error - defaulting to WAIT"
+TEACHER_UNAVAILABLE_RESPONSE = "VALID: NO\nACTION: WAIT\nPENALTY: -2.0\nCRITIQUE: Teacher API unavailable - defaulting to WAIT"
+
+
 def teacher_validate_student_output(
     student_response: str,
     observation: Observation,
-    sailor_id: str
+    sailor_id: str,
+    legal_actions: Optional[Sequence[str]] = None,
+    cache: Optional[Any] = None,
 ) -> Dict[str, Any]:
     """
     Send student LLM output to teacher (vLLM Mixtral) for validation and correction.
@@ -1046,6 +1124,11 @@ def teacher_validate_student_output(
         student_response: Raw output from student LLM
         observation: Current game observation (for context)
         sailor_id: ID of the sailor
+        legal_actions: Optional env.legal_commands(sailor_id). When given, the
+            teacher is told to pick the corrected action from this list
+            instead of judging legality from the condensed state
+        cache: Optional teacher_cache.TeacherVerdictCache. Repeated outputs in
+            the same situation are answered from it without a teacher call
     
     Returns:
         dict with:
@@ -1055,29 +1138,15 @@ def teacher_validate_student_output(
             - valid: bool (was original output valid?)
             - teacher_response: str (full teacher output for logging)
     """
-    # Build teacher prompt with CONDENSED observation (reduce tokens)
-    condensed_observation = observation_to_condensed_prompt(observation)
+    if cache is not None:
+        key = cache.key(student_response, observation, legal_actions)
+        cached = cache.get(key)
+        if cached is not None:
+            return parse_teacher_response(cached, observation, sailor_id)
     
-    user_prompt = f"""STUDENT OUTPUT:
-{student_response}
-
-GAME STATE:
-{condensed_observation}"""
-
-    # Query vLLM teacher API (OpenAI-compatible endpoint)
-    # Mistral-7B-Instruct-v0.3 supports system role properly via vLLM
-    payload = {
-        "model": TEACHER_MODEL_NAME,
-        "messages": [
-            {"role": "system", "content": TEACHER_SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt}
-        ],
-        "temperature": 0.1,
-        "top_p": 1.0,
-        "max_tokens": 200,
-        "stream": False
-    }
+    payload = build_teacher_payload(student_response, observation, legal_actions)
     
+    started = time.perf_counter()
     try:
         response = requests.post(VLLM_API_URL, json=payload, timeout=30)
         response.raise_for_status()
@@ -1091,25 +1160,75 @@ GAME STATE:
         except:
             error_detail = f" - {response.text[:200]}"
         print(f"⚠️  Teacher API error: {e}{error_detail}")
-        teacher_response = f"VALID: NO\nACTION: WAIT\nPENALTY: -2.0\nCRITIQUE: Teacher API error - defaulting to WAIT"
+        teacher_response = TEACHER_ERROR_RESPONSE
     except requests.exceptions.RequestException as e:
         # Other connection errors
         print(f"⚠️  Teacher API error: {e}")
-        teacher_response = f"VALID: NO\nACTION: WAIT\nPENALTY: -2.0\nCRITIQUE: Teacher API unavailable - defaulting to WAIT"
+        teacher_response = TEACHER_UNAVAILABLE_RESPONSE
+    else:
+        if cache is not None:
+            cache.put(key, teacher_response, time.perf_counter() - started)
+    
+    return parse_teacher_response(teacher_response, observation, sailor_id)
+
+
+def build_teacher_payload(
+    student_response: str,
+    observation: Observation,
+    legal_actions: Optional[Sequence[str]] = None,
+    model: str = TEACHER_MODEL_NAME,
+    stream: bool = False,
+) -> Dict[str, Any]:
+    """Chat-completions request body for validating one student output (stream: SSE reply)"""
+    # Build teacher prompt with CONDENSED observation (reduce tokens)
+    condensed_observation = observation_to_condensed_prompt(observation)
     
+    user_prompt = f"""STUDENT OUTPUT:
+{student_response}
+
+GAME STATE:
+{condensed_observation}"""
+    if legal_actions is not None:
+        user_prompt += "\n\nLEGAL ACTIONS (ACTION must be one of these, or SAY):\n"
+        user_prompt += "\n".join(f"  {command}" for command in legal_actions)
+
+    # Query vLLM teacher API (OpenAI-compatible endpoint)
+    # Mistral-7B-Instruct-v0.3 supports system role properly via vLLM
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": TEACHER_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": 0.1,
+        "top_p": 1.0,
+        "max_tokens": 200,
+        "stream": stream
+    }
+
+
+# Fields of a teacher reply (shared with early_stop's streaming watcher)
+TEACHER_VALID_FIELD = re.compile(r'VALID:\s*(\S+)')
+TEACHER_PENALTY_FIELD = re.compile(r'PENALTY:\s*([-+]?\d+\.?\d*)')
+TEACHER_CRITIQUE_FIELD = re.compile(r'CRITIQUE:\s*(.+?)(?=\n\n|\Z)', re.DOTALL)
+TEACHER_ACTION_FIELD = re.compile(r'ACTION:\s*(.+?)(?=\n|$)')
+
+
+def parse_teacher_response(teacher_response: str, observation: Observation, sailor_id: str) -> Dict[str, Any]:
+    """Turn the teacher's text into the teacher_validate_student_output() result dict"""
     # Parse teacher response
     valid = "VALID: YES" in teacher_response
     
     # Extract penalty
-    penalty_match = re.search(r'PENALTY:\s*([-+]?\d+\.?\d*)', teacher_response)
+    penalty_match = TEACHER_PENALTY_FIELD.search(teacher_response)
     penalty = float(penalty_match.group(1)) if penalty_match else -1.0
     
     # Extract critique
-    critique_match = re.search(r'CRITIQUE:\s*(.+?)(?=\n\n|\Z)', teacher_response, re.DOTALL)
+    critique_match = TEACHER_CRITIQUE_FIELD.search(teacher_response)
     critique = critique_match.group(1).strip() if critique_match else "No critique provided"
     
     # Extract corrected action string
-    action_match = re.search(r'ACTION:\s*(.+?)(?=\n|$)', teacher_response)
+    action_match = TEACHER_ACTION_FIELD.search(teacher_response)
     action_str = action_match.group(1).strip() if action_match else "WAIT"
     
     # Convert action string to Action object using existing parser
@@ -1138,6 +1257,13 @@ GAME STATE:
 # 6.2 LLM OUTPUT → ACTION OBJECT (Reused from existing parser)
 # ============================================================================
 
+# Fields of a student answer (shared with early_stop's streaming watcher)
+ACTION_FIELD = re.compile(r'ACTION(?:\s*1)?:\s*(.+?)(?:\n|$)', re.IGNORECASE)
+REASONING_FIELD = re.compile(r'REASONING:\s*(.+?)(?:\n|$)', re.IGNORECASE)
+MESSAGE_FIELD = re.compile(r'MESSAGE:\s*["\']?(.+?)["\']?(?:\n|$)', re.IGNORECASE)
+PLAN_STEP_FIELD = re.compile(r'^\s*ACTION\s*(\d+)\s*:\s*(.+?)\s*$', re.IGNORECASE | re.MULTILINE)
+
+
 def parse_llm_response(response: str, sailor_id: str, current_position: Position) -> Tuple[Optional[Action], str]:
     """
     Parse LLM response text into an Action object.
@@ -1148,12 +1274,13 @@ def parse_llm_response(response: str, sailor_id: str, current_position: Position
         current_position: Current position of the sailor
     
     Returns:
-        Tuple of (Action object or None, error message)
+        Tuple of (Action object or None, error message). For a plan
+        (ACTION 1: ..., ACTION 2: ...) this is its first action
     """
     # Extract fields using regex
-    action_match = re.search(r'ACTION:\s*(.+?)(?:\n|$)', response, re.IGNORECASE)
-    reasoning_match = re.search(r'REASONING:\s*(.+?)(?:\n|$)', response, re.IGNORECASE)
-    message_match = re.search(r'MESSAGE:\s*["\']?(.+?)["\']?(?:\n|$)', response, re.IGNORECASE)
+    action_match = ACTION_FIELD.search(response)
+    reasoning_match = REASONING_FIELD.search(response)
+    message_match = MESSAGE_FIELD.search(response)
     
     if not action_match:
         return None, "No ACTION field found in response"
@@ -1236,10 +1363,56 @@ def parse_llm_response(response: str, sailor_id: str, current_position: Position
             
             target_pos = Position(new_x, new_y, new_level)
             
+            # MOVE <dir> N (N > 1) is a multi-turn macro run by the env
+            quantity = max(distance, 1) if action_type not in (ActionType.CLIMB_UP, ActionType.CLIMB_DOWN) else 1
+            
             return Action(
                 sailor_id=sailor_id,
                 action_type=action_type,
                 target_position=target_pos,
+                quantity=quantity,
+                message_content=message
+            ), ""
+        
+        # GOTO (macro: route computed by the env)
+        elif command == "GOTO":
+            if len(action_parts) < 3:
+                return None, "GOTO requires x and y (and optionally a level)"
+            
+            x, y = int(action_parts[1].strip(',')), int(action_parts[2].strip(','))
+            level = current_position.level
+            if len(action_parts) >= 4:
+                level_str = action_parts[3].upper()
+                level = next((lv for lv in MapLevel if level_str in (lv.name, str(lv.value))), None)
+                if level is None:
+                    return None, f"Unknown level: {action_parts[3]}"
+            
+            return Action(
+                sailor_id=sailor_id,
+                action_type=ActionType.GOTO,
+                target_position=Position(x, y, level),
+                message_content=message
+            ), ""
+        
+        # GATHER_NEAREST (macro: walk to the nearest visible resource and gather it)
+        elif command == "GATHER_NEAREST":
+            if len(action_parts) < 2:
+                return None, "GATHER_NEAREST requires resource_type"
+            
+            resource_type_str = action_parts[1].lower()
+            resource_type = None
+            for rt in ResourceType:
+                if rt.value.lower() == resource_type_str:
+                    resource_type = rt
+                    break
+            
+            if not resource_type:
+                return None, f"Unknown resource type: {resource_type_str}"
+            
+            return Action(
+                sailor_id=sailor_id,
+                action_type=ActionType.GATHER_NEAREST,
+                resource_type=resource_type,
                 message_content=message
             ), ""
         
@@ -1401,6 +1574,58 @@ def parse_llm_response(response: str, sailor_id: str, current_position: Position
                 message_content=message
             ), ""
         
+        # TAKE (from common inventory at base camp)
+        elif command == "TAKE":
+            if len(action_parts) < 3:
+                return None, "TAKE requires resource_type and quantity"
+            
+            resource_type_str = action_parts[1].lower()
+            quantity = int(action_parts[2])
+            
+            resource_type = None
+            for rt in ResourceType:
+                if rt.value.lower() == resource_type_str:
+                    resource_type = rt
+                    break
+            
+            if not resource_type:
+                return None, f"Unknown resource type: {resource_type_str}"
+            
+            return Action(
+                sailor_id=sailor_id,
+                action_type=ActionType.TAKE_FROM_COMMON,
+                resource_type=resource_type,
+                quantity=quantity,
+                message_content=message
+            ), ""
+        
+        # GIVE / OFFER (items to an adjacent sailor)
+        elif command == "GIVE" or command == "OFFER":
+            if len(action_parts) < 3:
+                return None, f"{command} requires target sailor_id and resource_type"
+            
+            target_sailor = action_parts[1]
+            resource_type_str = action_parts[2].lower()
+            quantity = int(action_parts[3]) if len(action_parts) >= 4 else 1
+            
+            resource_type = None
+            for rt in ResourceType:
+                if rt.value.lower() == resource_type_str:
+                    resource_type = rt
+                    break
+            
+            if not resource_type:
+                return None, f"Unknown resource type: {resource_type_str}"
+            
+            return Action(
+                sailor_id=sailor_id,
+                action_type=ActionType.GIVE_ITEM if command == "GIVE" else ActionType.OFFER_FOOD,
+                target_sailor=target_sailor,
+                resource_type=resource_type,
+                quantity=quantity,
+                message_content=message
+            ), ""
+        
         # SABOTAGE
         elif command == "SABOTAGE":
             if len(action_parts) < 2:
@@ -1458,6 +1683,26 @@ def parse_llm_response(response: str, sailor_id: str, current_position: Position
                 message_content=message
             ), ""
         
+        # ANTIDOTE / FRAME (target another sailor)
+        elif command == "USE_ANTIDOTE" or command == "FRAME":
+            if len(action_parts) < 2:
+                return None, f"{command} requires target sailor_id"
+            
+            return Action(
+                sailor_id=sailor_id,
+                action_type=ActionType.USE_ANTIDOTE if command == "USE_ANTIDOTE" else ActionType.FRAME_SAILOR,
+                target_sailor=action_parts[1],
+                message_content=message
+            ), ""
+        
+        # BACKPACK INSPECTION
+        elif command == "SHOW_BACKPACK" or command == "REFUSE_SHOW":
+            return Action(
+                sailor_id=sailor_id,
+                action_type=ActionType.SHOW_BACKPACK if command == "SHOW_BACKPACK" else ActionType.REFUSE_SHOW,
+                message_content=message
+            ), ""
+        
         # SPECIAL
         elif command == "WAIT":
             return Action(
@@ -1480,6 +1725,41 @@ def parse_llm_response(response: str, sailor_id: str, current_position: Position
         return None, f"Error parsing action: {str(e)}"
 
 
+def parse_llm_plan(response: str, sailor_id: str, current_position: Position,
+                   max_steps: int = PLAN_MAX_STEPS) -> Tuple[List[Action], str]:
+    """
+    Parse a multi-action plan ("ACTION 1: ...", "ACTION 2: ...", see PLAN_INSTRUCTIONS)
+    for MaroonedEnv.set_plan().
+    
+    A response with a single ACTION line is a one-action plan. The MESSAGE
+    field (if any) goes with the first action; actions past max_steps are
+    dropped. Positions in MOVE targets are relative to current_position.
+    
+    Returns:
+        Tuple of (actions, error message). On error, actions holds the steps
+        parsed before the bad one
+    """
+    steps = PLAN_STEP_FIELD.findall(response)
+    if not steps:
+        action, error = parse_llm_response(response, sailor_id, current_position)
+        return ([action] if action is not None else []), error
+    
+    message_match = re.search(r'MESSAGE:.*', response, re.IGNORECASE)
+    message_line = "\n" + message_match.group(0) if message_match else ""
+    
+    actions: List[Action] = []
+    for number, (label, text) in enumerate(steps[:max_steps], start=1):
+        if int(label) != number:
+            return actions, f"Plan actions must be numbered 1, 2, 3, ... (got ACTION {label})"
+        action, error = parse_llm_response(
+            f"ACTION: {text}" + (message_line if number == 1 else ""), sailor_id, current_position
+        )
+        if action is None:
+            return actions, f"ACTION {number}: {error}"
+        actions.append(action)
+    return actions, ""
+
+
 def parse_action_safe(response: str, sailor_id: str, current_position: Position) -> Action:
     """
     Safe version that returns a WAIT action if parsing fails.
@@ -1514,17 +1794,43 @@ def parse_action_safe(response: str, sailor_id: str, current_position: Position)
 # 6.3 HELPER: VALIDATE ACTION
 # ============================================================================
 
-def validate_action(action: Action, obs: Observation) -> Tuple[bool, str]:
+def validate_action(action: Action, obs: Observation,
+                    legal_mask: Optional[Sequence[bool]] = None,
+                    action_space: Optional[Any] = None) -> Tuple[bool, str]:
     """
     Validate if an action is legal given the current observation.
     
     Args:
         action: The action to validate
         obs: Current observation
+        legal_mask: Optional env.legal_actions(sailor_id). With it, the action
+            is checked against the rules the env actually executes (and the
+            quantity against the backpack) instead of the phase/energy checks.
+            A MOVE macro is checked by its first step
+        action_space: env.flat_action_space (required with legal_mask)
     
     Returns:
         Tuple of (is_valid, error_message)
     """
+    if legal_mask is not None:
+        if action_space is None:
+            raise ValueError("validate_action() needs the action_space the legal_mask was built from")
+        if action.action_type in (ActionType.SEND_MESSAGE, ActionType.GOTO, ActionType.GATHER_NEAREST):
+            return True, ""  # Macros are checked by the env when it plans them (env.is_legal)
+        index = action_space.index(action)
+        if index is None or not legal_mask[index]:
+            return False, f"Action {action.action_type.value} is not legal right now"
+        if action.action_type in (ActionType.DEPOSIT_ITEM, ActionType.DROP_ITEM, ActionType.GIVE_ITEM):
+            held = sum(item.quantity for item in obs.backpack if item.resource_type == action.resource_type)
+            if action.quantity > held:
+                return False, f"Only {held} {action.resource_type.value} in backpack"
+        if action.action_type == ActionType.TAKE_FROM_COMMON:
+            available = sum(item.quantity for item in obs.common_inventory
+                            if item.resource_type == action.resource_type)
+            if action.quantity > available:
+                return False, f"Only {available} {action.resource_type.value} in common inventory"
+        return True, ""
+    
     # Phase restrictions
     if obs.phase == "morning":
         # Morning: only communication and voting allowed
@@ -1584,20 +1890,43 @@ MAIN FUNCTIONS FOR RL TRAINING:
 2. observation_to_prompt(obs: Observation) -> str
    - Converts observation to user prompt text
    - Use: Set as user message in chat template
+   - observation_to_prompt_parts(obs) gives the same content as a stable prefix
+     (instructions + island map) and a per-turn suffix, for KV prefix reuse
+     (see prompt_builder.PrefixTokenCache)
 
 3. teacher_validate_student_output(student_response, observation, sailor_id) -> dict
    - ⭐ MAIN FUNCTION for process reward modeling
    - Queries vLLM teacher to validate/correct student output
    - Returns: {action, penalty, critique, valid, teacher_response}
    - Use: Call after student LLM generation, before env.step()
+   - Pass legal_actions=env.legal_commands(sailor_id) to have the teacher pick
+     from the actions the env will accept
+   - teacher_client.TeacherClient validates a whole batch concurrently over
+     pooled connections (validate_batch / avalidate_batch), same results
+   - TeacherClient(url=[...]) spreads requests over teacher replicas, hedges
+     calls slower than an endpoint's p95 and skips replicas whose circuit
+     breaker is open; see client.stats for per-endpoint latency histograms
+   - TeacherClient(stream=True) stops reading the reply once VALID, ACTION,
+     PENALTY and CRITIQUE are complete (early_stop.FieldWatcher)
+   - Pass cache=teacher_cache.TeacherVerdictCache() (either API) to answer
+     repeated outputs without a teacher call; see cache.stats
+   - local_validator.TieredValidator settles canonical, legal outputs locally
+     (LOCAL_PROCESS_REWARDS) and only sends the rest to the teacher
 
 4. parse_llm_response(response, sailor_id, position) -> (Action, str)
    - Direct regex-based parsing (no teacher)
    - Returns: (Action object or None, error message)
    - Use: Internally by teacher validator
+   - early_stop.ActionStoppingCriteria stops student generation once the
+     REASONING and ACTION lines it reads (ACTION_FIELD, ...) are finished
+   - parse_llm_plan(response, sailor_id, position) parses "ACTION 1..K" plans
+     for env.set_plan(sailor_id, actions); append PLAN_INSTRUCTIONS to the
+     prompt to allow them
 
-5. validate_action(action, obs) -> (bool, str)
+5. validate_action(action, obs, legal_mask=None, action_space=None) -> (bool, str)
    - Checks if action is legal given observation
+   - With env.legal_actions(sailor_id) and env.flat_action_space, checks the
+     exact rules the env executes (see action_mask.py)
    - Returns: (is_valid, error_message)
    - Use: Optional pre-execution validation
 
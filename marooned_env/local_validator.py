@@ -0,0 +1,214 @@
+"""
+🏴‍☠️ MAROONED - Tiered Output Validation
+========================================
+Validates student outputs locally first and only asks the teacher about the
+ones that need judgement.
+
+An output is settled locally when it is exactly the documented answer format:
+
+    REASONING: <text>
+    ACTION: <command in canonical form>
+
+the command parses (parse_llm_response), and it is legal right now: the
+env's legal-action mask, or an explicit legal_commands list, decides that.
+Its process reward comes from config.LOCAL_PROCESS_REWARDS. Everything else -
+unparseable, non-canonical ("move north", "MOVING NORTH", "EAT food"),
+illegal, unchecked (nothing to decide legality with), or answers with a plan
+or extra lines - goes to the teacher, and stats counts why.
+
+    validator = TieredValidator(env, cache=TeacherVerdictCache())
+    result = validator.validate(student_response, obs, sailor_id)
+    result["tier"]  # "local" or "teacher" ("fallback": no teacher replica answered)
+
+From a running event loop (e.g. a notebook cell), await avalidate() /
+avalidate_batch() instead.
+"""
+
+import asyncio
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import ActionType, ResourceType, ShipComponent, MapLevel, LOCAL_PROCESS_REWARDS
+from models import Action, Observation
+from llm_interface import parse_llm_response, validate_action, teacher_validate_student_output
+from macros import is_macro
+
+
+# ============================================================================
+# 📐 CANONICAL COMMANDS
+# ============================================================================
+
+_RESOURCE = "(?:" + "|".join(rt.value for rt in ResourceType) + ")"
+_COMPONENT = "(?:" + "|".join(sc.value for sc in ShipComponent) + ")"
+_LEVEL = "(?:" + "|".join(level.name for level in MapLevel) + ")"
+_RESOURCE_ID = r"[A-Z]+(?:_[A-Z]+)*_\d+"
+_SAILOR = r"\S+"
+_COUNT = r"[1-9]\d*"
+
+# The forms ACTION_INSTRUCTIONS documents (and action_mask.ActionSpace.command produces)
+CANONICAL_COMMANDS = re.compile("|".join(f"(?:{pattern})" for pattern in (
+    rf"MOVE (?:NORTH|SOUTH|EAST|WEST)(?: {_COUNT})?",
+    r"MOVE (?:UP|DOWN)",
+    rf"GOTO \d+ \d+(?: {_LEVEL})?",
+    rf"GATHER {_RESOURCE_ID}",
+    rf"GATHER_NEAREST {_RESOURCE}",
+    rf"(?:DEPOSIT|TAKE|DROP) {_RESOURCE} {_COUNT}",
+    rf"EAT {_RESOURCE}",
+    rf"BUILD {_COMPONENT}",
+    rf"SABOTAGE {_COMPONENT}",
+    rf"GIVE {_SAILOR} {_RESOURCE}(?: {_COUNT})?",
+    rf"OFFER {_SAILOR} {_RESOURCE}",
+    rf"(?:POISON|VOTE|USE_ANTIDOTE|FRAME) {_SAILOR}",
+    r'SAY "[^"]+"',
+    r"WAIT|CALL_SOS|CALL_VOTE|SHOW_BACKPACK|REFUSE_SHOW",
+)))
+
+_ANSWER = re.compile(r"REASONING: *(\S.*)\nACTION: *(.+)")
+
+
+def local_check(student_response: str, observation: Observation, sailor_id: str,
+                env: Optional[Any] = None,
+                legal_commands: Optional[Sequence[str]] = None) -> Tuple[Optional[Action], str]:
+    """
+    Settle an output without the teacher if possible.
+
+    Args:
+        env: Optional MaroonedEnv whose legal-action mask decides legality
+        legal_commands: Without an env, the commands allowed (e.g. the
+            env.legal_commands() list the teacher would have been given)
+
+    Returns:
+        (action, "") for a canonical, legal answer, otherwise (None, why it
+        needs the teacher: "format", "unparsed", "non_canonical", "illegal", or
+        "unchecked" when neither env nor legal_commands is given)
+    """
+    lines = [line.strip() for line in student_response.strip().splitlines() if line.strip()]
+    match = _ANSWER.fullmatch("\n".join(lines))
+    if match is None:
+        return None, "format"
+
+    action, error = parse_llm_response(student_response, sailor_id, observation.position)
+    if action is None:
+        return None, "unparsed"
+    if not CANONICAL_COMMANDS.fullmatch(match.group(2).strip()):
+        return None, "non_canonical"
+
+    if env is not None:
+        legal, _ = validate_action(action, observation, env.legal_actions(sailor_id), env.flat_action_space)
+        legal = legal and (not is_macro(action) or env.is_legal(sailor_id, action))
+    elif legal_commands is not None:
+        legal, _ = validate_action(action, observation)
+        legal = legal and match.group(2).strip() in legal_commands
+    else:
+        # The observation heuristics alone pass e.g. GATHER of a missing resource
+        return None, "unchecked"
+    if not legal:
+        return None, "illegal"
+    return action, ""
+
+
+def local_result(action: Action) -> Dict[str, Any]:
+    """teacher_validate_student_output()-shaped result for a locally settled output"""
+    penalty = LOCAL_PROCESS_REWARDS.get(action.action_type.value, LOCAL_PROCESS_REWARDS["default"])
+    return {
+        "action": action,
+        "penalty": penalty,
+        "critique": "Correct format and legal action (validated locally).",
+        "valid": True,
+        "teacher_response": "",
+        "tier": "local",
+    }
+
+
+# ============================================================================
+# 🪜 TIERED VALIDATOR
+# ============================================================================
+
+class TieredValidator:
+    """Local rules first, teacher for the rest, with per-tier counts"""
+
+    def __init__(self, env: Optional[Any] = None, client: Optional[Any] = None,
+                 cache: Optional[Any] = None):
+        """
+        Args:
+            env: Optional MaroonedEnv. With it, legality is the env's legal-action
+                mask and the teacher gets env.legal_commands(sailor_id); without
+                it every output goes to the teacher
+            client: Optional teacher_client.TeacherClient (or anything with an async
+                avalidate_batch) for the teacher tier (default: teacher_validate_student_output)
+            cache: Optional teacher_cache.TeacherVerdictCache for the teacher tier
+                (ignored when client is given - give the client the cache)
+        """
+        self.env = env
+        self.client = client
+        self.cache = cache
+
+        self.local = 0
+        self.teacher = 0
+        self.escalated: Dict[str, int] = {
+            "format": 0, "unparsed": 0, "non_canonical": 0, "illegal": 0, "unchecked": 0,
+        }
+
+    def validate(self, student_response: str, observation: Observation, sailor_id: str) -> Dict[str, Any]:
+        """Like teacher_validate_student_output(), plus "tier" ("local" or "teacher")"""
+        return self.validate_batch([(student_response, observation, sailor_id)])[0]
+
+    def validate_batch(self, requests: Sequence[Tuple[str, Observation, str]]) -> List[Dict[str, Any]]:
+        """Blocking avalidate_batch() (not from inside a running event loop)"""
+        coroutine = self.avalidate_batch(requests)
+        run = getattr(self.client, "run", None)  # TeacherClient: its own loop keeps connections pooled
+        return run(coroutine) if run is not None else asyncio.run(coroutine)
+
+    async def avalidate(self, student_response: str, observation: Observation, sailor_id: str) -> Dict[str, Any]:
+        """Async validate() for notebooks and other code with a running event loop"""
+        return (await self.avalidate_batch([(student_response, observation, sailor_id)]))[0]
+
+    async def avalidate_batch(self, requests: Sequence[Tuple[str, Observation, str]]) -> List[Dict[str, Any]]:
+        """Validate many outputs; the teacher tier goes out as one batch"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        pending = []
+        reasons = []
+        for i, (student_response, observation, sailor_id) in enumerate(requests):
+            action, reason = local_check(student_response, observation, sailor_id, self.env)
+            if action is not None:
+                results[i] = local_result(action)
+            else:
+                pending.append(i)
+                reasons.append(reason)
+
+        if pending:
+            for i, result in zip(pending, await self._ask_teacher([requests[i] for i in pending])):
+                result.setdefault("tier", "teacher")  # Client results may be "fallback"
+                results[i] = result
+
+        # Counted once the batch is settled, so a failed teacher call leaves the stats alone
+        self.local += len(requests) - len(pending)
+        self.teacher += len(pending)
+        for reason in reasons:
+            self.escalated[reason] += 1
+        return results
+
+    async def _ask_teacher(self, requests: Sequence[Tuple[str, Observation, str]]) -> List[Dict[str, Any]]:
+        with_legal = [
+            (student_response, observation, sailor_id,
+             self.env.legal_commands(sailor_id) if self.env is not None else None)
+            for student_response, observation, sailor_id in requests
+        ]
+        if self.client is not None:
+            return await self.client.avalidate_batch(with_legal)
+        # teacher_validate_student_output() blocks: keep it off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: [
+            teacher_validate_student_output(*request, cache=self.cache) for request in with_legal
+        ])
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Outputs settled per tier, the share kept local, and why the rest were escalated"""
+        total = self.local + self.teacher
+        return {
+            "total": total,
+            "local": self.local,
+            "teacher": self.teacher,
+            "local_rate": self.local / total if total else 0.0,
+            "escalated": dict(self.escalated),
+        }
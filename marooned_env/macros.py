@@ -0,0 +1,292 @@
+"""
+🏴‍☠️ MAROONED - Macro Actions
+=============================
+Multi-turn actions that MaroonedEnv expands into single-turn actions and runs
+one per turn:
+
+    MOVE_<dir> with quantity N      N tiles in one direction (all of them walkable)
+    GOTO target_position            minimum-energy route (NavigationService.plan_route),
+                                    across levels if needed
+    GATHER_NEAREST resource_type    walk to the nearest visible resource of that
+                                    type and gather it
+
+A running macro ends early when one of its steps fails, when the sailor gets a
+new action, or when one of the env's macro interrupts fires after a turn
+(config.MACRO_INTERRUPTS). While it runs, the sailor is left out of
+agents_to_act(), so no LLM call is needed for those turns.
+
+A plan (MaroonedEnv.set_plan) is a queue of up to PLAN_MAX_STEPS actions,
+single or macro, run back to back the same way. Each step is checked with
+env.is_legal() when its turn comes, and the plan is cut short when a step is
+illegal or fails, or when one of config.PLAN_INTERRUPTS fires.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Any, Collection, Deque, Dict, FrozenSet, Optional, Sequence, Tuple
+
+from config import (
+    ActionType, PoisonState, SPATIAL_VIEW_RADIUS, ENERGY_SOS_THRESHOLD, MAX_ENERGY,
+    MACRO_INTERRUPT_ENERGY, MACRO_MAX_STEPS,
+)
+from models import Action, Sailor
+from game_state import GameState
+from navigation import NavigationService, MOVES
+
+
+MOVE_TYPES = frozenset(move for move, _, _ in MOVES)
+MOVE_DELTAS = {move: (dx, dy) for move, dx, dy in MOVES}
+
+# Start of the message _handle_sos() broadcasts
+SOS_PREFIX = "🆘 SOS!"
+
+
+def is_macro(action: Action) -> bool:
+    """True for actions MaroonedEnv runs over several turns"""
+    if action.action_type in (ActionType.GOTO, ActionType.GATHER_NEAREST):
+        return True
+    return action.action_type in MOVE_TYPES and action.quantity > 1
+
+
+@dataclass
+class MacroState:
+    """A macro in progress for one sailor"""
+    action: Action
+    steps: Deque[Action]                      # Single-turn actions still to run
+    target_resource_id: Optional[str] = None  # GATHER_NEAREST target
+    turns: int = 0                            # Turns consumed so far
+
+    # What the interrupts compare against
+    energy: int = MAX_ENERGY
+    phase: str = ""
+    message_count: int = 0
+    visible: FrozenSet[str] = field(default_factory=frozenset)
+
+    def copy(self) -> "MacroState":
+        return replace(self, steps=deque(self.steps))
+
+    def report(self, status: str, reason: Optional[str] = None) -> Dict[str, Any]:
+        """Macro entry of the step info: status is running / done / failed / interrupted / replaced"""
+        report = {
+            "type": self.action.action_type.value,
+            "status": status,
+            "turns": self.turns,
+            "steps_left": len(self.steps),
+        }
+        if reason is not None:
+            report["reason"] = reason
+        return report
+
+
+@dataclass
+class PlanState:
+    """A queue of actions a sailor committed to, run one action (or macro) at a time"""
+    steps: Deque[Action]   # Actions not started yet
+    size: int = 0          # Actions in the plan as given
+    turns: int = 0         # Turns consumed so far (macro turns included)
+
+    # What the interrupts compare against
+    evidence_count: int = 0
+    vote_open: bool = False
+    energy: int = MAX_ENERGY
+    poison_state: PoisonState = PoisonState.HEALTHY
+
+    def copy(self) -> "PlanState":
+        return replace(self, steps=deque(self.steps))
+
+    def report(self, status: str, reason: Optional[str] = None) -> Dict[str, Any]:
+        """Plan entry of the step info: status is running / done / failed / interrupted / replaced"""
+        report = {
+            "status": status,
+            "size": self.size,
+            "turns": self.turns,
+            "steps_left": len(self.steps),
+        }
+        if reason is not None:
+            report["reason"] = reason
+        return report
+
+
+def start_plan(state: GameState, sailor: Sailor, actions: Sequence[Action]) -> PlanState:
+    """Plan state for a queue of actions, with the interrupts' reference point set to now"""
+    return PlanState(
+        steps=deque(actions),
+        size=len(actions),
+        evidence_count=len(state.evidence_log.all_evidence),
+        vote_open=state.current_vote is not None,
+        energy=sailor.energy,
+        poison_state=sailor.poison_state,
+    )
+
+
+def _visible_sailors(state: GameState, sailor: Sailor) -> FrozenSet[str]:
+    """Living sailors in the sailor's spatial view (same rule as the observation)"""
+    radius_sq = SPATIAL_VIEW_RADIUS * SPATIAL_VIEW_RADIUS
+    return frozenset(
+        sid for sid, other in state.sailors.items()
+        if other.alive and sid != sailor.sailor_id
+        and other.position.distance_sq_to(sailor.position) <= radius_sq
+    )
+
+
+# ============================================================================
+# 🧭 PLANNING
+# ============================================================================
+
+def plan_macro(state: GameState, navigation: NavigationService,
+               sailor: Sailor, action: Action) -> Tuple[Optional[MacroState], str]:
+    """
+    Expand a macro action into its single-turn steps.
+
+    Returns:
+        (MacroState, "") or (None, reason the macro cannot run)
+    """
+    world = state.world_map
+    sailor_id, position = sailor.sailor_id, sailor.position
+    target_resource_id = None
+
+    if action.action_type in MOVE_TYPES:
+        if action.quantity > MACRO_MAX_STEPS:
+            return None, f"Macro needs {action.quantity} turns (limit {MACRO_MAX_STEPS})"
+        # The whole line must be walkable, not just the first tile
+        dx, dy = MOVE_DELTAS[action.action_type]
+        grid = world.terrain.get(position.level)
+        for i in range(1, action.quantity + 1):
+            if grid is None or not grid.is_walkable(position.x + dx * i, position.y + dy * i):
+                return None, f"Blocked after {i - 1} of {action.quantity} tiles"
+        steps = [Action(sailor_id=sailor_id, action_type=action.action_type)] * action.quantity
+
+    elif action.action_type == ActionType.GOTO:
+        if action.target_position is None:
+            return None, "GOTO requires a target position"
+        target = action.target_position
+        if not world.is_walkable(target):
+            return None, f"Target {target.to_tuple()} is not walkable"
+        goal = world.position(target.x, target.y, target.level)
+        if goal == position:
+            return None, "Already at target position"
+        route = navigation.plan_route(position, goal, state.is_traitor(sailor_id))
+        if route is None:
+            return None, f"No route to {goal.to_tuple()}"
+        steps = [Action(sailor_id=sailor_id, action_type=move) for move in route.actions]
+
+    elif action.action_type == ActionType.GATHER_NEAREST:
+        if action.resource_type is None:
+            return None, "GATHER_NEAREST requires a resource type"
+        nearest, nearest_distance = None, None
+        for resource in world.get_resources_at(position, SPATIAL_VIEW_RADIUS):
+            if resource.resource_type != action.resource_type:
+                continue
+            distance = navigation.distance(position, resource.position)
+            if distance is not None and (nearest_distance is None or distance < nearest_distance):
+                nearest, nearest_distance = resource, distance
+        if nearest is None:
+            return None, f"No reachable {action.resource_type.value} in sight"
+        steps = [Action(sailor_id=sailor_id, action_type=move)
+                 for move in navigation.path(position, nearest.position)]
+        steps.append(Action(sailor_id=sailor_id, action_type=ActionType.GATHER_RESOURCE,
+                            target_resource_id=nearest.resource_id))
+        target_resource_id = nearest.resource_id
+
+    else:
+        return None, f"{action.action_type.value} is not a macro action"
+
+    if len(steps) > MACRO_MAX_STEPS:
+        return None, f"Macro needs {len(steps)} turns (limit {MACRO_MAX_STEPS})"
+
+    return MacroState(
+        action=action,
+        steps=deque(steps),
+        target_resource_id=target_resource_id,
+        energy=sailor.energy,
+        phase=state.current_phase,
+        message_count=len(state.message_history),
+        visible=_visible_sailors(state, sailor),
+    ), ""
+
+
+# ============================================================================
+# 🛑 INTERRUPTS
+# ============================================================================
+
+def macro_interrupt(state: GameState, sailor_id: str, macro: MacroState,
+                    interrupts: Collection[str]) -> Optional[str]:
+    """
+    Reason to stop a running macro after a turn (None to keep going).
+
+    Dead sailors and gathered targets always stop it; the rest only if listed
+    in interrupts. Updates the macro's reference energy, phase, messages and
+    view, so a macro started on low energy is not stopped for it.
+    """
+    sailor = state.get_sailor(sailor_id)
+    if sailor is None or not sailor.alive:
+        return "dead"
+
+    if macro.target_resource_id is not None:
+        target = state.world_map.resources.get(macro.target_resource_id)
+        if target is None or target.gathered:
+            return "target_gone"
+
+    energy, macro.energy = macro.energy, sailor.energy
+    if "low_energy" in interrupts and sailor.energy < MACRO_INTERRUPT_ENERGY <= energy:
+        return "low_energy"
+
+    phase, macro.phase = macro.phase, state.current_phase
+    if "phase_change" in interrupts and state.current_phase != phase:
+        return "phase_change"
+
+    messages = state.message_history
+    new_messages, macro.message_count = messages[macro.message_count:], len(messages)
+    if "sos" in interrupts and any(
+        message.content.startswith(SOS_PREFIX) and message.sender != sailor_id
+        for message in new_messages
+    ):
+        return "sos"
+
+    visible, macro.visible = macro.visible, _visible_sailors(state, sailor)
+    if "sailor_visible" in interrupts and macro.visible - visible:
+        return "sailor_visible"
+
+    return None
+
+
+def plan_interrupt(state: GameState, sailor_id: str, plan: PlanState,
+                   interrupts: Collection[str]) -> Optional[str]:
+    """
+    Reason to cut a plan short after a turn (None to keep going).
+
+    Only events since the plan started (or since the last check) count, so a
+    plan made while poisoned, on low energy or during a vote is not cut
+    straight away.
+    """
+    sailor = state.get_sailor(sailor_id)
+    if sailor is None or not sailor.alive:
+        return "dead"
+
+    evidence_count, plan.evidence_count = plan.evidence_count, len(state.evidence_log.all_evidence)
+    if "new_evidence" in interrupts and plan.evidence_count > evidence_count:
+        return "new_evidence"
+
+    vote_open, plan.vote_open = plan.vote_open, state.current_vote is not None
+    if "vote_called" in interrupts and plan.vote_open and not vote_open:
+        return "vote_called"
+
+    energy, plan.energy = plan.energy, sailor.energy
+    if "low_energy" in interrupts and sailor.energy < ENERGY_SOS_THRESHOLD <= energy:
+        return "low_energy"
+
+    poison_state, plan.poison_state = plan.poison_state, sailor.poison_state
+    if "poisoned" in interrupts and sailor.poison_state != poison_state and sailor.poison_state in (
+        PoisonState.EARLY_SYMPTOMS, PoisonState.SEVERE_SYMPTOMS
+    ):
+        return "poisoned"
+
+    if "target_gone" in interrupts:
+        resources = state.world_map.resources
+        for step in plan.steps:
+            if step.action_type == ActionType.GATHER_RESOURCE:
+                target = resources.get(step.target_resource_id)
+                if target is not None and target.gathered:
+                    return "target_gone"
+
+    return None
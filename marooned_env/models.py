@@ -5,11 +5,13 @@ All dataclasses for game entities, observations, and actions.
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Tuple, Set, Any
+from typing import List, Dict, Optional, Tuple, Set, Any, Mapping
 from enum import Enum
+import numpy as np
 from config import (
     MapLevel, ResourceType, SailorRole, DeathCause, PoisonState,
-    EvidenceType, ActionType, MessageType, ShipComponent, WeatherType
+    EvidenceType, ActionType, MessageType, ShipComponent, WeatherType,
+    TERRAIN_TYPES,
 )
 
 
@@ -17,12 +19,20 @@ from config import (
 # 🌍 SPATIAL MODELS
 # ============================================================================
 
-@dataclass
 class Position:
-    """3D position on the island"""
-    x: int
-    y: int
-    level: MapLevel
+    """3D position on the island (immutable, hashed by a packed int key)"""
+    __slots__ = ("x", "y", "level", "key")
+    
+    def __init__(self, x: int, y: int, level: MapLevel):
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "y", y)
+        object.__setattr__(self, "level", level)
+        object.__setattr__(self, "key", Position.pack(x, y, level))
+    
+    @staticmethod
+    def pack(x: int, y: int, level: MapLevel) -> int:
+        """Packed int key: 16 bits x, 16 bits y, 8 bits level (two's complement)"""
+        return (x & 0xFFFF) | ((y & 0xFFFF) << 16) | ((level.value & 0xFF) << 32)
     
     def distance_to(self, other: 'Position') -> float:
         """Calculate 2D distance (ignoring level difference)"""
@@ -30,20 +40,72 @@ class Position:
             return float('inf')  # Can't measure across levels
         return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2) ** 0.5
     
+    def distance_sq_to(self, other: 'Position') -> float:
+        """Squared 2D distance (inf across levels) - compare against radius ** 2"""
+        if self.level != other.level:
+            return float('inf')
+        dx = self.x - other.x
+        dy = self.y - other.y
+        return dx * dx + dy * dy
+    
     def is_adjacent(self, other: 'Position') -> bool:
         """Check if positions are adjacent (for giving items, etc.)"""
-        return self.level == other.level and self.distance_to(other) <= 1.5
+        return self.distance_sq_to(other) <= 2
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
     
     def __hash__(self):
-        return hash((self.x, self.y, self.level))
+        return self.key
     
     def __eq__(self, other):
-        return (self.x, self.y, self.level) == (other.x, other.y, other.level)
+        try:
+            return self.key == other.key
+        except AttributeError:
+            return NotImplemented
+    
+    def __repr__(self):
+        return f"Position(x={self.x!r}, y={self.y!r}, level={self.level!r})"
+    
+    def __reduce__(self):
+        return (Position, (self.x, self.y, self.level))
+    
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo):
+        return self
     
     def to_tuple(self) -> Tuple[int, int, MapLevel]:
         return (self.x, self.y, self.level)
 
 
+class PositionTable:
+    """Flyweight table of interned Positions for one map"""
+    __slots__ = ("_positions",)
+    
+    def __init__(self):
+        self._positions: Dict[int, Position] = {}
+    
+    def get(self, x: int, y: int, level: MapLevel) -> Position:
+        """Shared Position instance for (x, y, level)"""
+        position = self._positions.get(Position.pack(x, y, level))
+        if position is None:
+            position = Position(x, y, level)
+            self._positions[position.key] = position
+        return position
+    
+    def intern(self, position: Position) -> Position:
+        """Shared instance equal to position"""
+        return self._positions.setdefault(position.key, position)
+    
+    def __len__(self) -> int:
+        return len(self._positions)
+
+
 @dataclass
 class TerrainTile:
     """Single tile on the map"""
@@ -54,6 +116,110 @@ class TerrainTile:
     transition_to: Optional[MapLevel] = None
 
 
+TERRAIN_CODES: Dict[str, int] = {name: code for code, name in enumerate(TERRAIN_TYPES)}
+
+
+class TerrainGrid:
+    """
+    Terrain for one level: a uint8 terrain-type array plus a walkability bitmap.
+    
+    Rows are indexed like the old nested lists (grid[y][x]); TerrainTile objects
+    are only built when a tile is read, and are views - editing them does not
+    change the grid.
+    """
+    __slots__ = ("level", "types", "walkable", "width", "height", "_positions", "_walkable_view")
+    
+    def __init__(self, level: MapLevel, types: np.ndarray,
+                 walkable: Optional[np.ndarray] = None,
+                 positions: Optional["PositionTable"] = None):
+        self.level = level
+        self.types = np.ascontiguousarray(types, dtype=np.uint8)
+        self.walkable = (np.ones(self.types.shape, dtype=bool) if walkable is None
+                         else np.ascontiguousarray(walkable, dtype=bool))
+        self.height, self.width = self.types.shape
+        self._positions = positions
+        # memoryview over the same buffer: scalar reads without numpy overhead
+        self._walkable_view = memoryview(self.walkable)
+    
+    def __reduce__(self):
+        return (TerrainGrid, (self.level, self.types, self.walkable, self._positions))
+    
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+    
+    def is_walkable(self, x: int, y: int) -> bool:
+        """Bounds check plus bitmap lookup"""
+        return 0 <= x < self.width and 0 <= y < self.height and self._walkable_view[y, x]
+    
+    def terrain_type(self, x: int, y: int) -> str:
+        return TERRAIN_TYPES[self.types[y, x]]
+    
+    def tile(self, x: int, y: int) -> TerrainTile:
+        """Build a TerrainTile view for (x, y) - caller checks bounds"""
+        if self._positions is not None:
+            pos = self._positions.get(x, y, self.level)
+        else:
+            pos = Position(x, y, self.level)
+        return TerrainTile(pos, TERRAIN_TYPES[self.types[y, x]], walkable=bool(self.walkable[y, x]))
+    
+    def __len__(self) -> int:
+        return self.height
+    
+    def __getitem__(self, y: int) -> "TerrainRow":
+        height = self.height
+        if y < 0:
+            y += height
+        if not 0 <= y < height:
+            raise IndexError("terrain row out of range")
+        return TerrainRow(self, y)
+    
+    def __iter__(self):
+        for y in range(self.height):
+            yield TerrainRow(self, y)
+
+
+class TerrainRow:
+    """One row of a TerrainGrid; row[x] returns a TerrainTile view"""
+    __slots__ = ("grid", "y")
+    
+    def __init__(self, grid: TerrainGrid, y: int):
+        self.grid = grid
+        self.y = y
+    
+    def __len__(self) -> int:
+        return self.grid.width
+    
+    def __getitem__(self, x: int) -> TerrainTile:
+        width = self.grid.width
+        if x < 0:
+            x += width
+        if not 0 <= x < width:
+            raise IndexError("terrain column out of range")
+        return self.grid.tile(x, self.y)
+    
+    def __iter__(self):
+        for x in range(self.grid.width):
+            yield self.grid.tile(x, self.y)
+
+
+@dataclass(frozen=True)
+class LevelTransition:
+    """One end of a staircase/entrance, seen from the tile it is used on"""
+    destination: Position
+    going_up: bool  # True if destination is on a higher level
+
+
+def build_transition_table(
+    level_transitions: List[Tuple[Position, Position]]
+) -> Dict[Position, Tuple[LevelTransition, ...]]:
+    """Index level transitions by position (both ends), keeping list order"""
+    table: Dict[Position, List[LevelTransition]] = {}
+    for pos1, pos2 in level_transitions:
+        table.setdefault(pos1, []).append(LevelTransition(pos2, pos2.level.value > pos1.level.value))
+        table.setdefault(pos2, []).append(LevelTransition(pos1, pos1.level.value > pos2.level.value))
+    return {pos: tuple(transitions) for pos, transitions in table.items()}
+
+
 # ============================================================================
 # 📦 RESOURCE MODELS
 # ============================================================================
@@ -409,6 +575,32 @@ class Action:
 # 👁️ OBSERVATION MODELS
 # ============================================================================
 
+# Map glyphs shared by the observation map renderers
+RESOURCE_GLYPHS: Dict[str, str] = {
+    "wood": "🌲",
+    "metal": "⚙️",
+    "special_metal": "⭐",  # Special mountain metal
+    "apple": "🍎",
+    "berry": "🍓",
+    "mushroom": "🍄",  # Cave food
+    "crystal": "💎",  # Rare cave resource
+    "plant_fiber": "🌿",
+    "antidote_herb": "💊",  # Antidote herb
+    "antidote": "💊",
+    "poison_tablet": "☠️"
+}
+UNKNOWN_RESOURCE_GLYPH = "❓"
+TERRAIN_GLYPHS: Dict[MapLevel, str] = {
+    MapLevel.GROUND: "🟫",
+    MapLevel.MOUNTAIN: "⛰️",
+    MapLevel.CAVE: "🪨",
+}
+POISON_GLYPH = "☠️"
+BASE_CAMP_GLYPH = "🏠"
+STAIRS_UP_GLYPH = "⬆️"
+STAIRS_DOWN_GLYPH = "⬇️"
+
+
 @dataclass
 class SpatialView:
     """What a sailor can see around them"""
@@ -420,6 +612,55 @@ class SpatialView:
     visible_poison: List[Position] = field(default_factory=list)
 
 
+class ReadOnlyDict(dict):
+    """dict that refuses changes (picklable, unlike types.MappingProxyType)"""
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Observation data is read-only")
+    
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    
+    def __reduce__(self):
+        return (ReadOnlyDict, (dict(self),))
+
+
+@dataclass(frozen=True)
+class PublicSnapshot:
+    """
+    Public part of the observations for one step.
+    
+    Built once per step and shared by every sailor's Observation. Everything in it
+    is a copy of the game state, so an observation kept in a replay buffer does
+    not change as the game goes on. The copies are shared, so their containers
+    are read-only (tuples, ReadOnlyDict, frozenset); the dataclass objects in it
+    (ShipProgress, EvidenceLog, ...) must be treated as read-only too.
+    """
+    day: int
+    turn: int
+    phase: str
+    weather: Weather
+    common_inventory: Tuple[InventoryItem, ...]
+    ship_progress: ShipProgress
+    all_sailors_energy: Mapping[str, int]
+    all_sailors_poison_state: Mapping[str, PoisonState]
+    shared_knowledge: SharedKnowledge
+    evidence_log: EvidenceLog
+    recent_messages: Tuple[Message, ...]
+    current_vote: Optional[VotingSession]
+    voting_history: Tuple[VotingSession, ...]
+    
+    # Per-episode static data (the same objects every step)
+    terrain_map: Mapping[MapLevel, Any]
+    level_transitions: Tuple[Tuple[Position, Position], ...]
+    transition_table: Mapping[Position, Tuple[LevelTransition, ...]]
+    base_camp_position: Position
+    all_resources: Tuple[Resource, ...]
+    all_poison_positions: Tuple[Position, ...]
+    static_map_cache: Dict[Optional[MapLevel], str]
+    section_cache: Dict[Any, Tuple[Any, str]]
+
+
 @dataclass
 class Observation:
     """Complete observation for a sailor at a given turn"""
@@ -440,6 +681,7 @@ class Observation:
     # Full terrain map (static knowledge - all sailors have this)
     terrain_map: Dict = field(default_factory=dict)  # MapLevel -> terrain grid
     level_transitions: List[Tuple[Position, Position]] = field(default_factory=list)  # Staircase locations
+    transition_table: Dict[Position, Tuple[LevelTransition, ...]] = field(default_factory=dict)  # Position -> transitions
     base_camp_position: Optional[Position] = None
     
     # Shared information
@@ -475,17 +717,100 @@ class Observation:
     all_resources: List['Resource'] = field(default_factory=list)  # ALL resources on island
     all_poison_positions: List[Position] = field(default_factory=list)  # ALL poison positions
     
+    # Rendered static maps (level -> text, None = all levels), shared per episode
+    static_map_cache: Dict[Optional[MapLevel], str] = field(default_factory=dict, repr=False)
+    
+    # Rendered prompt sections (slot -> (version key, text)), shared per episode
+    section_cache: Dict[Any, Tuple[Any, str]] = field(default_factory=dict, repr=False)
+    
+    # Shared public snapshot these fields were taken from (None if built by hand)
+    public: Optional[PublicSnapshot] = field(default=None, repr=False)
+    
     def to_text(self) -> str:
         """Convert observation to natural language prompt for LLM"""
         # This will be the key method for feeding to language models
+        return "".join([text for _, text in self.prompt_sections()])
+    
+    def prompt_sections(self) -> List[Tuple[str, str]]:
+        """(section name, rendered text) pairs that make up to_text(), in order"""
+        return [
+            (slot if isinstance(slot, str) else slot[0], self._section(slot, version, render))
+            for slot, version, render in self._prompt_sections()
+        ]
+    
+    def _prompt_sections(self) -> List[Tuple[Any, Any, Any]]:
+        """
+        (slot, version key, renderer) for each prompt section, in prompt order.
         
+        The version key holds everything the section reads, so equal keys render
+        equal text. Sections that depend on who is looking use a per-sailor slot.
+        Log entries go into the keys as-is: observations are snapshots and are
+        not edited after they are built.
+        """
+        sid = self.sailor_id
+        view = self.spatial_view
+        energies = tuple(self.all_sailors_energy.items())
+        surroundings = (
+            self.position,
+            tuple((r.resource_id, r.resource_type, r.position, r.quantity) for r in view.visible_resources),
+            tuple(view.visible_sailors),
+            tuple(view.visible_sailor_positions.items()),
+            tuple(view.visible_poison),
+            tuple(self.all_sailor_positions.items()) if self.all_sailor_positions is not None else None,
+        )
+        return [
+            ("header", (self.day, self.turn, self.phase), self._render_header),
+            ("phase_context", self.phase, self._render_phase_context),
+            (("personal_status", sid),
+             (self.position, self.energy, self.poison_state,
+              tuple((item.resource_type, item.quantity) for item in self.backpack)),
+             self._render_personal_status),
+            (("spatial_view", sid), surroundings, self._render_spatial_view),
+            ("island_map", (self.base_camp_position, tuple(self.level_transitions)), self._render_island_map),
+            (("spatial_grid", sid), surroundings, self._render_spatial_grid),
+            ("shared_knowledge", tuple(self.shared_knowledge.discovered_resources.items()),
+             self._render_shared_knowledge),
+            ("ship_and_inventory", (self.ship_progress, tuple(self.common_inventory)),
+             self._render_ship_and_inventory),
+            ("weather", (self.weather.weather_type, self.weather.duration_days,
+                         self.weather.day_started, self.day), self._render_weather),
+            (("team_status", sid),
+             (energies, tuple(self.all_sailors_poison_state.items()), self.all_sailor_positions is not None),
+             self._render_team_status),
+            ("alerts",
+             (tuple(tuple(death.items()) for death in self.death_log[-5:]),
+              tuple(tuple(sos.items()) for sos in self.active_sos_calls)),
+             self._render_alerts),
+            ("messages", tuple(self.recent_messages[-5:]), self._render_messages),
+            ("evidence", (tuple(self.evidence_log.all_evidence), tuple(self.all_sailors_energy)),
+             self._render_evidence),
+            ("voting",
+             (self.current_vote, energies if self.current_vote is not None else None,
+              tuple(self.voting_history[-3:])),
+             self._render_voting),
+        ]
+    
+    def _section(self, slot: Any, version: Any, render) -> str:
+        """Rendered text of one prompt section, re-rendered only when its version changes"""
+        cached = self.section_cache.get(slot)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        text = render()
+        self.section_cache[slot] = (version, text)
+        return text
+    
+    def _render_header(self) -> str:
+        """Day/turn/phase banner"""
         # Enhanced header with phase context
         text = "=" * 80 + "\n"
         text += f"DAY {self.day}, TURN {self.turn}/100 - {self.phase.upper()} PHASE\n"
         text += "=" * 80 + "\n\n"
-        
+        return text
+    
+    def _render_phase_context(self) -> str:
+        """What the current phase allows"""
         # Phase-specific context and restrictions
-        text += "PHASE CONTEXT:\n"
+        text = "PHASE CONTEXT:\n"
         if self.phase == "morning":
             text += "  Location: All sailors at BASE CAMP\n"
             text += "  Allowed: Planning, discussions, voting (if called)\n"
@@ -503,9 +828,12 @@ class Observation:
             text += "  Allowed: Discussions, accusations, VOTE, SHOW_BACKPACK, review evidence\n"
             text += "  Restricted: Cannot explore or gather\n"
         text += "\n"
-        
+        return text
+    
+    def _render_personal_status(self) -> str:
+        """This sailor's position, energy, health and backpack"""
         # Personal status
-        text += f"YOUR STATUS ({self.sailor_id}):\n"
+        text = f"YOUR STATUS ({self.sailor_id}):\n"
         text += f"  Position: {self.position.to_tuple()}\n"
         text += f"  Energy: {self.energy}/100 {'⚡' * (self.energy // 20)}\n"
         text += f"  Health: {self.poison_state.value}\n"
@@ -519,9 +847,12 @@ class Observation:
         else:
             text += f"    (empty)\n"
         text += "\n"
-        
+        return text
+    
+    def _render_spatial_view(self) -> str:
+        """Visible resources, sailors and poison (plus traitor vision)"""
         # Spatial view - detailed breakdown
-        text += f"WHAT YOU SEE (within 5 tiles):\n"
+        text = f"WHAT YOU SEE (within 5 tiles):\n"
         
         # Show resources with details
         if self.spatial_view.visible_resources:
@@ -563,9 +894,12 @@ class Observation:
                     distance = abs(pos.x - self.position.x) + abs(pos.y - self.position.y)
                     text += f"    - {sid} at {pos.to_tuple()} [{distance} tiles from you]\n"
             text += "\n"
-        
+        return text
+    
+    def _render_island_map(self) -> str:
+        """Base camp, staircases and the static island map"""
         # Terrain knowledge
-        text += f"ISLAND MAP KNOWLEDGE:\n"
+        text = f"ISLAND MAP KNOWLEDGE:\n"
         text += f"  You have a complete map of the island terrain\n"
         text += f"  Base camp: {self.base_camp_position.to_tuple() if self.base_camp_position else 'Unknown'}\n"
         
@@ -589,12 +923,19 @@ class Observation:
         # PHASE 5B: Add static terrain map (call once, never changes)
         text += self.get_static_terrain_map()
         text += "\n"
-        
+        return text
+    
+    def _render_spatial_grid(self) -> str:
+        """The 11x11 grid around this sailor"""
         # PHASE 5B: Add dynamic spatial view grid (updates each move)
-        text += self.get_spatial_view_grid()
+        text = self.get_spatial_view_grid()
         text += "\n"
-        
+        return text
+    
+    def _render_shared_knowledge(self) -> str:
+        """Resources reported by the team"""
         # Shared knowledge map (what teammates have reported)
+        text = ""
         if self.shared_knowledge.discovered_resources:
             text += "SHARED RESOURCE MAP (reported by team):\n"
             for res_id, res_data in self.shared_knowledge.discovered_resources.items():
@@ -627,9 +968,12 @@ class Observation:
                 if len(resources) > 5:
                     text += f"    ... and {len(resources) - 5} more\n"
             text += "\n"
-        
+        return text
+    
+    def _render_ship_and_inventory(self) -> str:
+        """Ship components and the common inventory"""
         # Ship progress - detailed breakdown
-        text += f"SHIP PROGRESS: {self.ship_progress.total_percentage}% Total\n"
+        text = f"SHIP PROGRESS: {self.ship_progress.total_percentage}% Total\n"
         
         # Show progress bar
         filled = int(self.ship_progress.total_percentage / 4)  # 25 chars max
@@ -687,9 +1031,13 @@ class Observation:
         else:
             text += "  (empty)\n"
         text += "\n"
-        
+        return text
+    
+    def _render_weather(self) -> str:
+        """Current weather and its effects"""
         # Weather conditions
         from config import WeatherType
+        text = ""
         weather_emoji = {
             WeatherType.CLEAR: "☀️",
             WeatherType.RAIN: "⛈️",
@@ -716,9 +1064,12 @@ class Observation:
                 text += f"  Duration: {days_left} more day(s)\n"
         
         text += "\n"
-        
+        return text
+    
+    def _render_team_status(self) -> str:
+        """Energy and visible symptoms of every sailor"""
         # Team status with observable symptoms
-        text += "TEAM STATUS:\n"
+        text = "TEAM STATUS:\n"
         for sailor, energy in self.all_sailors_energy.items():
             if energy == 0:
                 # Check if we have death info
@@ -755,8 +1106,12 @@ class Observation:
             text += f"  {sailor}: {status}{poison_marker}\n"
         
         text += "\n"
-        
+        return text
+    
+    def _render_alerts(self) -> str:
+        """Recent deaths and active SOS calls"""
         # Death announcements (recent deaths with causes)
+        text = ""
         if self.death_log:
             text += "⚰️ RECENT DEATHS:\n"
             for death in self.death_log[-5:]:  # Last 5 deaths
@@ -797,15 +1152,23 @@ class Observation:
                 text += f"    ⚠️ CRITICAL - Needs food/assistance immediately!\n"
             
             text += "\n"
-        
+        return text
+    
+    def _render_messages(self) -> str:
+        """Last few messages"""
         # Recent messages
+        text = ""
         if self.recent_messages:
             text += "RECENT MESSAGES:\n"
             for msg in self.recent_messages[-5:]:
                 text += f"  [{msg.sender}]: {msg.content}\n"
             text += "\n"
-        
+        return text
+    
+    def _render_evidence(self) -> str:
+        """Recent evidence and suspicion scores"""
         # Evidence - detailed breakdown
+        text = ""
         if self.evidence_log.all_evidence:
             text += "EVIDENCE LOG (most recent):\n"
             for evidence in self.evidence_log.all_evidence[-5:]:  # Show last 5 instead of 3
@@ -834,8 +1197,12 @@ class Observation:
                 text += "    - No suspicions yet\n"
             
             text += "\n"
-        
+        return text
+    
+    def _render_voting(self) -> str:
+        """Active voting session and past votes"""
         # TIER 2 FIX: Voting session state
+        text = ""
         if self.current_vote is not None:
             living_sailors = [s for s in self.all_sailors_energy.keys() 
                             if self.all_sailors_energy[s] > 0]
@@ -874,7 +1241,6 @@ class Observation:
                 counts = vote_session.get_vote_counts()
                 text += f"    Vote counts: {counts}\n"
             text += "\n"
-        
         return text
     
     # ========================================================================
@@ -897,6 +1263,16 @@ class Observation:
         else:
             return "unknown condition"
     
+    def _get_transition_table(self) -> Dict[Position, Tuple[LevelTransition, ...]]:
+        """Position -> transitions, built from level_transitions if not provided"""
+        if not self.transition_table and self.level_transitions:
+            self.transition_table = build_transition_table(self.level_transitions)
+        return self.transition_table
+    
+    def get_transitions_at(self, position: Position) -> Tuple[LevelTransition, ...]:
+        """Level transitions usable from a position (empty tuple if none)"""
+        return self._get_transition_table().get(position, ())
+    
     def get_static_terrain_map(self, level: 'MapLevel' = None) -> str:
         """
         Static terrain map - shows ONLY terrain, stairs, and base camp.
@@ -912,6 +1288,10 @@ class Observation:
         
         # If no level specified, show all three levels
         if level is None:
+            cached = self.static_map_cache.get(None)
+            if cached is not None:
+                return cached
+            
             text = f"\n{'='*60}\n"
             text += f"COMPLETE ISLAND TERRAIN MAP (All Levels)\n"
             text += f"{'='*60}\n"
@@ -923,114 +1303,20 @@ class Observation:
                 text += self._render_single_level_map(map_level)
                 text += "\n"
             
+            self.static_map_cache[None] = text
             return text
         else:
             # Show single level
             return self._render_single_level_map(level)
     
     def _render_single_level_map(self, level: 'MapLevel') -> str:
-        """Helper to render a single level map"""
-        from config import MapLevel, BASE_CAMP_POSITION
-        
-        # Get map size for this level
-        if level == MapLevel.GROUND:
-            size = (30, 30)
-            terrain_emoji = "🟫"
-        elif level == MapLevel.MOUNTAIN:
-            size = (10, 10)
-            terrain_emoji = "⛰️"
-        else:  # CAVE
-            size = (15, 15)
-            terrain_emoji = "🪨"
-        
-        width, height = size
-        
-        # Build header
-        text = f"\n{'='*60}\n"
-        text += f"STATIC TERRAIN MAP - {level.name} LEVEL ({width}×{height})\n"
-        text += f"{'='*60}\n"
-        text += "Legend: 🟫=Land | ⛰️=Mountain | 🪨=Cave | 🏠=Base | ⬆️=Up | ⬇️=Down\n"
-        text += f"{'='*60}\n\n"
-        
-        # Column headers
-        text += "   "
-        for x in range(width):
-            text += str(x % 10)
-        text += "\n"
-        
-        # Emoji mapping for resources
-        resource_emoji_map = {
-            "wood": "🌲",
-            "metal": "⚙️",
-            "special_metal": "⭐",
-            "apple": "🍎",
-            "berry": "🍓",
-            "mushroom": "🍄",  # Cave food
-            "crystal": "💎",  # Rare cave resource
-            "plant_fiber": "🌿",
-            "antidote_herb": "💊",
-            "antidote": "💊",
-            "poison_tablet": "☠️"
-        }
-        
-        # Build grid
-        for y in range(height):
-            text += f"{y:2} "
-            for x in range(width):
-                pos = Position(x, y, level)
-                
-                # Priority 1: Check for poison (highest danger warning!)
-                poison_here = any(
-                    poison_pos.x == x and poison_pos.y == y and poison_pos.level == level
-                    for poison_pos in self.all_poison_positions
-                )
-                if poison_here:
-                    text += "☠️"
-                    continue
-                
-                # Priority 2: Check for resources at this position
-                resource_here = None
-                for res in self.all_resources:
-                    if res.position.x == x and res.position.y == y and res.position.level == level:
-                        resource_here = res
-                        break
-                
-                if resource_here:
-                    emoji = resource_emoji_map.get(resource_here.resource_type.value, "❓")
-                    text += emoji
-                    continue
-                
-                # Priority 3: Base camp
-                if (x, y) == BASE_CAMP_POSITION[:2] and level == MapLevel.GROUND:
-                    text += "🏠"
-                    continue
-                
-                # Priority 4: Stairs
-                is_stairs = False
-                for pos1, pos2 in self.level_transitions:
-                    if pos == pos1:
-                        # Stairs going up or down
-                        if pos2.level.value > pos1.level.value:
-                            text += "⬆️"
-                        else:
-                            text += "⬇️"
-                        is_stairs = True
-                        break
-                    elif pos == pos2:
-                        if pos1.level.value > pos2.level.value:
-                            text += "⬆️"
-                        else:
-                            text += "⬇️"
-                        is_stairs = True
-                        break
-                
-                if not is_stairs:
-                    # Priority 5: Empty terrain
-                    text += terrain_emoji
-            
-            text += "\n"
-        
-        text += f"\n{'='*60}\n"
+        """Helper to render a single level map (cached per episode)"""
+        text = self.static_map_cache.get(level)
+        if text is None:
+            text = render_static_level_map(
+                level, self.all_resources, self.all_poison_positions, self._get_transition_table()
+            )
+            self.static_map_cache[level] = text
         return text
     
     def get_spatial_view_grid(self) -> str:
@@ -1040,7 +1326,7 @@ class Observation:
         Shows: resources, visible sailors, poison, stairs, self
         Updates every move!
         """
-        from config import SPATIAL_VIEW_RADIUS, MapLevel
+        from config import SPATIAL_VIEW_RADIUS
         
         radius = SPATIAL_VIEW_RADIUS
         cx, cy = self.position.x, self.position.y
@@ -1052,13 +1338,7 @@ class Observation:
         min_y = max(0, cy - radius)
         max_y = cy + radius
         
-        # Determine level emoji
-        if level == MapLevel.GROUND:
-            terrain_emoji = "🟫"
-        elif level == MapLevel.MOUNTAIN:
-            terrain_emoji = "⛰️"
-        else:
-            terrain_emoji = "🪨"
+        terrain_emoji = TERRAIN_GLYPHS[level]
         
         # Build header
         text = f"\n{'='*60}\n"
@@ -1066,90 +1346,32 @@ class Observation:
         text += f"Current Position: ({cx}, {cy}, {level.name})\n"
         text += f"{'='*60}\n\n"
         
+        # One (x, y) -> glyph layer, lowest priority first so later layers win:
+        # stairs < resources < poison < other sailors < self
+        view = self.spatial_view
+        cells: Dict[Tuple[int, int], str] = {}
+        for pos, transitions in self._get_transition_table().items():
+            if pos.level == level and min_x <= pos.x <= max_x and min_y <= pos.y <= max_y:
+                cells[(pos.x, pos.y)] = STAIRS_UP_GLYPH if transitions[0].going_up else STAIRS_DOWN_GLYPH
+        # Reversed so the first resource / sailor listed on a tile wins
+        for res in reversed(view.visible_resources):
+            cells[(res.position.x, res.position.y)] = RESOURCE_GLYPHS.get(
+                res.resource_type.value, UNKNOWN_RESOURCE_GLYPH
+            )
+        for p in view.visible_poison:
+            cells[(p.x, p.y)] = POISON_GLYPH
+        for sid, sailor_pos in reversed(list(view.visible_sailor_positions.items())):
+            cells[(sailor_pos.x, sailor_pos.y)] = f"{sid[0]} "
+        cells[(cx, cy)] = f"{self.sailor_id[0]} "
+        
         # Column headers (global coordinates!)
-        text += "   "
-        for x in range(min_x, max_x + 1):
-            text += f"{x:2}"
-        text += "\n"
+        rows = ["   " + "".join(f"{x:2}" for x in range(min_x, max_x + 1))]
         
         # Build grid
+        columns = range(min_x, max_x + 1)
         for y in range(min_y, max_y + 1):
-            text += f"{y:2} "
-            for x in range(min_x, max_x + 1):
-                pos = Position(x, y, level)
-                
-                # Priority rendering (highest to lowest)
-                
-                # 1. Self (highest priority)
-                if x == cx and y == cy:
-                    # Use first letter of sailor name
-                    text += f"{self.sailor_id[0]} "
-                    continue
-                
-                # 2. Other sailors
-                sailor_here = None
-                for sid, sailor_pos in self.spatial_view.visible_sailor_positions.items():
-                    if sailor_pos.x == x and sailor_pos.y == y:
-                        sailor_here = sid
-                        break
-                
-                if sailor_here:
-                    text += f"{sailor_here[0]} "
-                    continue
-                
-                # 3. Poison (high priority warning!)
-                poison_here = any(p.x == x and p.y == y for p in self.spatial_view.visible_poison)
-                if poison_here:
-                    text += "☠️"
-                    continue
-                
-                # 4. Resources
-                resource_here = None
-                for res in self.spatial_view.visible_resources:
-                    if res.position.x == x and res.position.y == y:
-                        resource_here = res
-                        break
-                
-                if resource_here:
-                    emoji_map = {
-                        "wood": "🌲",
-                        "metal": "⚙️",
-                        "special_metal": "⭐",  # Special mountain metal
-                        "apple": "🍎",
-                        "berry": "🍓",
-                        "mushroom": "🍄",  # Cave food
-                        "crystal": "💎",  # Rare cave resource
-                        "plant_fiber": "🌿",
-                        "antidote_herb": "💊",  # Antidote herb
-                        "antidote": "💊",
-                        "poison_tablet": "☠️"
-                    }
-                    text += emoji_map.get(resource_here.resource_type.value, "❓")
-                    continue
-                
-                # 5. Stairs (from shared knowledge)
-                is_stairs = False
-                for pos1, pos2 in self.level_transitions:
-                    if pos == pos1 or pos == pos2:
-                        if pos == pos1:
-                            other = pos2
-                        else:
-                            other = pos1
-                        
-                        if other.level.value > pos.level.value:
-                            text += "⬆️"
-                        else:
-                            text += "⬇️"
-                        is_stairs = True
-                        break
-                
-                if is_stairs:
-                    continue
-                
-                # 6. Empty terrain
-                text += terrain_emoji
-            
-            text += "\n"
+            rows.append(f"{y:2} " + "".join(cells.get((x, y), terrain_emoji) for x in columns))
+        text += "\n".join(rows) + "\n"
         
         # Summary
         text += f"\n{'='*60}\n"
@@ -1500,6 +1722,54 @@ class Observation:
 # 🎲 GAME STATE (Forward reference - full definition in game_state.py)
 # ============================================================================
 
+def render_static_level_map(
+    level: MapLevel,
+    resources,
+    poison_positions,
+    transition_table: Dict[Position, Tuple[LevelTransition, ...]],
+) -> str:
+    """
+    Static map text for one level.
+    
+    Builds a single (x, y) -> glyph lookup (lowest priority layer first, so
+    poison > resources > base camp > stairs) and fills the rest with terrain.
+    """
+    from config import MAP_SIZES, BASE_CAMP_POSITION
+    
+    width, height = MAP_SIZES[level]
+    cells: Dict[Tuple[int, int], str] = {}
+    
+    for pos, transitions in transition_table.items():
+        if pos.level == level:
+            cells[(pos.x, pos.y)] = STAIRS_UP_GLYPH if transitions[0].going_up else STAIRS_DOWN_GLYPH
+    if level == MapLevel.GROUND:
+        cells[BASE_CAMP_POSITION[:2]] = BASE_CAMP_GLYPH
+    # Reversed so the first resource listed on a tile wins
+    for res in reversed(resources):
+        if res.position.level == level:
+            cells[(res.position.x, res.position.y)] = RESOURCE_GLYPHS.get(
+                res.resource_type.value, UNKNOWN_RESOURCE_GLYPH
+            )
+    for pos in poison_positions:
+        if pos.level == level:
+            cells[(pos.x, pos.y)] = POISON_GLYPH
+    
+    terrain = TERRAIN_GLYPHS[level]
+    rule = '=' * 60
+    lines = [
+        f"\n{rule}",
+        f"STATIC TERRAIN MAP - {level.name} LEVEL ({width}×{height})",
+        rule,
+        "Legend: 🟫=Land | ⛰️=Mountain | 🪨=Cave | 🏠=Base | ⬆️=Up | ⬇️=Down",
+        f"{rule}\n",
+        "   " + "".join(str(x % 10) for x in range(width)),
+    ]
+    for y in range(height):
+        lines.append(f"{y:2} " + "".join(cells.get((x, y), terrain) for x in range(width)))
+    lines.append(f"\n{rule}\n")
+    return "\n".join(lines)
+
+
 @dataclass
 class GamePhase:
     """Current phase of the day"""
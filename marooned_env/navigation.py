@@ -0,0 +1,384 @@
+"""
+🏴‍☠️ MAROONED - Navigation Service
+===================================
+Per-episode BFS distance fields over each level's walkability grid.
+
+A field is built once per target and answers "how far is X from the target"
+and "which way do I step" in constant time for every tile on that level.
+Fields for the fixed landmarks (base camp, every staircase end, one tile per
+resource cluster) are kept for the whole episode; fields for other targets
+and the point-to-point paths walked from them live in small LRU caches.
+
+plan_route() joins the levels through level_transitions: a Dijkstra search
+over the staircase tiles (whose pairwise walking distances come straight
+from their landmark fields) finds the minimum-energy route between any two
+tiles on the island.
+"""
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import heapq
+import numpy as np
+
+from config import (
+    MapLevel, ActionType, BASE_CAMP_POSITION,
+    NAV_FIELD_CACHE_SIZE, NAV_PATH_CACHE_SIZE,
+    ENERGY_COST_WALK, ENERGY_COST_CLIMB_UP, ENERGY_COST_CLIMB_DOWN,
+    TRAITOR_ENERGY_MULTIPLIER,
+)
+from models import Position
+
+
+# Single-tile moves, in the order neighbours are expanded
+MOVES: Tuple[Tuple[ActionType, int, int], ...] = (
+    (ActionType.MOVE_NORTH, 0, -1),
+    (ActionType.MOVE_SOUTH, 0, 1),
+    (ActionType.MOVE_EAST, 1, 0),
+    (ActionType.MOVE_WEST, -1, 0),
+)
+
+
+class DistanceField:
+    """BFS distances to one target, plus the first move toward it from every tile"""
+    __slots__ = ("target", "distances", "toward", "_dist_view", "_toward_view")
+
+    def __init__(self, target: Position, distances: np.ndarray, toward: np.ndarray):
+        self.target = target
+        self.distances = distances  # int32 (height, width), -1 = unreachable
+        self.toward = toward        # int8 index into MOVES, -1 at target / unreachable
+        self._dist_view = memoryview(distances)
+        self._toward_view = memoryview(toward)
+
+    def distance_from(self, position: Position) -> Optional[int]:
+        """Steps from position to the target (None if unreachable or another level)"""
+        if position.level != self.target.level:
+            return None
+        height, width = self.distances.shape
+        if not (0 <= position.x < width and 0 <= position.y < height):
+            return None
+        d = self._dist_view[position.y, position.x]
+        return None if d < 0 else d
+
+    def next_move(self, position: Position) -> Optional[ActionType]:
+        """First move toward the target (None if already there or unreachable)"""
+        if self.distance_from(position) is None:
+            return None
+        move = self._toward_view[position.y, position.x]
+        return None if move < 0 else MOVES[move][0]
+
+    def walk(self, start: Position) -> Optional[List[ActionType]]:
+        """Follow the parent pointers from start to the target"""
+        d = self.distance_from(start)
+        if d is None:
+            return None
+        path = []
+        x, y = start.x, start.y
+        toward = self._toward_view
+        for _ in range(d):
+            action, dx, dy = MOVES[toward[y, x]]
+            path.append(action)
+            x += dx
+            y += dy
+        return path
+
+
+def movement_energy_cost(base_cost: int, is_traitor: bool = False) -> int:
+    """Energy for one move/climb (same rounding as MaroonedEnv)"""
+    if is_traitor:
+        return max(1, int(base_cost * TRAITOR_ENERGY_MULTIPLIER))
+    return base_cost
+
+
+@dataclass
+class Route:
+    """Minimum-energy route between two tiles, possibly across levels"""
+    start: Position
+    goal: Position
+    actions: List[ActionType]
+    energy_cost: int
+    waypoints: List[Position] = field(default_factory=list)  # Staircase tiles climbed from
+    
+    # Filled in when plan_route() is given the sailor's energy
+    return_cost: Optional[int] = None  # Energy from goal back to base camp
+    can_return: Optional[bool] = None  # Route + return leaves the sailor alive
+
+
+class NavigationService:
+    """Distance fields and cached paths for one WorldMap"""
+
+    def __init__(self, world_map, field_cache_size: int = NAV_FIELD_CACHE_SIZE,
+                 path_cache_size: int = NAV_PATH_CACHE_SIZE):
+        self.world_map = world_map
+        self.field_cache_size = field_cache_size
+        self.path_cache_size = path_cache_size
+
+        self._landmark_fields: Dict[int, DistanceField] = {}
+        self._neighbours: Dict[MapLevel, List[List[Tuple[int, int]]]] = {}
+        self._fields: "OrderedDict[int, DistanceField]" = OrderedDict()
+        self._paths: "OrderedDict[Tuple[int, int], Optional[Tuple[ActionType, ...]]]" = OrderedDict()
+
+        self.base_camp = world_map.position(*BASE_CAMP_POSITION)
+        self.landmarks: List[Position] = self._collect_landmarks()
+        self._landmark_keys = {pos.key for pos in self.landmarks}
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+
+    def _collect_landmarks(self) -> List[Position]:
+        """Base camp, both ends of every staircase, first tile of each resource cluster"""
+        landmarks = [self.base_camp]
+        for pos1, pos2 in self.world_map.level_transitions:
+            landmarks.extend((pos1, pos2))
+
+        clusters: Dict[Tuple[MapLevel, int, int], Position] = {}
+        for resource in self.world_map.resources.values():
+            if not resource.gathered:
+                clusters.setdefault(self.world_map._cell_of(resource.position), resource.position)
+        landmarks.extend(clusters.values())
+
+        # Dedupe, keep order
+        seen = set()
+        unique = []
+        for pos in landmarks:
+            if pos.key not in seen:
+                seen.add(pos.key)
+                unique.append(pos)
+        return unique
+
+    # ========================================================================
+    # FIELDS
+    # ========================================================================
+
+    def precompute(self):
+        """Build fields for every landmark up front (otherwise built on first use)"""
+        for pos in self.landmarks:
+            self.field_to(pos)
+
+    def field_to(self, target: Position) -> DistanceField:
+        """Distance field toward target (landmark fields are never evicted)"""
+        field = self._landmark_fields.get(target.key)
+        if field is not None:
+            return field
+        if target.key in self._landmark_keys:
+            field = self._landmark_fields[target.key] = self._build_field(target)
+            return field
+
+        field = self._fields.get(target.key)
+        if field is not None:
+            self._fields.move_to_end(target.key)
+            return field
+
+        field = self._build_field(target)
+        self._fields[target.key] = field
+        if len(self._fields) > self.field_cache_size:
+            self._fields.popitem(last=False)
+        return field
+
+    def _neighbours_of(self, level: MapLevel) -> List[List[Tuple[int, int]]]:
+        """Walkable neighbours of every flat cell index as (cell, move index)"""
+        neighbours = self._neighbours.get(level)
+        if neighbours is not None:
+            return neighbours
+
+        grid = self.world_map.terrain[level]
+        height, width = grid.height, grid.width
+        walkable = grid.walkable.ravel().tolist()
+        neighbours = []
+        for y in range(height):
+            for x in range(width):
+                adjacent = []
+                for move, (_, dx, dy) in enumerate(MOVES):
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < width and 0 <= ny < height and walkable[ny * width + nx]:
+                        adjacent.append((ny * width + nx, move))
+                neighbours.append(adjacent)
+        self._neighbours[level] = neighbours
+        return neighbours
+
+    def _build_field(self, target: Position) -> DistanceField:
+        """BFS outward from target over the level's walkability bitmap"""
+        grid = self.world_map.terrain[target.level]
+        height, width = grid.height, grid.width
+        distances = [-1] * (width * height)
+        toward = [-1] * (width * height)
+
+        if grid.is_walkable(target.x, target.y):
+            neighbours = self._neighbours_of(target.level)
+            start = target.y * width + target.x
+            distances[start] = 0
+            queue = deque([start])
+            while queue:
+                cell = queue.popleft()
+                d = distances[cell] + 1
+                for n, move in neighbours[cell]:
+                    if distances[n] < 0:
+                        distances[n] = d
+                        # Stepping from n back to cell is the opposite move
+                        toward[n] = move ^ 1
+                        queue.append(n)
+
+        return DistanceField(
+            target,
+            np.array(distances, dtype=np.int32).reshape(height, width),
+            np.array(toward, dtype=np.int8).reshape(height, width),
+        )
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    def distance(self, start: Position, goal: Position) -> Optional[int]:
+        """Shortest walking distance in tiles (same level only)"""
+        if start.level != goal.level:
+            return None
+        return self.field_to(goal).distance_from(start)
+
+    def distance_to_base(self, start: Position) -> Optional[int]:
+        """Shortest walking distance to base camp (ground level only)"""
+        return self.distance(start, self.base_camp)
+
+    def next_step(self, start: Position, goal: Position) -> Optional[ActionType]:
+        """First move of a shortest path (None if arrived or unreachable)"""
+        if start.level != goal.level:
+            return None
+        return self.field_to(goal).next_move(start)
+
+    def path(self, start: Position, goal: Position,
+             max_length: Optional[int] = None) -> Optional[List[ActionType]]:
+        """Shortest sequence of moves from start to goal on one level"""
+        if start.level != goal.level:
+            return None
+
+        key = (start.key, goal.key)
+        if key in self._paths:
+            self.hits += 1
+            self._paths.move_to_end(key)
+            cached = self._paths[key]
+        else:
+            self.misses += 1
+            walked = self.field_to(goal).walk(start)
+            cached = None if walked is None else tuple(walked)
+            self._paths[key] = cached
+            if len(self._paths) > self.path_cache_size:
+                self._paths.popitem(last=False)
+
+        if cached is None or (max_length is not None and len(cached) > max_length):
+            return None
+        return list(cached)
+
+    # ========================================================================
+    # MULTI-LEVEL ROUTES
+    # ========================================================================
+
+    def _portal_edges(self) -> Dict[int, List[Tuple[ActionType, Position]]]:
+        """Staircase tile -> climbs available there (first match per direction, like the env)"""
+        edges: Dict[int, List[Tuple[ActionType, Position]]] = {}
+        for pos, transitions in self.world_map.get_transition_table().items():
+            climbs = []
+            for action, going_up in ((ActionType.CLIMB_UP, True), (ActionType.CLIMB_DOWN, False)):
+                for transition in transitions:
+                    if transition.going_up == going_up:
+                        climbs.append((action, transition.destination))
+                        break
+            edges[pos.key] = climbs
+        return edges
+
+    def plan_route(self, start: Position, goal: Position, is_traitor: bool = False,
+                   energy: Optional[int] = None) -> Optional[Route]:
+        """
+        Minimum-energy route from start to goal, across levels if needed.
+        
+        Args:
+            start: Starting tile
+            goal: Target tile (any level)
+            is_traitor: Apply TRAITOR_ENERGY_MULTIPLIER to every move
+            energy: Sailor's current energy; if given, also price the trip
+                from goal back to base camp and set return_cost / can_return
+        
+        Returns:
+            Route, or None if goal cannot be reached
+        """
+        route = self._search(start, goal, is_traitor)
+        if route is None or energy is None:
+            return route
+
+        back = self._search(goal, self.base_camp, is_traitor)
+        if back is not None:
+            route.return_cost = back.energy_cost
+            # consume_energy() kills a sailor who reaches 0, so keep at least 1
+            route.can_return = route.energy_cost + back.energy_cost < energy
+        else:
+            route.can_return = False
+        return route
+
+    def _search(self, start: Position, goal: Position, is_traitor: bool) -> Optional[Route]:
+        """Dijkstra over start, staircase tiles and goal"""
+        walk = movement_energy_cost(ENERGY_COST_WALK, is_traitor)
+        climb_cost = {
+            ActionType.CLIMB_UP: movement_energy_cost(ENERGY_COST_CLIMB_UP, is_traitor),
+            ActionType.CLIMB_DOWN: movement_energy_cost(ENERGY_COST_CLIMB_DOWN, is_traitor),
+        }
+        edges = self._portal_edges()
+        portals = list(self.world_map.get_transition_table())
+        goal_field = self.field_to(goal)
+
+        # Nodes are Positions keyed by .key; the goal is the GOAL sentinel (key None)
+        GOAL = None
+        best: Dict[Optional[int], int] = {start.key: 0}
+        # node key -> (previous node, this node, climb action or None for a walk)
+        came_from: Dict[Optional[int], Tuple[Position, Optional[Position], Optional[ActionType]]] = {}
+        heap = [(0, 0, start)]
+        counter = 1
+        settled = set()
+
+        while heap:
+            cost, _, node = heapq.heappop(heap)
+            if node is GOAL:
+                break
+            if node.key in settled:
+                continue
+            settled.add(node.key)
+
+            candidates = []
+            steps = goal_field.distance_from(node)
+            if steps is not None:
+                candidates.append((cost + steps * walk, GOAL, None))
+            for portal in portals:
+                if portal.level == node.level and portal.key != node.key:
+                    steps = self.field_to(portal).distance_from(node)
+                    if steps is not None:
+                        candidates.append((cost + steps * walk, portal, None))
+            for action, destination in edges.get(node.key, ()):
+                candidates.append((cost + climb_cost[action], destination, action))
+
+            for new_cost, target, action in candidates:
+                target_key = None if target is GOAL else target.key
+                if new_cost < best.get(target_key, new_cost + 1):
+                    best[target_key] = new_cost
+                    came_from[target_key] = (node, target, action)
+                    heapq.heappush(heap, (new_cost, counter, target))
+                    counter += 1
+        else:
+            return None
+
+        hops = []
+        key = None
+        while key != start.key:
+            previous, target, action = came_from[key]
+            hops.append((previous, goal if target is GOAL else target, action))
+            key = previous.key
+        hops.reverse()
+
+        # Expand walking hops with the distance fields' parent pointers
+        actions: List[ActionType] = []
+        waypoints: List[Position] = []
+        for origin, target, action in hops:
+            if action is None:
+                actions.extend(self.field_to(target).walk(origin))
+            else:
+                waypoints.append(origin)
+                actions.append(action)
+
+        return Route(start, goal, actions, best[None], waypoints)
@@ -0,0 +1,283 @@
+"""
+🏴‍☠️ MAROONED - Token-Budgeted Prompts
+=======================================
+Builds the observation_to_prompt() text so that it fits a token budget, and
+keeps the stable prompt prefix pre-tokenized.
+
+Every prompt section (see Observation.prompt_sections) has a priority in
+config.PROMPT_SECTION_PRIORITIES. When the full prompt is over budget, sections
+are cut starting from the lowest priority: first replaced by a summary (if the
+section has one), then truncated line by line, and finally dropped. Sections at
+PROMPT_PRIORITY_REQUIRED are never cut.
+
+Token counts are cached per section text. Unchanged sections come back from
+the observation's section cache as the same strings, so a turn only tokenizes
+the sections that actually changed.
+
+PrefixTokenCache tokenizes the stable prefix of the observation_to_prompt_parts()
+layout (system prompt, instructions, island map) once per role and episode, and
+only the per-turn suffix on each call.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import (
+    PROMPT_PRIORITY_REQUIRED, PROMPT_SECTION_PRIORITIES,
+    PROMPT_TOKEN_CACHE_SIZE, PROMPT_PREFIX_CACHE_SIZE,
+)
+from models import Observation
+from llm_interface import ACTION_INSTRUCTIONS, get_system_prompt, observation_to_prompt_parts
+
+
+# The instructions as they follow the observation in observation_to_prompt()
+INSTRUCTIONS_SECTION = "\n" + ACTION_INSTRUCTIONS
+
+# Appended to a section that was cut short
+TRUNCATED_MARKER = "  ... (truncated to fit context)\n\n"
+
+
+# ============================================================================
+# ✂️ SECTION SUMMARIES
+# ============================================================================
+
+def _summarize_island_map(text: str) -> str:
+    """Keep base camp and the staircases, drop the full terrain map"""
+    knowledge = text.split("\n\n", 1)[0]
+    return knowledge + "\n  (Full island map omitted to fit context)\n\n"
+
+
+def _summarize_shared_knowledge(text: str) -> Optional[str]:
+    """Keep the per-type summary (top 5 each), drop the full list of reports"""
+    start = text.find("SHARED RESOURCE MAP (discovered by team)")
+    return text[start:] if start > 0 else None
+
+
+def _summarize_evidence(text: str) -> Optional[str]:
+    """Keep the suspicion scores, drop the individual evidence entries"""
+    start = text.find("  SUSPICION SCORES:")
+    return "EVIDENCE LOG (summary):\n" + text[start:] if start >= 0 else None
+
+
+# Section name -> section text -> shorter text (None if it cannot be summarized)
+SECTION_SUMMARIES: Dict[str, Callable[[str], Optional[str]]] = {
+    "island_map": _summarize_island_map,
+    "shared_knowledge": _summarize_shared_knowledge,
+    "evidence": _summarize_evidence,
+}
+
+
+def token_encoder(tokenizer) -> Callable[[str], List[int]]:
+    """Text -> token IDs (no special tokens added) for a HF tokenizer or a tiktoken encoding"""
+    try:
+        tokenizer.encode("", add_special_tokens=False)
+    except TypeError:
+        return lambda text: list(tokenizer.encode(text))
+    return lambda text: list(tokenizer.encode(text, add_special_tokens=False))
+
+
+def token_counter(tokenizer) -> Callable[[str], int]:
+    """Text -> token count for a HF tokenizer, a tiktoken encoding, or a counting function"""
+    if not hasattr(tokenizer, "encode"):
+        return tokenizer
+    encode = token_encoder(tokenizer)
+    return lambda text: len(encode(text))
+
+
+# ============================================================================
+# 🧮 PROMPT BUILDER
+# ============================================================================
+
+@dataclass
+class BudgetedPrompt:
+    """A prompt fitted to a token budget, with the tokens each section used"""
+    text: str
+    budget: int
+    total_tokens: int
+    section_tokens: Dict[str, int]  # Section name -> tokens used (0 if dropped)
+    cut_sections: Dict[str, str]    # Section name -> "summarized" / "truncated" / "dropped"
+
+
+class PromptBuilder:
+    """
+    observation_to_prompt() with a token budget.
+
+    Usage:
+        builder = PromptBuilder(tokenizer, budget=12000)
+        prompt = builder.build(obs)
+        prompt.text, prompt.total_tokens, prompt.section_tokens
+
+    The total is the sum of the per-section counts. Every section ends with a
+    newline, so tokenizers do not merge tokens across section boundaries.
+    """
+
+    def __init__(self, tokenizer, budget: int,
+                 priorities: Optional[Dict[str, int]] = None,
+                 token_cache_size: int = PROMPT_TOKEN_CACHE_SIZE):
+        self.count_tokens = token_counter(tokenizer)
+        self.budget = budget
+        self.priorities = dict(PROMPT_SECTION_PRIORITIES if priorities is None else priorities)
+        self.token_cache_size = token_cache_size
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def tokens(self, text: str) -> int:
+        """Token count of text (cached)"""
+        count = self._counts.get(text)
+        if count is not None:
+            self._counts.move_to_end(text)
+            self.hits += 1
+            return count
+        self.misses += 1
+        count = self.count_tokens(text)
+        self._counts[text] = count
+        if len(self._counts) > self.token_cache_size:
+            self._counts.popitem(last=False)
+        return count
+
+    def sections(self, obs: Observation) -> List[Tuple[str, str]]:
+        """(name, text) of every section of observation_to_prompt(obs), in order"""
+        return obs.prompt_sections() + [("instructions", INSTRUCTIONS_SECTION)]
+
+    def build(self, obs: Observation, budget: Optional[int] = None) -> BudgetedPrompt:
+        """Prompt for obs within budget tokens (defaults to the builder's budget)"""
+        budget = self.budget if budget is None else budget
+        sections = self.sections(obs)
+        texts = [text for _, text in sections]
+        counts = [self.tokens(text) for text in texts]
+        total = sum(counts)
+        cut = {}
+
+        if total > budget:
+            # Lowest priority first; among equals, the later section goes first
+            order = sorted(
+                (i for i, (name, _) in enumerate(sections)
+                 if counts[i] and self.priorities.get(name, 0) < PROMPT_PRIORITY_REQUIRED),
+                key=lambda i: (self.priorities.get(sections[i][0], 0), -i),
+            )
+            for i in order:
+                if total <= budget:
+                    break
+                name = sections[i][0]
+                text, how = self._shrink(name, texts[i], counts[i] - (total - budget))
+                count = self.tokens(text) if text else 0
+                total += count - counts[i]
+                texts[i], counts[i] = text, count
+                cut[name] = how
+            if total > budget:
+                raise ValueError(
+                    f"Prompt needs {total} tokens after cutting every optional section, "
+                    f"over the budget of {budget}"
+                )
+
+        return BudgetedPrompt(
+            text="".join(texts),
+            budget=budget,
+            total_tokens=total,
+            section_tokens={name: count for (name, _), count in zip(sections, counts)},
+            cut_sections=cut,
+        )
+
+    def _shrink(self, name: str, text: str, allowed: int) -> Tuple[str, str]:
+        """Shorter version of a section that fits allowed tokens, and how it was cut"""
+        if allowed > 0:
+            summarize = SECTION_SUMMARIES.get(name)
+            summary = summarize(text) if summarize else None
+            if summary is not None:
+                if self.tokens(summary) <= allowed:
+                    return summary, "summarized"
+                text = summary
+            truncated = self._truncate(text, allowed)
+            if truncated is not None:
+                return truncated, "truncated"
+        return "", "dropped"
+
+    def _truncate(self, text: str, allowed: int) -> Optional[str]:
+        """Leading lines of text plus TRUNCATED_MARKER within allowed tokens (None if none fit)"""
+        lines = text.splitlines(keepends=True)
+        room = allowed - self.tokens(TRUNCATED_MARKER)
+        keep = 0
+        for line in lines:
+            room -= self.tokens(line)
+            if room < 0:
+                break
+            keep += 1
+        # Per-line counts are an estimate; back off until the joined text fits
+        while keep > 0:
+            truncated = "".join(lines[:keep]) + TRUNCATED_MARKER
+            if self.tokens(truncated) <= allowed:
+                return truncated
+            keep -= 1
+        return None
+
+
+# ============================================================================
+# ♻️ STABLE PREFIX TOKENS
+# ============================================================================
+
+@dataclass
+class PromptTokens:
+    """Token IDs of a full prompt; the first prefix_length IDs are the stable prefix"""
+    input_ids: List[int]
+    prefix_length: int
+
+
+class PrefixTokenCache:
+    """
+    Pre-tokenized stable prompt prefixes for one tokenizer.
+
+    Usage:
+        prefixes = PrefixTokenCache(tokenizer)
+        tokens = prefixes.encode(role, obs)
+        model.generate(torch.tensor([tokens.input_ids]), ...)
+
+    If the tokenizer has a chat template, the prompt is the system + user chat
+    with the generation prompt added; otherwise it is the system prompt, a
+    blank line and the user prompt. The prefix ends on a line break, so
+    tokenizing the prefix and the suffix separately gives the same IDs as
+    tokenizing the whole prompt.
+    """
+
+    def __init__(self, tokenizer, cache_size: int = PROMPT_PREFIX_CACHE_SIZE):
+        self.tokenizer = tokenizer
+        self.encode_text = token_encoder(tokenizer)
+        self.cache_size = cache_size
+        self._ids: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def split(self, role: str, obs: Observation) -> Tuple[str, str]:
+        """Full prompt text for role and obs, split into stable prefix and dynamic suffix"""
+        system = get_system_prompt(role)
+        parts = observation_to_prompt_parts(obs)
+        apply_chat_template = getattr(self.tokenizer, "apply_chat_template", None)
+        if apply_chat_template is None:
+            return system + "\n\n" + parts.prefix, parts.suffix
+        text = apply_chat_template(
+            [{"role": "system", "content": system}, {"role": "user", "content": parts.text}],
+            tokenize=False, add_generation_prompt=True,
+        )
+        cut = text.index(parts.prefix) + len(parts.prefix)
+        return text[:cut], text[cut:]
+
+    def prefix_ids(self, prefix: str) -> Tuple[int, ...]:
+        """Token IDs of a prefix (tokenized once, then cached)"""
+        ids = self._ids.get(prefix)
+        if ids is not None:
+            self._ids.move_to_end(prefix)
+            self.hits += 1
+            return ids
+        self.misses += 1
+        ids = tuple(self.encode_text(prefix))
+        self._ids[prefix] = ids
+        if len(self._ids) > self.cache_size:
+            self._ids.popitem(last=False)
+        return ids
+
+    def encode(self, role: str, obs: Observation) -> PromptTokens:
+        """Token IDs of the full prompt, tokenizing only the suffix if the prefix is cached"""
+        prefix, suffix = self.split(role, obs)
+        ids = self.prefix_ids(prefix)
+        return PromptTokens(input_ids=[*ids, *self.encode_text(suffix)], prefix_length=len(ids))
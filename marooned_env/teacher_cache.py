@@ -0,0 +1,172 @@
+"""
+🏴‍☠️ MAROONED - Teacher Verdict Cache
+=====================================
+Content-addressed cache of teacher replies, in front of
+teacher_validate_student_output() and TeacherClient (pass cache=...).
+
+Untrained students repeat the same outputs ("MOVING NORTH", "GATHER wood", ...)
+in the same situations, and each one costs a full teacher call. The key hashes:
+
+- the student output with its free-text REASONING blanked out and whitespace
+  normalized (labels, ACTION and MESSAGE lines are kept as written, since
+  their format is what the teacher judges)
+- the parts of observation_to_condensed_prompt() a verdict depends on:
+  phase, position, energy (exact up to ENERGY_SOS_THRESHOLD, in steps of 10
+  above), backpack size, the visible resources and sailors shown, ship
+  progress and common inventory - but not the day and turn numbers
+- the legal-action list (if given) and the teacher model
+
+Values are the teacher's raw reply. A hit is parsed again for the asking
+sailor, so one verdict serves every sailor in the same situation. Failed
+teacher calls are never cached.
+
+Two tiers: an in-process LRU, and an optional diskcache directory that
+survives restarts (entries found there are promoted to memory).
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from config import (
+    ENERGY_SOS_THRESHOLD, TEACHER_CACHE_SIZE, TEACHER_CACHE_DIR, TEACHER_CACHE_DISK_LIMIT,
+)
+from models import Observation
+from llm_interface import TEACHER_MODEL_NAME
+
+
+_REASONING = re.compile(r'^(\s*REASONING\s*:).*$', re.IGNORECASE | re.MULTILINE)
+_SPACES = re.compile(r'[ \t]+')
+
+
+def normalize_student_output(student_response: str) -> str:
+    """Student output as far as the verdict goes: REASONING text blanked, whitespace collapsed"""
+    text = _REASONING.sub(r'\1 ...', student_response)
+    lines = (_SPACES.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def verdict_fields(observation: Observation) -> Dict[str, Any]:
+    """The parts of the condensed teacher prompt that can change a verdict"""
+    energy = observation.energy
+    if energy > ENERGY_SOS_THRESHOLD:  # CALL_SOS is legal at the threshold itself
+        energy = f"{energy // 10 * 10}+"
+    view = observation.spatial_view
+    return {
+        "phase": observation.phase,
+        "position": str(observation.position),
+        "energy": energy,
+        "backpack": len(observation.backpack),
+        # Same selection as observation_to_condensed_prompt()
+        "resources": [res.resource_id for res in list(view.visible_resources)[:5]],
+        "resource_count": len(view.visible_resources),
+        "sailors": list(view.visible_sailors)[:3],
+        "ship": observation.ship_progress.total_percentage,
+        "inventory": [(item.resource_type.value, item.quantity) for item in observation.common_inventory[:4]],
+    }
+
+
+class TeacherVerdictCache:
+    """In-memory LRU of teacher replies with an optional on-disk tier"""
+
+    def __init__(self, directory: Optional[str] = TEACHER_CACHE_DIR,
+                 max_entries: int = TEACHER_CACHE_SIZE,
+                 disk_size_limit: int = TEACHER_CACHE_DISK_LIMIT):
+        """
+        Args:
+            directory: diskcache directory for the persistent tier (None = memory only)
+            max_entries: Verdicts kept in memory
+            disk_size_limit: Bytes the persistent tier may use
+        """
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+        self._disk = None
+        if directory is not None:
+            import diskcache  # Only needed for the persistent tier
+            self._disk = diskcache.Cache(os.path.expanduser(directory), size_limit=disk_size_limit)
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0  # Teacher latency the hits did not have to wait for
+
+    def key(self, student_response: str, observation: Observation,
+            legal_actions: Optional[Sequence[str]] = None, model: str = TEACHER_MODEL_NAME) -> str:
+        """Content hash of everything the verdict depends on"""
+        content = json.dumps([
+            model,
+            normalize_student_output(student_response),
+            verdict_fields(observation),
+            list(legal_actions) if legal_actions is not None else None,
+        ], sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached teacher reply for key (None on a miss)"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+        else:
+            entry = self._disk.get(key) if self._disk is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, tuple(entry))
+            self.disk_hits += 1
+
+        teacher_response, latency = entry
+        self.saved_seconds += latency
+        return teacher_response
+
+    def put(self, key: str, teacher_response: str, latency: float):
+        """Store a teacher reply and how long the teacher took to give it"""
+        entry = (teacher_response, latency)
+        self._remember(key, entry)
+        if self._disk is not None:
+            self._disk.set(key, entry)
+
+    def _remember(self, key: str, entry: Tuple[str, float]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Hit counts per tier, hit rate, and teacher latency saved"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "saved_seconds": self.saved_seconds,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk) if self._disk is not None else 0,
+        }
+
+    def clear(self):
+        """Drop every cached verdict (both tiers) and reset the stats"""
+        self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+        self.memory_hits = self.disk_hits = self.misses = 0
+        self.saved_seconds = 0.0
+
+    def close(self):
+        """Close the persistent tier"""
+        if self._disk is not None:
+            self._disk.close()
+
+    def __enter__(self) -> "TeacherVerdictCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,470 @@
+"""
+🏴‍☠️ MAROONED - Batched Teacher Client
+======================================
+Concurrent alternative to teacher_validate_student_output() for validating a
+whole turn (or a whole batch of games) at once.
+
+One httpx.AsyncClient keeps a pool of keep-alive connections to the vLLM
+server, and up to max_concurrency validations are in flight at the same time,
+so the server's continuous batching has several requests to work on instead
+of one round trip per sailor. Prompts and result parsing are the same as
+teacher_validate_student_output() (build_teacher_payload /
+parse_teacher_response), and results come back in request order.
+
+    with TeacherClient() as teacher:
+        results = teacher.validate_batch([
+            (responses[sid], observations[sid], sid) for sid in env.agents_to_act()
+        ])
+
+From code that already runs an event loop (e.g. a notebook cell), await
+avalidate_batch() instead of calling validate_batch(). With a
+TeacherVerdictCache (cache=...), cached verdicts skip the request entirely.
+
+Several teacher replicas can share the load (url=[...]):
+
+- each request goes to the available endpoint with the fewest requests
+  outstanding
+- a request still unanswered after its endpoint's p95 latency is hedged: a
+  duplicate goes to another endpoint and the first answer wins (the other is
+  cancelled)
+- a failed request (HTTP error or a reply that is not a chat completion) is
+  retried on an endpoint it has not tried yet
+- after TEACHER_BREAKER_FAILURES failures in a row an endpoint's circuit
+  breaker opens: it gets no traffic for TEACHER_BREAKER_COOLDOWN seconds,
+  then one trial request decides whether it is back
+- with no endpoint left, the local rules (local_validator.local_check) settle
+  what they can against the request's legal_actions (tier "fallback"), and
+  the rest get the usual WAIT fallback without waiting for a timeout
+
+client.stats has hedge and fallback counts and, per endpoint, breaker state,
+p50/p95 and a latency histogram (TEACHER_LATENCY_BUCKETS).
+
+With stream=True replies are streamed, and the connection is closed as soon as
+VALID, ACTION, PENALTY and CRITIQUE are settled (early_stop.FieldWatcher): the
+CRITIQUE once a blank line follows it, as parse_teacher_response() reads it.
+The teacher stops generating there, and the reply parses (and is cached) the
+same as the full one.
+"""
+
+import asyncio
+import bisect
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from config import (
+    TEACHER_MAX_CONCURRENCY, TEACHER_TIMEOUT, TEACHER_HEDGE_MIN_SAMPLES, TEACHER_LATENCY_WINDOW,
+    TEACHER_LATENCY_BUCKETS, TEACHER_BREAKER_FAILURES, TEACHER_BREAKER_COOLDOWN,
+)
+from models import Observation
+from teacher_cache import TeacherVerdictCache
+from local_validator import local_check, local_result
+from early_stop import FieldWatcher, TEACHER_FIELDS
+from llm_interface import (
+    VLLM_API_URL, TEACHER_MODEL_NAME, TEACHER_ERROR_RESPONSE, TEACHER_UNAVAILABLE_RESPONSE,
+    build_teacher_payload, parse_teacher_response,
+)
+
+
+# (student_response, observation, sailor_id) or (..., legal_actions)
+ValidationRequest = Union[
+    Tuple[str, Observation, str],
+    Tuple[str, Observation, str, Optional[Sequence[str]]],
+]
+
+
+# Reading a reply that is not a chat completion (e.g. {"error": ...} with status 200)
+MALFORMED_REPLY_ERRORS = (KeyError, IndexError, TypeError, ValueError, AttributeError)
+
+
+class TeacherReplyError(Exception):
+    """An endpoint answered, but with a body that is not a chat completion"""
+
+
+# ============================================================================
+# 🛰️ TEACHER ENDPOINTS
+# ============================================================================
+
+class TeacherEndpoint:
+    """One teacher replica: outstanding requests, recent latencies and circuit breaker"""
+
+    def __init__(self, url: str, breaker_failures: int = TEACHER_BREAKER_FAILURES,
+                 breaker_cooldown: float = TEACHER_BREAKER_COOLDOWN):
+        self.url = url
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.down_since: Optional[float] = None  # time.monotonic() when the breaker opened
+
+        self.latencies: Deque[float] = deque(maxlen=TEACHER_LATENCY_WINDOW)
+        self.histogram = [0] * (len(TEACHER_LATENCY_BUCKETS) + 1)  # Last bucket: slower than every bound
+
+    @property
+    def state(self) -> str:
+        """"up", "down", or "trial" (cooldown over: one request may test it)"""
+        if self.down_since is None:
+            return "up"
+        if time.monotonic() - self.down_since < self.breaker_cooldown:
+            return "down"
+        return "trial"
+
+    def available(self) -> bool:
+        """Whether a new request may be sent here"""
+        state = self.state
+        return state == "up" or (state == "trial" and self.outstanding == 0)
+
+    def record_success(self, latency: float):
+        self.consecutive_failures = 0
+        self.down_since = None
+        self.latencies.append(latency)
+        self.histogram[bisect.bisect_left(TEACHER_LATENCY_BUCKETS, latency)] += 1
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.down_since is not None or self.consecutive_failures >= self.breaker_failures:
+            self.down_since = time.monotonic()  # A failed trial starts another cooldown
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile (0 < q <= 1) over the recent window (None before any success)"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging a request sent here (None until p95 is known)"""
+        if len(self.latencies) < TEACHER_HEDGE_MIN_SAMPLES:
+            return None
+        return self.percentile(0.95)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state, load, p50/p95 and latency histogram (upper bound -> count)"""
+        return {
+            "url": self.url,
+            "state": self.state,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "histogram": dict(zip(TEACHER_LATENCY_BUCKETS + (math.inf,), self.histogram)),
+        }
+
+
+# ============================================================================
+# 🧑‍🏫 TEACHER CLIENT
+# ============================================================================
+
+class TeacherClient:
+    """Pooled, concurrent client for one or more vLLM teacher replicas"""
+
+    def __init__(
+        self,
+        url: Union[str, Sequence[str]] = VLLM_API_URL,
+        model: str = TEACHER_MODEL_NAME,
+        max_concurrency: int = TEACHER_MAX_CONCURRENCY,
+        timeout: float = TEACHER_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[TeacherVerdictCache] = None,
+        local_fallback: bool = True,
+        breaker_failures: int = TEACHER_BREAKER_FAILURES,
+        breaker_cooldown: float = TEACHER_BREAKER_COOLDOWN,
+        stream: bool = False,
+    ):
+        """
+        Args:
+            url: OpenAI-compatible chat completions endpoint, or a list of replicas
+            model: Teacher model name sent with every request
+            max_concurrency: Most requests in flight (also the connection pool size)
+            timeout: Seconds per request
+            transport: Optional httpx transport (e.g. httpx.MockTransport for tests)
+            cache: Optional verdict cache consulted before every request
+            local_fallback: Settle outputs with the local rules when no endpoint
+                answers (only requests that come with legal_actions)
+            breaker_failures: Failures in a row that take an endpoint down
+            breaker_cooldown: Seconds an endpoint stays down before a trial request
+            stream: Stream replies and stop reading once the verdict is complete
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        urls = [url] if isinstance(url, str) else list(url)
+        if not urls:
+            raise ValueError("At least one teacher url is needed")
+        self.endpoints = [TeacherEndpoint(u, breaker_failures, breaker_cooldown) for u in urls]
+        self.url = urls[0]
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._transport = transport
+        self.cache = cache
+        self.local_fallback = local_fallback
+        self.stream = stream
+
+        self.hedges = 0      # Duplicate requests sent past an endpoint's p95
+        self.hedge_wins = 0  # Duplicates that answered first
+        self.fallbacks = 0   # Requests no endpoint answered
+        self.early_stops = 0  # Streamed replies cut off once complete
+
+        # The httpx client and semaphore belong to the event loop they were made in
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Loop used by the blocking methods, kept so pooled connections survive between calls
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ========================================================================
+    # ASYNC API
+    # ========================================================================
+
+    async def avalidate(self, student_response: str, observation: Observation, sailor_id: str,
+                        legal_actions: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Async teacher_validate_student_output() over the pooled connection"""
+        if self.cache is not None:
+            key = self.cache.key(student_response, observation, legal_actions, self.model)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return parse_teacher_response(cached, observation, sailor_id)
+
+        client, semaphore = self._connection()
+        payload = build_teacher_payload(student_response, observation, legal_actions,
+                                        model=self.model, stream=self.stream)
+
+        async with semaphore:
+            started = time.perf_counter()
+            teacher_response, error = await self._post(client, payload)
+            if teacher_response is not None and self.cache is not None:
+                self.cache.put(key, teacher_response, time.perf_counter() - started)
+
+        if teacher_response is None:
+            self.fallbacks += 1
+            # Only with legal_actions to decide legality; otherwise the WAIT fallback
+            if self.local_fallback and legal_actions is not None:
+                action, _ = local_check(student_response, observation, sailor_id, legal_commands=legal_actions)
+                if action is not None:
+                    return dict(local_result(action), tier="fallback")
+            if isinstance(error, (httpx.HTTPStatusError, TeacherReplyError)):
+                teacher_response = TEACHER_ERROR_RESPONSE
+            else:
+                teacher_response = TEACHER_UNAVAILABLE_RESPONSE
+
+        return parse_teacher_response(teacher_response, observation, sailor_id)
+
+    async def avalidate_batch(self, requests: Sequence[ValidationRequest]) -> List[Dict[str, Any]]:
+        """Validate many student outputs concurrently; results are in request order"""
+        return list(await asyncio.gather(*(self.avalidate(*request) for request in requests)))
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Hedge, fallback and early-stop counts, and TeacherEndpoint.stats per endpoint"""
+        return {
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "fallbacks": self.fallbacks,
+            "early_stops": self.early_stops,
+            "endpoints": [endpoint.stats for endpoint in self.endpoints],
+        }
+
+    async def aclose(self):
+        """Close the pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "TeacherClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    # ========================================================================
+    # BLOCKING API
+    # ========================================================================
+
+    def run(self, coroutine):
+        """
+        Run a coroutine (e.g. one that awaits this client) on the client's own
+        event loop, so pooled connections are reused between calls.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            coroutine.close()
+            raise RuntimeError("An event loop is already running here: await the a* methods instead")
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coroutine)
+
+    def validate_batch(self, requests: Sequence[ValidationRequest]) -> List[Dict[str, Any]]:
+        """Blocking avalidate_batch() (not from inside a running event loop)"""
+        return self.run(self.avalidate_batch(requests))
+
+    def validate(self, student_response: str, observation: Observation, sailor_id: str,
+                 legal_actions: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Blocking avalidate(): a drop-in for teacher_validate_student_output() that reuses connections"""
+        return self.run(self.avalidate(student_response, observation, sailor_id, legal_actions))
+
+    def close(self):
+        """Close the pooled connections and the client's own event loop"""
+        if self._loop is not None:
+            if self._client_loop is self._loop:
+                self._loop.run_until_complete(self.aclose())
+            # Finish streams left open by early stops before the loop goes away
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+            self._loop = None
+
+    def __enter__(self) -> "TeacherClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ========================================================================
+    # INTERNALS
+    # ========================================================================
+
+    def _connection(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        """httpx client and concurrency limit for the running event loop (made on first use)"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            # Room for one hedged duplicate per request when there are replicas to hedge to
+            connections = self.max_concurrency * (2 if len(self.endpoints) > 1 else 1)
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+                transport=self._transport,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._client_loop = loop
+        return self._client, self._semaphore
+
+    def _pick(self, tried: Sequence[TeacherEndpoint]) -> Optional[TeacherEndpoint]:
+        """Available endpoint not tried yet with the fewest requests outstanding"""
+        candidates = [e for e in self.endpoints if e not in tried and e.available()]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda e: (e.outstanding, e.requests))
+
+    def _launch(self, client: httpx.AsyncClient, endpoint: TeacherEndpoint,
+                payload: Dict[str, Any]) -> "asyncio.Task[str]":
+        # Counted before the task runs, so requests started together spread out
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        return asyncio.ensure_future(self._send(client, endpoint, payload))
+
+    async def _send(self, client: httpx.AsyncClient, endpoint: TeacherEndpoint,
+                    payload: Dict[str, Any]) -> str:
+        """One request to one endpoint; updates its latency stats and breaker"""
+        started = time.perf_counter()
+        try:
+            if self.stream:
+                teacher_response = await self._read_stream(client, endpoint.url, payload)
+            else:
+                response = await client.post(endpoint.url, json=payload)
+                response.raise_for_status()
+                teacher_response = response.json()["choices"][0]["message"]["content"].strip()
+        except httpx.HTTPStatusError as e:
+            print(f"⚠️  Teacher API error: {e} - {e.response.text[:200]}")
+            endpoint.record_failure()
+            raise
+        except httpx.HTTPError as e:
+            print(f"⚠️  Teacher API error ({endpoint.url}): {e!r}")
+            endpoint.record_failure()
+            raise
+        except MALFORMED_REPLY_ERRORS as e:
+            # Counts against the breaker and fails over like an HTTP error
+            print(f"⚠️  Teacher API error ({endpoint.url}): malformed reply {e!r}")
+            endpoint.record_failure()
+            raise TeacherReplyError(f"Malformed reply from {endpoint.url}: {e!r}") from e
+        finally:
+            endpoint.outstanding -= 1
+        endpoint.record_success(time.perf_counter() - started)
+        return teacher_response
+
+    async def _read_stream(self, client: httpx.AsyncClient, url: str, payload: Dict[str, Any]) -> str:
+        """Read a streamed (SSE) reply until the verdict is complete or the stream ends"""
+        watcher = FieldWatcher(TEACHER_FIELDS)
+        async with client.stream("POST", url, json=payload) as response:
+            if response.is_error:
+                await response.aread()  # For the error message
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0]["delta"].get("content") or ""
+                if watcher.feed(delta):
+                    # Leaving the block closes the connection, which aborts generation
+                    self.early_stops += 1
+                    break
+        return watcher.answer
+
+    async def _post(self, client: httpx.AsyncClient,
+                    payload: Dict[str, Any]) -> Tuple[Optional[str], Optional[Exception]]:
+        """
+        Send payload to the least busy endpoint, hedging past its p95 and failing
+        over to untried endpoints on errors.
+
+        Returns:
+            (teacher reply, None), or (None, last error) when no endpoint answered
+        """
+        tried: List[TeacherEndpoint] = []
+        pending: Dict["asyncio.Task[str]", TeacherEndpoint] = {}
+        hedge_tasks = set()
+        hedged = False
+        delay = None
+        error: Optional[Exception] = None
+        try:
+            while True:
+                if not pending:
+                    endpoint = self._pick(tried)
+                    if endpoint is None:
+                        return None, error
+                    tried.append(endpoint)
+                    pending[self._launch(client, endpoint, payload)] = endpoint
+                    delay = None if hedged else endpoint.hedge_delay()
+
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Slower than this endpoint's p95: race a duplicate elsewhere (once per request)
+                    hedged = True
+                    delay = None
+                    backup = self._pick(tried)
+                    if backup is not None:
+                        tried.append(backup)
+                        task = self._launch(client, backup, payload)
+                        pending[task] = backup
+                        hedge_tasks.add(task)
+                        self.hedges += 1
+                    continue
+
+                for task in done:
+                    del pending[task]
+                    try:
+                        teacher_response = task.result()
+                    except (httpx.HTTPError, TeacherReplyError) as e:
+                        error = e
+                        continue
+                    if task in hedge_tasks:
+                        self.hedge_wins += 1
+                    return teacher_response, None
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
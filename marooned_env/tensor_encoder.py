@@ -0,0 +1,297 @@
+"""
+🏴‍☠️ MAROONED - Tensor Observation Encoder
+==========================================
+Turns observations into fixed-shape NumPy arrays for value/critic heads and
+scripted baselines that do not need the text prompt.
+
+Every encoding is a dict with:
+    planes:  float32 (levels, channels, height, width) - one stack of channel
+             planes per level (GROUND, MOUNTAIN, CAVE), zero-padded to the
+             largest level
+    scalars: float32 (features,) - personal status, inventories, ship, clock
+             and one block per sailor
+
+PLANE_CHANNELS and SCALAR_FEATURES name every channel/feature. The terrain,
+stairs and base camp planes are the same all episode and are built once.
+Dead sailors get all-zero planes (their observation carries no map).
+
+encode() reads an Observation. encode_state() reads the GameState directly
+and gives the same arrays for every sailor without building observations.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from config import (
+    PoisonState, TERRAIN_TYPES, DAILY_PHASES,
+    MAP_SIZES, BASE_CAMP_POSITION, SPATIAL_VIEW_RADIUS,
+    MAX_ENERGY, MAX_DAYS, TURNS_PER_DAY,
+)
+from models import Observation, Position
+from batched_env import (
+    LEVELS, LEVEL_INDEX, RESOURCE_TYPES, RESOURCE_INDEX,
+    SHIP_COMPONENT_ORDER, POISON_STATES, POISON_STATE_INDEX,
+)
+from game_state import GameState
+
+
+# ============================================================================
+# 🔢 LAYOUT
+# ============================================================================
+
+PLANE_HEIGHT = max(height for _, height in MAP_SIZES.values())
+PLANE_WIDTH = max(width for width, _ in MAP_SIZES.values())
+
+# Static channels (same all episode) come first
+PLANE_CHANNELS: Tuple[str, ...] = (
+    *(f"terrain_{name}" for name in TERRAIN_TYPES),
+    "walkable",
+    "stairs_up",
+    "stairs_down",
+    "base_camp",
+    *(f"resource_{rt.value}" for rt in RESOURCE_TYPES),  # Visible quantity (poison tablets: count)
+    "self",
+    "sailors",  # Other living sailors the observer can see (all of them for the traitor)
+)
+CHANNEL_INDEX: Dict[str, int] = {name: i for i, name in enumerate(PLANE_CHANNELS)}
+NUM_STATIC_CHANNELS = CHANNEL_INDEX["resource_" + RESOURCE_TYPES[0].value]
+
+# Per-sailor block, repeated for each sailor slot
+SAILOR_FEATURES: Tuple[str, ...] = ("present", "alive", "energy", "suspicion", "is_self")
+
+DEFAULT_NUM_SAILORS = 5
+
+
+def scalar_features(num_sailors: int = DEFAULT_NUM_SAILORS) -> Tuple[str, ...]:
+    """Names of the scalar features, in vector order"""
+    return (
+        "energy",  # / MAX_ENERGY
+        *(f"poison_{ps.value}" for ps in POISON_STATES),
+        "traitor_view",
+        *(f"level_{level.name.lower()}" for level in LEVELS),
+        *(f"backpack_{rt.value}" for rt in RESOURCE_TYPES),
+        *(f"common_{rt.value}" for rt in RESOURCE_TYPES),
+        *(f"ship_{component.value}" for component in SHIP_COMPONENT_ORDER),  # / 100
+        "ship_total",  # / 100
+        *(f"phase_{phase}" for phase in DAILY_PHASES),
+        "day",          # / MAX_DAYS
+        "turn_of_day",  # / TURNS_PER_DAY
+        *(f"sailor{i}_{name}" for i in range(num_sailors) for name in SAILOR_FEATURES),  # suspicion / 100
+    )
+
+
+SCALAR_FEATURES: Tuple[str, ...] = scalar_features()
+_PHASE_INDEX: Dict[str, int] = {phase: i for i, phase in enumerate(DAILY_PHASES)}
+
+
+# ============================================================================
+# 🧮 ENCODER
+# ============================================================================
+
+class ObservationEncoder:
+    """
+    Fixed-shape array encodings of observations.
+
+    Usage:
+        encoder = ObservationEncoder()
+        arrays = encoder.encode(obs)                # planes (3, C, 30, 30), scalars (F,)
+        batch = encoder.encode_state(env.state)     # planes (5, 3, C, 30, 30), scalars (5, F)
+    """
+
+    def __init__(self, num_sailors: int = DEFAULT_NUM_SAILORS):
+        self.num_sailors = num_sailors
+        self.scalar_features = scalar_features(num_sailors)
+        self._offsets = {name: i for i, name in enumerate(self.scalar_features)}
+        self._static: Optional[Tuple[object, np.ndarray]] = None  # (terrain dict, planes)
+
+    @property
+    def plane_shape(self) -> Tuple[int, int, int, int]:
+        return (len(LEVELS), len(PLANE_CHANNELS), PLANE_HEIGHT, PLANE_WIDTH)
+
+    @property
+    def num_scalars(self) -> int:
+        return len(self.scalar_features)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def encode(self, obs: Observation) -> Dict[str, np.ndarray]:
+        """Arrays for one observation"""
+        alive = obs.poison_state != PoisonState.DEAD
+        if alive:
+            planes = self._static_planes(obs.terrain_map, obs._get_transition_table()).copy()
+        else:
+            planes = np.zeros(self.plane_shape, dtype=np.float32)
+        scalars = np.zeros(self.num_scalars, dtype=np.float32)
+        view = obs.spatial_view
+        if obs.all_sailor_positions is not None:
+            others = [pos for sid, pos in obs.all_sailor_positions.items() if sid != obs.sailor_id]
+        else:
+            others = list(view.visible_sailor_positions.values())
+        suspicion = _suspicion_scores(obs.evidence_log.all_evidence)
+        self._fill(
+            planes, scalars,
+            sailor_id=obs.sailor_id,
+            alive=alive,
+            position=obs.position,
+            energy=obs.energy,
+            poison_state=obs.poison_state,
+            traitor_view=obs.all_sailor_positions is not None,
+            backpack=obs.backpack,
+            resources=view.visible_resources,
+            others=others,
+            common_inventory=obs.common_inventory,
+            ship_progress=obs.ship_progress,
+            phase=obs.phase,
+            day=obs.day,
+            turn=obs.turn,
+            sailors=[(sid, energy > 0, energy, suspicion.get(sid, 0))
+                     for sid, energy in obs.all_sailors_energy.items()],
+        )
+        return {"planes": planes, "scalars": scalars}
+
+    def encode_many(self, observations: Iterable[Observation]) -> Dict[str, np.ndarray]:
+        """Stacked arrays for several observations"""
+        encoded = [self.encode(obs) for obs in observations]
+        return {
+            "planes": np.stack([e["planes"] for e in encoded]),
+            "scalars": np.stack([e["scalars"] for e in encoded]),
+        }
+
+    def encode_state(self, state: GameState,
+                     sailor_ids: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Arrays for several sailors straight from a GameState.
+
+        Equal to encoding each sailor's MaroonedEnv observation, without
+        building the observations. Defaults to every sailor, in game order.
+        """
+        world = state.world_map
+        sailor_ids = list(state.sailors) if sailor_ids is None else list(sailor_ids)
+        static = self._static_planes(world.terrain, world.get_transition_table())
+        planes = np.repeat(static[None], len(sailor_ids), axis=0)
+        scalars = np.zeros((len(sailor_ids), self.num_scalars), dtype=np.float32)
+
+        suspicion = _suspicion_scores(state.evidence_log.all_evidence)
+        everyone = [(sid, s.alive, s.energy if s.alive else 0, suspicion.get(sid, 0))
+                    for sid, s in state.sailors.items()]
+        radius_sq = SPATIAL_VIEW_RADIUS * SPATIAL_VIEW_RADIUS
+        for row, sailor_id in enumerate(sailor_ids):
+            sailor = state.sailors[sailor_id]
+            alive = sailor.alive
+            traitor = alive and state.is_traitor(sailor_id)
+            position = sailor.position
+            others, resources = [], []
+            if not alive:
+                planes[row] = 0
+            else:
+                others = [s.position for sid, s in state.sailors.items()
+                          if s.alive and sid != sailor_id
+                          and (traitor or s.position.distance_sq_to(position) <= radius_sq)]
+                resources = world.get_resources_at(position, SPATIAL_VIEW_RADIUS)
+            self._fill(
+                planes[row], scalars[row],
+                sailor_id=sailor_id,
+                alive=alive,
+                position=position,
+                energy=sailor.energy if alive else 0,
+                poison_state=sailor.poison_state if alive else PoisonState.DEAD,
+                traitor_view=traitor,
+                backpack=sailor.backpack if alive else (),
+                resources=resources,
+                others=others,
+                common_inventory=state.common_inventory,
+                ship_progress=state.ship_progress,
+                phase=state.current_phase,
+                day=state.current_day,
+                turn=state.current_turn,
+                sailors=everyone if alive else (),
+            )
+        return {"planes": planes, "scalars": scalars}
+
+    def encode_states(self, states: Sequence[GameState]) -> Dict[str, np.ndarray]:
+        """Arrays for every sailor of several games: planes (G, N, ...), scalars (G, N, F)"""
+        encoded = [self.encode_state(state) for state in states]
+        return {
+            "planes": np.stack([e["planes"] for e in encoded]),
+            "scalars": np.stack([e["scalars"] for e in encoded]),
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _static_planes(self, terrain, transition_table) -> np.ndarray:
+        """Terrain, walkable, stairs and base camp planes for the episode's map (cached)"""
+        if self._static is not None and self._static[0] is terrain:
+            return self._static[1]
+        planes = np.zeros(self.plane_shape, dtype=np.float32)
+        for level, grid in terrain.items():
+            li = LEVEL_INDEX[level]
+            h, w = grid.types.shape
+            for code in range(len(TERRAIN_TYPES)):
+                planes[li, code, :h, :w] = grid.types == code
+            planes[li, CHANNEL_INDEX["walkable"], :h, :w] = grid.walkable
+        for position, transitions in transition_table.items():
+            for transition in transitions:
+                channel = CHANNEL_INDEX["stairs_up" if transition.going_up else "stairs_down"]
+                planes[LEVEL_INDEX[position.level], channel, position.y, position.x] = 1
+        bx, by, blevel = BASE_CAMP_POSITION
+        planes[LEVEL_INDEX[blevel], CHANNEL_INDEX["base_camp"], by, bx] = 1
+        self._static = (terrain, planes)
+        return planes
+
+    def _fill(self, planes: np.ndarray, scalars: np.ndarray, *, sailor_id: str, alive: bool,
+              position: Position, energy: int, poison_state: PoisonState, traitor_view: bool,
+              backpack, resources, others: List[Position],
+              common_inventory, ship_progress, phase: str, day: int, turn: int,
+              sailors) -> None:
+        """Write the per-turn channels and the scalar vector in place"""
+        # Planes (poison tablets are ungathered resources too, with quantity 1)
+        for resource in resources:
+            pos = resource.position
+            planes[LEVEL_INDEX[pos.level], NUM_STATIC_CHANNELS + RESOURCE_INDEX[resource.resource_type],
+                   pos.y, pos.x] += resource.quantity
+        if alive:
+            planes[LEVEL_INDEX[position.level], CHANNEL_INDEX["self"], position.y, position.x] = 1
+        for pos in others:
+            planes[LEVEL_INDEX[pos.level], CHANNEL_INDEX["sailors"], pos.y, pos.x] += 1
+
+        # Scalars
+        at = self._offsets
+        scalars[at["energy"]] = energy / MAX_ENERGY
+        scalars[at["poison_healthy"] + POISON_STATE_INDEX[poison_state]] = 1
+        scalars[at["traitor_view"]] = traitor_view
+        if alive:
+            scalars[at[f"level_{LEVELS[0].name.lower()}"] + LEVEL_INDEX[position.level]] = 1
+        backpack_at = at["backpack_" + RESOURCE_TYPES[0].value]
+        for item in backpack:
+            scalars[backpack_at + RESOURCE_INDEX[item.resource_type]] += item.quantity
+        common_at = at["common_" + RESOURCE_TYPES[0].value]
+        for item in common_inventory:
+            scalars[common_at + RESOURCE_INDEX[item.resource_type]] += item.quantity
+        ship_at = at["ship_" + SHIP_COMPONENT_ORDER[0].value]
+        for i, component in enumerate(SHIP_COMPONENT_ORDER):
+            progress = ship_progress.components.get(component)
+            if progress is not None:
+                scalars[ship_at + i] = progress.progress_percentage / 100
+        scalars[at["ship_total"]] = ship_progress.total_percentage / 100
+        if phase in _PHASE_INDEX:
+            scalars[at["phase_" + DAILY_PHASES[0]] + _PHASE_INDEX[phase]] = 1
+        scalars[at["day"]] = day / MAX_DAYS
+        scalars[at["turn_of_day"]] = ((turn - 1) % TURNS_PER_DAY + 1) / TURNS_PER_DAY
+        block = len(SAILOR_FEATURES)
+        for slot, (sid, sailor_alive, sailor_energy, score) in enumerate(list(sailors)[:self.num_sailors]):
+            start = at["sailor0_present"] + slot * block
+            scalars[start:start + block] = (1, sailor_alive, sailor_energy / MAX_ENERGY,
+                                            score / 100, sid == sailor_id)
+
+
+def _suspicion_scores(evidence: Iterable) -> Dict[str, int]:
+    """Sailor -> summed evidence strength (EvidenceLog.get_suspicion_score for everyone at once)"""
+    scores: Dict[str, int] = defaultdict(int)
+    for entry in evidence:
+        scores[entry.accused_sailor] += entry.strength
+    return scores
@@ -0,0 +1,114 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import random
+import numpy as np
+from environment import MaroonedEnv
+from models import Action
+from config import ActionType, ResourceType, DeathCause
+from llm_interface import parse_llm_response, validate_action
+
+def _unchecked_by_env(space, index, sailor_id, action):
+    """Actions the env lets through that the mask leaves out (see action_mask.py)"""
+    action_type, argument = space.slots[index]
+    if action_type in (ActionType.GIVE_ITEM, ActionType.OFFER_FOOD):
+        return argument[0] == sailor_id
+    if action_type == ActionType.DEPOSIT_ITEM:
+        return action.quantity == 0
+    return action_type == ActionType.EAT_FOOD and argument == ResourceType.POISON_TABLET
+
+def _random_legal_actions(env, rng):
+    space = env.flat_action_space
+    actions = {}
+    for sid in env.sailor_names:
+        legal = np.flatnonzero(env.legal_actions(sid))
+        if len(legal):
+            actions[sid] = space.decode(int(rng.choice(list(legal))), env.state.sailors[sid])
+    return actions
+
+def test_mask_matches_execution():
+    env = MaroonedEnv(seed=11)
+    env.reset()
+    space = env.flat_action_space
+    rng = random.Random(11)
+    for _ in range(25):
+        mask = env.action_mask()
+        for row, sid in enumerate(env.sailor_names):
+            sailor = env.state.sailors[sid]
+            for index in range(space.size):
+                action = space.decode(index, sailor)
+                token = env.checkpoint()
+                success = env._execute_action(sid, action)["success"]
+                env.rollback(token)
+                env.release(token)
+                if mask[row, index]:
+                    assert success, f"{sid} {space.slots[index]} masked legal but failed"
+                elif not _unchecked_by_env(space, index, sid, action):
+                    assert not success, f"{sid} {space.slots[index]} masked illegal but succeeded"
+        env.step(_random_legal_actions(env, rng))
+    print("test_mask_matches_execution Passed")
+
+def test_commands_parse_back_to_their_slot():
+    env = MaroonedEnv(seed=4)
+    obs = env.reset()
+    space = env.flat_action_space
+    rng = random.Random(4)
+    for _ in range(30):
+        for sid in env.sailor_names:
+            sailor = env.state.sailors[sid]
+            mask = env.legal_actions(sid)
+            for index, command in zip(np.flatnonzero(mask), env.legal_commands(sid)):
+                action, error = parse_llm_response(f"ACTION: {command}", sid, sailor.position)
+                assert action is not None, f"{command}: {error}"
+                assert space.index(action) == index, command
+                if sailor.alive:
+                    assert validate_action(action, obs[sid], mask, space)[0], command
+        obs = env.step(_random_legal_actions(env, rng))[0]
+
+    alice = env.sailor_names[0]
+    mask = env.legal_actions(alice)
+    held = sum(item.quantity for item in obs[alice].backpack if item.resource_type == ResourceType.WOOD)
+    drop = Action(sailor_id=alice, action_type=ActionType.DROP_ITEM, resource_type=ResourceType.WOOD,
+                  quantity=held + 1)
+    assert not validate_action(drop, obs[alice], mask, space)[0], "Quantity above what is held"
+    message = Action(sailor_id=alice, action_type=ActionType.SEND_MESSAGE, message_content="hi")
+    assert validate_action(message, obs[alice], mask, space)[0] and env.is_legal(alice, message)
+    print("test_commands_parse_back_to_their_slot Passed")
+
+def test_mask_computed_once_per_step():
+    env = MaroonedEnv(seed=7)
+    env.reset()
+    space = env.flat_action_space
+    mask = env.action_mask()
+    assert mask.shape == (5, space.size) and mask.dtype == bool
+    assert env.action_mask() is mask and not mask.flags.writeable
+    alice = env.legal_actions("Alice")
+    # Morning at base camp: everyone can walk, call a vote and nobody can vote yet
+    assert alice[space.offsets[ActionType.WAIT]] and alice[space.offsets[ActionType.CALL_VOTE]]
+    assert not alice[space.offsets[ActionType.VOTE]:space.offsets[ActionType.USE_ANTIDOTE]].any()
+    assert not alice[space.offsets[ActionType.BUILD_SHIP]], "Nothing to build from an empty inventory"
+    wait = Action(sailor_id="Alice", action_type=ActionType.WAIT)
+    assert env.is_legal("Alice", wait)
+    assert not env.is_legal("Alice", Action(sailor_id="Alice", action_type=ActionType.VOTE, vote_target="Bob"))
+
+    env.step({"Alice": Action(sailor_id="Alice", action_type=ActionType.CALL_VOTE)})
+    after = env.action_mask()
+    assert after is not mask
+    assert after[1, space.offsets[ActionType.VOTE]:space.offsets[ActionType.USE_ANTIDOTE]].all()
+    assert not after[1, space.offsets[ActionType.CALL_VOTE]], "Vote already in progress"
+
+    env.state.kill_sailor("Bob", DeathCause.STARVATION)
+    env.step({})
+    assert not env.legal_actions("Bob").any()
+    vote_bob = space.offsets[ActionType.VOTE] + space.sailor_index["Bob"]
+    assert not env.legal_actions("Alice")[vote_bob], "Dead sailors cannot be voted for"
+
+    # Same slot layout for every episode with the same config
+    env.reset(seed=8)
+    assert env.flat_action_space is not space and env.flat_action_space.slots == space.slots
+    print("test_mask_computed_once_per_step Passed")
+
+if __name__ == "__main__":
+    test_mask_matches_execution()
+    test_commands_parse_back_to_their_slot()
+    test_mask_computed_once_per_step()
+    print("All action mask tests PASSED.")
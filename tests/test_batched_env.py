@@ -0,0 +1,119 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import numpy as np
+from environment import MaroonedEnv
+from models import Action, ActionType
+from config import SHIP_COMPONENTS, ShipComponent
+from batched_env import BatchedMaroonedEnv, BATCH_ACTIONS, BATCH_ACTION_INDEX, LEVELS
+
+
+def test_batched_matches_single_env():
+    seeds = [3, 42, 7]
+    batched = BatchedMaroonedEnv(len(seeds), seeds=seeds)
+    batched.reset()
+    envs = [MaroonedEnv(seed=seed) for seed in seeds]
+    for env in envs:
+        env.reset()
+
+    rng = np.random.default_rng(0)
+    movement_codes = [BATCH_ACTION_INDEX[a] for a in (
+        ActionType.WAIT, ActionType.MOVE_NORTH, ActionType.MOVE_SOUTH,
+        ActionType.MOVE_EAST, ActionType.MOVE_WEST, ActionType.CLIMB_UP, ActionType.CLIMB_DOWN,
+    )]
+
+    # Run past the first day boundary so daily energy processing is covered
+    for _ in range(120):
+        codes = rng.choice(movement_codes, size=(len(seeds), batched.num_sailors))
+        batched.step(codes)
+        for game, env in enumerate(envs):
+            actions = {
+                name: Action(sailor_id=name, action_type=BATCH_ACTIONS[codes[game, s]])
+                for s, name in enumerate(batched.sailor_names)
+            }
+            env.step(actions)
+
+    for game, env in enumerate(envs):
+        assert batched.day[game] == env.state.current_day
+        assert batched.turn[game] == env.state.current_turn
+        for s, name in enumerate(batched.sailor_names):
+            sailor = env.state.sailors[name]
+            x, y, level = batched.positions[game, s]
+            assert (x, y, LEVELS[level]) == (sailor.position.x, sailor.position.y, sailor.position.level)
+            assert batched.energy[game, s] == sailor.energy
+            assert batched.alive[game, s] == sailor.alive
+
+    print("test_batched_matches_single_env Passed")
+
+
+def test_batched_rewards_match_single_env():
+    seeds = [3, 42, 7]
+    batched = BatchedMaroonedEnv(len(seeds), seeds=seeds)
+    batched.reset()
+    envs = [MaroonedEnv(seed=seed) for seed in seeds]
+    for env in envs:
+        env.reset()
+
+    # Game 0: a colonist about to die of exhaustion. Game 1: the hull can be built right away.
+    colonist = next(name for name in batched.sailor_names if not envs[0].state.is_traitor(name))
+    envs[0].state.sailors[colonist].energy = 3
+    for resource_type, needed in SHIP_COMPONENTS[ShipComponent.HULL]["required_resources"].items():
+        envs[1].state.add_to_common_inventory(resource_type, needed)
+    for game, env in enumerate(envs):
+        batched._load_game(game, env.state)
+
+    rng = np.random.default_rng(1)
+    movement_codes = [BATCH_ACTION_INDEX[a] for a in (
+        ActionType.WAIT, ActionType.MOVE_NORTH, ActionType.MOVE_SOUTH,
+        ActionType.MOVE_EAST, ActionType.MOVE_WEST, ActionType.CLIMB_UP, ActionType.CLIMB_DOWN,
+    )]
+    for step in range(120):
+        codes = rng.choice(movement_codes, size=(len(seeds), batched.num_sailors))
+        if step == 0:
+            codes[1, :] = BATCH_ACTION_INDEX[ActionType.BUILD_SHIP]
+        _, rewards, _, _ = batched.step(codes)
+        for game, env in enumerate(envs):
+            if env.state.game_over:
+                continue
+            actions = {
+                name: Action(sailor_id=name, action_type=BATCH_ACTIONS[codes[game, s]])
+                for s, name in enumerate(batched.sailor_names)
+            }
+            _, expected, _, _, _ = env.step(actions)
+            for s, name in enumerate(batched.sailor_names):
+                assert np.isclose(rewards[game, s], expected[name], atol=1e-4), (step, game, name)
+
+    assert not envs[0].state.sailors[colonist].alive, "Death penalty was covered"
+    assert batched.ship_total[1] == envs[1].state.ship_progress.total_percentage == 30
+    assert batched.milestones_reached[1].tolist() == [True, False, False]
+    print("test_batched_rewards_match_single_env Passed")
+
+
+def test_batched_gather_and_deposit():
+    env = BatchedMaroonedEnv(1, seeds=[42])
+    env.reset()
+
+    # Put sailor 0 on the first resource tile and gather it
+    m = 0
+    env.positions[0, 0] = env.resource_pos[0, m]
+    actions = np.full((1, env.num_sailors), BATCH_ACTION_INDEX[ActionType.WAIT])
+    actions[0, 0] = BATCH_ACTION_INDEX[ActionType.GATHER_RESOURCE]
+    _, rewards, _, info = env.step(actions)
+
+    assert info["success"][0, 0]
+    assert env.resource_gathered[0, m]
+    assert env.backpack[0, 0].sum() == env.resource_quantity[0, m]
+
+    # Deposit everything at base camp
+    env.positions[0, 0] = (15, 15, 0)
+    actions[0, 0] = BATCH_ACTION_INDEX[ActionType.DEPOSIT_ITEM]
+    env.step(actions)
+    assert env.backpack[0, 0].sum() == 0
+    assert env.common_inventory[0].sum() == env.resource_quantity[0, m]
+
+    print("test_batched_gather_and_deposit Passed")
+
+
+if __name__ == "__main__":
+    test_batched_matches_single_env()
+    test_batched_rewards_match_single_env()
+    test_batched_gather_and_deposit()
@@ -0,0 +1,92 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import random
+from environment import MaroonedEnv
+from models import Action, ActionType, Position
+from config import ResourceType, ShipComponent, BASE_CAMP_POSITION
+
+
+def _fingerprint(env):
+    state = env.state
+    fields = {k: (sorted(v) if isinstance(v, set) else v) for k, v in vars(state).items() if k != "journal"}
+    return (
+        repr(fields),
+        state.rng.getstate(),
+        repr(state.world_map.resource_grid),
+        env.previous_ship_progress,
+        sorted(env.ship_milestones_reached),
+    )
+
+
+def _random_action(env, sailor_id, rng):
+    state = env.state
+    sailor = state.sailors[sailor_id]
+    action = Action(sailor_id=sailor_id, action_type=rng.choice(list(ActionType)))
+    here = state.world_map.get_resources_at(sailor.position)
+    if here:
+        action.target_resource_id = here[0].resource_id
+    action.resource_type = rng.choice([item.resource_type for item in sailor.backpack] or list(ResourceType))
+    action.target_sailor = rng.choice(list(state.sailors))
+    action.vote_target = action.target_sailor
+    action.message_content = "hello"
+    action.ship_component = rng.choice(list(ShipComponent))
+    return action
+
+
+def test_rollback_restores_state():
+    env = MaroonedEnv(seed=5)
+    env.reset()
+    rng = random.Random(1)
+
+    # Stock backpacks and camp so deposits, builds, eating and poison all happen
+    for sailor in env.state.sailors.values():
+        sailor.add_to_backpack(ResourceType.WOOD, 5)
+        sailor.add_to_backpack(ResourceType.APPLE, 3)
+        sailor.add_to_backpack(ResourceType.POISON_TABLET, 1)
+    for resource_type, quantity in [(ResourceType.WOOD, 60), (ResourceType.METAL, 40), (ResourceType.PLANT_FIBER, 40)]:
+        env.state.add_to_common_inventory(resource_type, quantity)
+
+    for turn in range(60):
+        before = _fingerprint(env)
+        token = env.checkpoint()
+        for _ in range(3):
+            for _ in range(rng.randint(1, 3)):
+                env.step({sid: _random_action(env, sid, rng) for sid in env.state.sailors})
+            env.rollback(token)
+            assert _fingerprint(env) == before, f"State not restored at turn {turn}"
+        env.release(token)
+        env.step({sid: _random_action(env, sid, rng) for sid in env.state.sailors})
+        if env.state.game_over:
+            break
+
+    print("test_rollback_restores_state Passed")
+
+
+def test_nested_checkpoints():
+    env = MaroonedEnv(seed=42)
+    env.reset()
+    alice = env.state.sailors["Alice"]
+    wait = {sid: Action(sid, ActionType.WAIT) for sid in env.state.sailors}
+
+    outer = env.checkpoint()
+    env.step({**wait, "Alice": Action("Alice", ActionType.MOVE_NORTH)})
+    moved_to = alice.position
+
+    inner = env.checkpoint()
+    env.step({**wait, "Alice": Action("Alice", ActionType.MOVE_WEST)})
+    env.rollback(inner)
+    assert alice.position == moved_to
+
+    env.rollback(outer)
+    assert alice.position == Position(*BASE_CAMP_POSITION)
+    assert alice.energy == 100
+    assert env.state.current_turn == 1
+
+    env.release(outer)
+    assert len(env.state.journal) == 0
+    print("test_nested_checkpoints Passed")
+
+
+if __name__ == "__main__":
+    test_rollback_restores_state()
+    test_nested_checkpoints()
@@ -0,0 +1,140 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import asyncio
+import json
+import httpx
+from environment import MaroonedEnv
+from config import ActionType, MapLevel
+from models import Position
+from llm_interface import parse_llm_response, parse_llm_plan, parse_teacher_response
+from early_stop import ActionStoppingCriteria, FieldWatcher, STUDENT_FIELDS, TEACHER_FIELDS
+from teacher_client import TeacherClient
+
+STUDENT = ("REASONING: Wood pile WOOD_003 is adjacent.\nACTION: GATHER WOOD_003\n"
+           "I also think that next turn I should deposit it, because the hull needs wood...")
+TEACHER = ("VALID: NO\nACTION: MOVE NORTH\nPENALTY: -0.5\nCRITIQUE: Use MOVE NORTH not MOVING NORTH.\n"
+           "Directions are commands, not verbs.\n\n"
+           "Additionally, the student could consider the energy cost of walking...")
+CRITIQUE = "Use MOVE NORTH not MOVING NORTH.\nDirections are commands, not verbs."
+
+class CharTokenizer:
+    """One token per character"""
+    def encode(self, text):
+        return [ord(c) for c in text]
+
+    def decode(self, ids, skip_special_tokens=False):
+        return "".join(chr(i) for i in ids)
+
+def test_watcher_stops_after_required_lines():
+    # The student stops on the line break after ACTION, the teacher on the blank line after CRITIQUE
+    for text, fields, end in ((STUDENT, STUDENT_FIELDS, STUDENT.index("\n", STUDENT.index("ACTION"))),
+                              (TEACHER, TEACHER_FIELDS, TEACHER.index("\n\n") + 1)):
+        watcher = FieldWatcher(fields)
+        stop = next(i for i, c in enumerate(text) if watcher.feed(c))
+        assert stop == end, "Stops once more text cannot change the last field"
+        assert watcher.answer == text[:stop].strip()
+
+    pos = Position(15, 15, MapLevel.GROUND)
+    student = FieldWatcher(STUDENT_FIELDS)
+    student.feed(STUDENT)
+    assert student.captured == {"reasoning": "Wood pile WOOD_003 is adjacent.", "action": "GATHER WOOD_003"}
+    assert parse_llm_response(student.answer, "Alice", pos) == parse_llm_response(STUDENT, "Alice", pos)
+
+    obs = MaroonedEnv(seed=1).reset()["Alice"]
+    teacher = FieldWatcher(TEACHER_FIELDS)
+    teacher.feed(TEACHER)
+    result = parse_teacher_response(teacher.answer, obs, "Alice")
+    assert result["critique"] == CRITIQUE == parse_teacher_response(TEACHER, obs, "Alice")["critique"]
+    assert (result["penalty"], result["action"].action_type, result["valid"]) == (-0.5, ActionType.MOVE_NORTH, False)
+
+    # Without a blank line the CRITIQUE may still grow: keep reading to the end
+    unfinished = FieldWatcher(TEACHER_FIELDS)
+    assert not unfinished.feed(TEACHER.replace("\n\n", "\n"))
+    assert unfinished.captured.keys() == {"valid", "action", "penalty"}
+
+    # A line still being written does not count
+    partial = FieldWatcher(STUDENT_FIELDS)
+    assert not partial.feed("REASONING: x\nACTION: GATHER WOOD_0")
+    assert partial.captured == {"reasoning": "x"} and partial.answer == "REASONING: x\nACTION: GATHER WOOD_0"
+    print("test_watcher_stops_after_required_lines Passed")
+
+def test_stopping_criteria_per_row():
+    tokenizer = CharTokenizer()
+    prompt = tokenizer.encode("<prompt>")
+    rambling = "REASONING: I need to think about this for a long while and then\n"
+    rows = [prompt + tokenizer.encode(STUDENT), prompt + tokenizer.encode(rambling + STUDENT)]
+    criteria = ActionStoppingCriteria(tokenizer, prompt_length=len(prompt))
+
+    # generate(): one token per step, finished rows stop growing
+    stopped_at = [None, None]
+    for step in range(1, max(map(len, rows)) - len(prompt) + 1):
+        input_ids = [row[:len(prompt) + step] for row in rows]
+        flags = criteria(input_ids, None)
+        for i, flag in enumerate(flags):
+            if flag and stopped_at[i] is None:
+                stopped_at[i] = step
+    assert stopped_at[0] == STUDENT.index("\n", STUDENT.index("ACTION")) + 1
+    assert stopped_at[1] == stopped_at[0] + len(rambling), "Each row stops at its own ACTION line"
+    assert criteria.answer(0) == "REASONING: Wood pile WOOD_003 is adjacent.\nACTION: GATHER WOOD_003"
+    assert criteria.stopped == 2
+
+    # Plans wait for the numbered steps and stop at the first line after them
+    plan = "REASONING: wood\nACTION 1: GATHER_NEAREST wood\nACTION 2: GOTO 15 15 GROUND\nThat should do it.\nMore..."
+    plan_criteria = ActionStoppingCriteria(tokenizer, prompt_length=0, plan_steps=10)
+    stop = next(i for i in range(len(plan)) if plan_criteria([tokenizer.encode(plan[:i + 1])])[0])
+    assert plan[stop - 1:stop + 1] == ".\n"
+    actions, error = parse_llm_plan(plan_criteria.answer(), "Alice", Position(15, 15, MapLevel.GROUND))
+    assert not error and [a.action_type for a in actions] == [ActionType.GATHER_NEAREST, ActionType.GOTO]
+
+    # Decoding that rewrites earlier text starts the watcher over
+    watcher = FieldWatcher(STUDENT_FIELDS)
+    watcher.update("REASONING: caf�\n")
+    assert not watcher.update("REASONING: café\nACTION: WAIT")
+    assert watcher.update("REASONING: café\nACTION: WAIT\n") and watcher.captured["reasoning"] == "café"
+    print("test_stopping_criteria_per_row Passed")
+
+def test_teacher_stream_stops_early():
+    tokens = [TEACHER[i:i + 3] for i in range(0, len(TEACHER), 3)]
+    sent = []
+    payloads = []
+
+    async def events():
+        for token in tokens:
+            sent.append(token)
+            chunk = {"choices": [{"delta": {"content": token}}]}
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+            await asyncio.sleep(0)
+        yield b"data: [DONE]\n\n"
+
+    def handler(request):
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events())
+
+    obs = MaroonedEnv(seed=1).reset()["Alice"]
+    with TeacherClient(transport=httpx.MockTransport(handler), stream=True) as client:
+        result = client.validate("REASONING: x\nACTION: MOVING NORTH", obs, "Alice")
+        stats = client.stats
+    assert payloads[0]["stream"] is True
+    assert result["critique"] == CRITIQUE and result["penalty"] == -0.5
+    assert result["teacher_response"] == TEACHER.split("\n\n")[0]
+    assert len(sent) < len(tokens) and stats["early_stops"] == 1, "Reading stopped after CRITIQUE"
+
+    # The same critique as without streaming, so both can share cached verdicts
+    with TeacherClient(transport=httpx.MockTransport(lambda request: httpx.Response(
+            200, json={"choices": [{"message": {"content": TEACHER}}]}))) as client:
+        assert client.validate("REASONING: x\nACTION: MOVING NORTH", obs, "Alice")["critique"] == result["critique"]
+
+    # Replies without the full verdict are read to the end
+    tokens = [TEACHER[:40]]
+    sent.clear()
+    with TeacherClient(transport=httpx.MockTransport(handler), stream=True) as client:
+        result = client.validate("REASONING: x\nACTION: MOVING NORTH", obs, "Alice")
+        assert client.stats["early_stops"] == 0
+    assert result["teacher_response"] == TEACHER[:40].strip()
+    print("test_teacher_stream_stops_early Passed")
+
+if __name__ == "__main__":
+    test_watcher_stops_after_required_lines()
+    test_stopping_criteria_per_row()
+    test_teacher_stream_stops_early()
+    print("All early stop tests PASSED.")
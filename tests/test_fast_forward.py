@@ -0,0 +1,69 @@
+import sys
+sys.path.insert(0, './marooned_env')
+from environment import MaroonedEnv
+from models import Action, ActionType
+
+
+def _wait_actions(env):
+    return {sid: Action(sid, ActionType.WAIT) for sid in env.state.living_sailors}
+
+
+def test_fast_forward_matches_turn_by_turn():
+    fast = MaroonedEnv(seed=11, fast_forward=True)
+    slow = MaroonedEnv(seed=11)
+    fast.reset()
+    slow.reset()
+
+    iterations = 0
+    while not fast.state.game_over:
+        _, fast_rewards, _, _, info = fast.step(_wait_actions(fast))
+        iterations += 1
+
+        turns = info[fast.sailor_names[0]]["turns_elapsed"]
+        slow_rewards = {sid: 0.0 for sid in slow.sailor_names}
+        for _ in range(turns):
+            _, rewards, _, _, _ = slow.step(_wait_actions(slow))
+            for sid, reward in rewards.items():
+                slow_rewards[sid] += reward
+
+        assert fast.state.current_turn == slow.state.current_turn
+        assert fast.state.current_day == slow.state.current_day
+        assert fast.state.current_phase == slow.state.current_phase
+        assert fast.state.living_sailors == slow.state.living_sailors
+        for sid in fast.sailor_names:
+            assert fast.state.sailors[sid].energy == slow.state.sailors[sid].energy
+            assert abs(fast_rewards[sid] - slow_rewards[sid]) < 1e-6
+
+    assert slow.state.game_over and fast.state.winner == slow.state.winner
+    assert iterations < fast.state.current_turn
+    print(f"test_fast_forward_matches_turn_by_turn Passed ({fast.state.current_turn} turns in {iterations} steps)")
+
+
+def test_idle_until_phase():
+    env = MaroonedEnv(seed=3)
+    env.reset()
+    _, _, _, _, info = env.step(_wait_actions(env), idle_until="discussion")
+    assert env.state.current_phase == "discussion"
+    assert info["Alice"]["turns_elapsed"] == 85  # Turn 1 -> turn 86 (first discussion turn)
+    print("test_idle_until_phase Passed")
+
+
+def test_partial_actions_do_not_fast_forward():
+    env = MaroonedEnv(seed=1, fast_forward=True)
+    env.reset()
+    _, _, _, _, info = env.step({"Alice": Action("Alice", ActionType.WAIT)})
+    assert info["Alice"]["turns_elapsed"] == 1, "Bob and the others still have a decision to make"
+    _, _, _, _, info = env.step({})
+    assert info["Alice"]["turns_elapsed"] == 1
+    assert env.state.current_turn == 3
+
+    # Once everyone who acts has sent WAIT, idle turns are skipped
+    _, _, _, _, info = env.step({sid: Action(sid, ActionType.WAIT) for sid in env.agents_to_act()})
+    assert info["Alice"]["turns_elapsed"] > 1
+    print("test_partial_actions_do_not_fast_forward Passed")
+
+
+if __name__ == "__main__":
+    test_fast_forward_matches_turn_by_turn()
+    test_idle_until_phase()
+    test_partial_actions_do_not_fast_forward()
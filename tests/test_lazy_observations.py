@@ -0,0 +1,62 @@
+import sys
+sys.path.insert(0, './marooned_env')
+from environment import MaroonedEnv, LazyObservations
+from models import Action, ActionType
+from config import DeathCause
+
+
+def test_lazy_observations_match_eager():
+    eager = MaroonedEnv(seed=8)
+    lazy = MaroonedEnv(seed=8, lazy_observations=True)
+    eager_obs = eager.reset()
+    lazy_obs = lazy.reset()
+    assert isinstance(lazy_obs, LazyObservations)
+    assert list(lazy_obs) == list(eager_obs)
+
+    moves = {"Alice": Action("Alice", ActionType.MOVE_EAST), "Bob": Action("Bob", ActionType.MOVE_SOUTH)}
+    eager_obs, _, _, _, _ = eager.step(moves)
+    lazy_obs, _, _, _, _ = lazy.step(moves)
+    for sid in eager.sailor_names:
+        assert lazy_obs[sid].to_text() == eager_obs[sid].to_text()
+
+    # Handles that were never read expire once the env moves on
+    stale, _, _, _, _ = lazy.step({})
+    lazy.step({})
+    try:
+        stale["Charlie"]
+        assert False, "Stale observation should not be built"
+    except RuntimeError:
+        pass
+
+    # Handles from a rolled-back branch expire too
+    token = lazy.checkpoint()
+    branch, _, _, _, _ = lazy.step(moves)
+    lazy.rollback(token)
+    try:
+        branch["Alice"]
+        assert False, "Observation of a discarded branch should not be built"
+    except RuntimeError:
+        pass
+    lazy.release(token)
+    print("test_lazy_observations_match_eager Passed")
+
+
+def test_agents_to_act():
+    env = MaroonedEnv(seed=42)
+    env.reset()
+    assert env.agents_to_act() == env.sailor_names
+    assert env.agents_to_act(turn_based=True) == [env.state.get_active_sailor()]
+
+    # During a vote only sailors who have not voted yet need to act
+    env.step({"Alice": Action("Alice", ActionType.CALL_VOTE, vote_target="Bob")})
+    assert env.state.current_vote is not None
+    assert env.agents_to_act() == [sid for sid in env.sailor_names if sid != "Alice"]
+
+    env.state.kill_sailor("Eve", DeathCause.STARVATION)
+    assert "Eve" not in env.agents_to_act()
+    print("test_agents_to_act Passed")
+
+
+if __name__ == "__main__":
+    test_lazy_observations_match_eager()
+    test_agents_to_act()
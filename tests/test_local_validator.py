@@ -0,0 +1,132 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import asyncio
+import httpx
+from environment import MaroonedEnv
+from models import Action
+from config import ActionType, ResourceType
+from local_validator import TieredValidator, local_check
+from teacher_client import TeacherClient
+
+class RecordingTeacher:
+    """Teacher tier double: answers WAIT and records what it was asked"""
+    def __init__(self):
+        self.requests = []
+
+    async def avalidate_batch(self, requests):
+        self.requests.extend(requests)
+        return [{"action": Action(sid, ActionType.WAIT), "penalty": -1.0, "critique": "teacher",
+                 "valid": False, "teacher_response": "VALID: NO"} for _, _, sid, _ in requests]
+
+def test_legal_commands_stay_local():
+    env = MaroonedEnv(seed=4)
+    obs = env.reset()
+    for sid in env.sailor_names:
+        env.state.sailors[sid].add_to_backpack(ResourceType.WOOD, 2)
+        env.state.sailors[sid].add_to_backpack(ResourceType.APPLE, 1)
+    obs, _, _, _, _ = env.step({})
+
+    teacher = RecordingTeacher()
+    validator = TieredValidator(env, client=teacher)
+    count = 0
+    for sid in env.sailor_names:
+        for command in env.legal_commands(sid):
+            result = validator.validate(f"REASONING: because\nACTION: {command}", obs[sid], sid)
+            assert result["tier"] == "local", command
+            assert env.is_legal(sid, result["action"])
+            count += 1
+    assert count > 20 and not teacher.requests
+    assert validator.stats == {"total": count, "local": count, "teacher": 0, "local_rate": 1.0,
+                               "escalated": {"format": 0, "unparsed": 0, "non_canonical": 0, "illegal": 0,
+                                             "unchecked": 0}}
+
+    wait = validator.validate("REASONING: rest\nACTION: WAIT", obs["Alice"], "Alice")
+    move = validator.validate("REASONING: go\n\nACTION: MOVE NORTH 3", obs["Alice"], "Alice")
+    assert wait["penalty"] == 0.0 and move["penalty"] == 0.3
+    assert move["valid"] and move["action"].quantity == 3
+    print("test_legal_commands_stay_local Passed")
+
+def test_everything_else_goes_to_teacher():
+    env = MaroonedEnv(seed=4)
+    obs = env.reset()
+    teacher = RecordingTeacher()
+    validator = TieredValidator(env, client=teacher)
+
+    outputs = [
+        ("ACTION: MOVE NORTH", "format"),                               # No REASONING
+        ("REASONING: x\nACTION: MOVE NORTH\nMESSAGE: hi", "format"),    # Extra line
+        ("REASONING: x\nACTION: MOVING NORTH", "unparsed"),
+        ("REASONING: x\nACTION: move north", "non_canonical"),
+        ("REASONING: x\nACTION: EAT food", "non_canonical"),
+        ("REASONING: x\nACTION: VOTE Bob", "illegal"),                  # No vote open
+        ("REASONING: x\nACTION: MOVE NORTH 50", "illegal"),             # Runs into the map edge
+        ("REASONING: x\nACTION: REASONING: y", "unparsed"),
+        ("REASONING: x\nACTION: WAIT", None),
+    ]
+    results = validator.validate_batch([(text, obs["Alice"], "Alice") for text, _ in outputs])
+    assert [r["tier"] for r in results] == ["teacher"] * 8 + ["local"]
+    assert [request[0] for request in teacher.requests] == [text for text, _ in outputs[:8]]
+    assert all(request[3] == env.legal_commands("Alice") for request in teacher.requests)
+
+    stats = validator.stats
+    assert (stats["local"], stats["teacher"]) == (1, 8) and stats["local_rate"] == 1 / 9
+    assert stats["escalated"] == {"format": 2, "unparsed": 2, "non_canonical": 2, "illegal": 2, "unchecked": 0}
+    for text, reason in outputs:
+        assert local_check(text, obs["Alice"], "Alice", env)[1] == (reason or "")
+    print("test_everything_else_goes_to_teacher Passed")
+
+def test_legality_without_env():
+    env = MaroonedEnv(seed=4)
+    obs = env.reset()
+    assert obs["Alice"].phase == "morning"
+
+    # An explicit legal_commands list decides legality
+    legal = env.legal_commands("Alice")
+    assert local_check("REASONING: x\nACTION: CALL_VOTE", obs["Alice"], "Alice", legal_commands=legal)[1] == ""
+    assert local_check("REASONING: x\nACTION: MOVE NORTH", obs["Alice"], "Alice",
+                       legal_commands=legal)[1] == "illegal"
+
+    # Nothing to decide with: the observation heuristics alone are not trusted
+    teacher = RecordingTeacher()
+    validator = TieredValidator(client=teacher)
+    commands = ["CALL_VOTE", "GATHER WOOD_999", "DEPOSIT wood 5", "EAT apple", "SABOTAGE hull",
+                "CALL_SOS", "GIVE Zed wood 3", "GOTO 99 99"]
+    results = validator.validate_batch([(f"REASONING: x\nACTION: {c}", obs["Alice"], "Alice") for c in commands])
+    assert all(r["tier"] == "teacher" for r in results) and len(teacher.requests) == len(commands)
+    assert validator.stats["escalated"]["unchecked"] == len(commands)
+    print("test_legality_without_env Passed")
+
+def test_async_api_in_running_loop():
+    env = MaroonedEnv(seed=4)
+    obs = env.reset()
+    def handler(request):
+        return httpx.Response(200, json={"choices": [{"message": {
+            "content": "VALID: NO\nACTION: WAIT\nPENALTY: -1.0\nCRITIQUE: Use WAIT."}}]})
+
+    async def run():
+        async with TeacherClient(transport=httpx.MockTransport(handler)) as client:
+            validator = TieredValidator(env, client=client)
+            results = await validator.avalidate_batch([
+                ("REASONING: x\nACTION: WAIT", obs["Alice"], "Alice"),
+                ("REASONING: x\nACTION: wait please", obs["Alice"], "Alice"),
+            ])
+            single = await validator.avalidate("REASONING: x\nACTION: WAIT", obs["Bob"], "Bob")
+            try:
+                validator.validate("REASONING: x\nACTION: wait please", obs["Bob"], "Bob")
+                assert False, "Blocking calls are refused inside a running loop"
+            except RuntimeError:
+                pass
+            return validator, results, single
+
+    validator, results, single = asyncio.run(run())
+    assert [r["tier"] for r in results] == ["local", "teacher"] and single["tier"] == "local"
+    assert results[1]["penalty"] == -1.0
+    assert (validator.stats["local"], validator.stats["teacher"]) == (2, 1), "Refused call is not counted"
+    print("test_async_api_in_running_loop Passed")
+
+if __name__ == "__main__":
+    test_legal_commands_stay_local()
+    test_everything_else_goes_to_teacher()
+    test_legality_without_env()
+    test_async_api_in_running_loop()
+    print("All local validator tests PASSED.")
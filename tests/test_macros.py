@@ -0,0 +1,149 @@
+import sys
+sys.path.insert(0, './marooned_env')
+from environment import MaroonedEnv
+from models import Action
+from config import ActionType, ResourceType, MapLevel, MACRO_INTERRUPT_ENERGY
+from navigation import MOVES
+from macros import macro_interrupt
+from llm_interface import parse_llm_response
+
+def _open_direction(env, sailor_id, tiles):
+    """A move that stays walkable for `tiles` tiles from the sailor's position"""
+    pos = env.state.sailors[sailor_id].position
+    for move, dx, dy in MOVES:
+        path = [env.state.world_map.position(pos.x + dx * i, pos.y + dy * i, pos.level)
+                for i in range(1, tiles + 1)]
+        if all(env.state.world_map.is_walkable(p) for p in path):
+            return move, path[-1]
+    raise AssertionError("No open direction from base camp")
+
+def test_move_macro_matches_single_moves():
+    env = MaroonedEnv(seed=5, macro_interrupts=())
+    env.reset()
+    move, end = _open_direction(env, "Alice", 3)
+
+    _, _, _, _, info = env.step({"Alice": Action("Alice", move, quantity=3)})
+    assert info["Alice"]["success"]
+    assert info["Alice"]["macro"] == {"type": move.value, "status": "running", "turns": 1, "steps_left": 2}
+    assert "Alice" not in env.agents_to_act()
+    assert env.running_macro("Alice")["steps_left"] == 2
+
+    _, _, _, _, info = env.step({})
+    _, _, _, _, info = env.step({})
+    assert info["Alice"]["macro"]["status"] == "done"
+    assert env.running_macro("Alice") is None and "Alice" in env.agents_to_act()
+
+    # Same end state as three single moves
+    single = MaroonedEnv(seed=5)
+    single.reset()
+    for _ in range(3):
+        single.step({"Alice": Action("Alice", move)})
+    assert env.state.sailors["Alice"].position == single.state.sailors["Alice"].position == end
+    assert env.state.sailors["Alice"].energy == single.state.sailors["Alice"].energy
+    assert env.state.current_turn == single.state.current_turn
+    print("test_move_macro_matches_single_moves Passed")
+
+def test_goto_and_gather_nearest():
+    env = MaroonedEnv(seed=5, macro_interrupts=())
+    env.reset()
+    alice = env.state.sailors["Alice"]
+
+    action, error = parse_llm_response("ACTION: GATHER_NEAREST wood", "Alice", alice.position)
+    assert error == "" and action.action_type == ActionType.GATHER_NEAREST
+    assert env.is_legal("Alice", action)
+    env.step({"Alice": action})
+    target = env._macros["Alice"].target_resource_id
+    info = {}
+    while "Alice" in env._macros:
+        _, _, _, _, info = env.step({})
+    assert info["Alice"]["macro"]["status"] == "done"
+    assert env.state.world_map.resources[target].gathered
+    assert any(item.resource_type == ResourceType.WOOD for item in alice.backpack)
+
+    # GOTO back to base camp, at most one turn per tile
+    action, _ = parse_llm_response("ACTION: GOTO 15 15 GROUND", "Alice", alice.position)
+    distance = env.navigation.distance(alice.position, action.target_position)
+    _, _, _, _, info = env.step({"Alice": action})
+    turns = 1
+    while info["Alice"]["macro"]["status"] == "running":
+        _, _, _, _, info = env.step({})
+        turns += 1
+    assert info["Alice"]["macro"]["status"] == "done" and turns == distance
+    assert alice.position.to_tuple() == (15, 15, MapLevel.GROUND)
+
+    # Unplannable macros fail without using a turn's energy
+    energy = alice.energy
+    _, _, _, _, info = env.step({"Alice": Action("Alice", ActionType.GOTO, target_position=alice.position)})
+    assert not info["Alice"]["success"] and info["Alice"]["macro"]["status"] == "failed"
+    assert not env.is_legal("Alice", Action("Alice", ActionType.GATHER_NEAREST,
+                                            resource_type=ResourceType.ANTIDOTE_HERB))
+    _, _, _, _, info = env.step({"Alice": Action("Alice", ActionType.MOVE_NORTH, quantity=50)})
+    assert info["Alice"]["macro"]["status"] == "failed" and info["Alice"]["reason"].startswith("Blocked after")
+    assert alice.position.to_tuple() == (15, 15, MapLevel.GROUND)
+    assert alice.energy == energy
+    print("test_goto_and_gather_nearest Passed")
+
+def test_interrupts_replace_and_rollback():
+    env = MaroonedEnv(seed=5)
+    env.reset()
+    alice = env.state.sailors["Alice"]
+    move, end = _open_direction(env, "Alice", 3)
+
+    # A new action replaces the running macro
+    env.step({"Alice": Action("Alice", move, quantity=3)})
+    _, _, _, _, info = env.step({"Alice": Action("Alice", ActionType.WAIT)})
+    assert info["Alice"]["macro"]["status"] == "replaced" and not env._macros
+
+    # Low energy stops it after the turn that went below the threshold
+    alice.energy = MACRO_INTERRUPT_ENERGY
+    _, _, _, _, info = env.step({"Alice": Action("Alice", move, quantity=3)})
+    assert info["Alice"]["macro"] == {"type": move.value, "status": "interrupted", "turns": 1,
+                                      "steps_left": 2, "reason": "low_energy"}
+    assert "Alice" in env.agents_to_act()
+
+    # Another sailor's SOS
+    alice.energy = 100
+    env.state.sailors["Bob"].energy = 15
+    base = env.state.world_map.position(15, 15, MapLevel.GROUND)
+    _, _, _, _, info = env.step({"Alice": Action("Alice", ActionType.GOTO, target_position=base),
+                                 "Bob": Action("Bob", ActionType.CALL_SOS)})
+    assert info["Alice"]["macro"]["status"] == "interrupted" and info["Alice"]["macro"]["reason"] == "sos"
+
+    # Macros are part of the checkpointed state
+    env.step({"Alice": Action("Alice", ActionType.GOTO, target_position=end)})
+    steps_left = env.running_macro("Alice")["steps_left"]
+    token = env.checkpoint()
+    env.step({})
+    env.rollback(token)
+    assert env.running_macro("Alice")["steps_left"] == steps_left
+
+    # Same boundary as the plan interrupt: at the threshold is fine, below it is not
+    alice.energy = MACRO_INTERRUPT_ENERGY
+    assert macro_interrupt(env.state, "Alice", env._macros["Alice"], ("low_energy",)) is None
+    alice.energy = MACRO_INTERRUPT_ENERGY - 1
+    assert macro_interrupt(env.state, "Alice", env._macros["Alice"], ("low_energy",)) == "low_energy"
+    env.release(token)
+    print("test_interrupts_replace_and_rollback Passed")
+
+def test_macro_started_on_low_energy():
+    env = MaroonedEnv(seed=5)
+    env.reset()
+    alice = env.state.sailors["Alice"]
+    move, end = _open_direction(env, "Alice", 3)
+
+    # Only dropping below the threshold interrupts, not starting below it
+    alice.energy = MACRO_INTERRUPT_ENERGY - 5
+    _, _, _, _, info = env.step({"Alice": Action("Alice", move, quantity=3)})
+    assert info["Alice"]["macro"]["status"] == "running"
+    env.step({})
+    _, _, _, _, info = env.step({})
+    assert info["Alice"]["macro"]["status"] == "done" and info["Alice"]["macro"]["turns"] == 3
+    assert alice.position == end
+    print("test_macro_started_on_low_energy Passed")
+
+if __name__ == "__main__":
+    test_move_macro_matches_single_moves()
+    test_goto_and_gather_nearest()
+    test_interrupts_replace_and_rollback()
+    test_macro_started_on_low_energy()
+    print("All macro tests PASSED.")
@@ -2,6 +2,7 @@ import sys
 sys.path.insert(0, './marooned_env')
 from environment import MaroonedEnv
 from config import MapLevel, MAP_SIZES
+from models import Position
 
 def test_map_shapes():
     env = MaroonedEnv(seed=2025)
@@ -50,9 +51,94 @@ def test_map_boundaries():
             assert tile.walkable, f"Boundary tile not walkable in {level}: ({x},{y})"
     print("All map edge/corner tiles are valid and walkable.")
 
+def test_spatial_index_matches_full_scan():
+    env = MaroonedEnv(seed=7)
+    env.reset()
+    world = env.state.world_map
+
+    def scan_resources(position, radius):
+        return [r.resource_id for r in world.resources.values()
+                if not r.gathered and r.position.distance_to(position) <= radius]
+
+    def scan_poison(position, radius):
+        return [pid for pid, pos in world.poison_tablets.items() if pos.distance_to(position) <= radius]
+
+    # Gather a few resources so the index has to track removals
+    for resource in list(world.resources.values())[::25]:
+        world.mark_gathered(resource)
+
+    for level, (w, h) in MAP_SIZES.items():
+        for y in range(h):
+            for x in range(w):
+                pos = Position(x, y, level)
+                for radius in (0, 1, 5):
+                    got = [r.resource_id for r in world.get_resources_at(pos, radius)]
+                    assert got == scan_resources(pos, radius), f"Resource mismatch at {pos} r={radius}"
+                    assert world.get_poison_at(pos, radius) == scan_poison(pos, radius), f"Poison mismatch at {pos} r={radius}"
+    print("Spatial index queries match full scans.")
+
+def test_transition_table_matches_transition_list():
+    env = MaroonedEnv(seed=42)
+    env.reset()
+    world = env.state.world_map
+    for pos1, pos2 in world.level_transitions:
+        for here, there in [(pos1, pos2), (pos2, pos1)]:
+            transitions = world.get_transitions_at(here)
+            assert transitions, f"No transition found at {here}"
+            assert transitions[0].destination == there
+            assert transitions[0].going_up == (there.level.value > here.level.value)
+            assert world.can_transition_level(here, there.level)
+    assert world.get_transitions_at(Position(1, 1, MapLevel.CAVE)) == ()
+    print("Transition table matches level_transitions.")
+
+def test_interned_positions():
+    env = MaroonedEnv(seed=42)
+    env.reset()
+    world = env.state.world_map
+    a = Position(3, 4, MapLevel.MOUNTAIN)
+    b = world.position(3, 4, MapLevel.MOUNTAIN)
+    assert a == b and hash(a) == hash(b), "Equal positions must hash equal"
+    assert b is world.position(3, 4, MapLevel.MOUNTAIN), "Positions should be interned per map"
+    assert a != Position(3, 4, MapLevel.GROUND)
+    assert a.key == Position.pack(3, 4, MapLevel.MOUNTAIN)
+    assert a.distance_sq_to(Position(6, 8, MapLevel.MOUNTAIN)) == 25
+    assert a.distance_sq_to(Position(3, 4, MapLevel.CAVE)) == float('inf')
+    assert repr(a) == "Position(x=3, y=4, level=<MapLevel.MOUNTAIN: 2>)"
+    try:
+        a.x = 5
+        assert False, "Position should be immutable"
+    except AttributeError:
+        pass
+    print("Interned positions compare, hash and measure correctly.")
+
+def test_terrain_arrays_back_tile_views():
+    env = MaroonedEnv(seed=42)
+    env.reset()
+    world = env.state.world_map
+    for level, (w, h) in MAP_SIZES.items():
+        grid = world.terrain[level]
+        assert grid.types.shape == (h, w) and grid.walkable.shape == (h, w)
+        assert grid.types.dtype.name == "uint8"
+        tile = world.get_tile(Position(2, 1, level))
+        assert tile.terrain_type == grid.terrain_type(2, 1)
+        assert tile.position == Position(2, 1, level)
+        assert world.get_tile(Position(w, 0, level)) is None
+        assert not world.is_walkable(Position(-1, 0, level))
+    # Walkability reads straight from the bitmap
+    ground = world.terrain[MapLevel.GROUND]
+    ground.walkable[3, 2] = False
+    assert not world.is_walkable(Position(2, 3, MapLevel.GROUND))
+    assert not ground[3][2].walkable
+    assert world.is_walkable(Position(3, 2, MapLevel.GROUND))
+    print("Terrain arrays back tile views and walkability.")
+
 if __name__ == "__main__":
     test_map_shapes()
     test_map_all_walkable_at_spawn()
     test_stairs_and_transitions()
     test_map_boundaries()
+    test_spatial_index_matches_full_scan()
+    test_transition_table_matches_transition_list()
+    test_interned_positions()
+    test_terrain_arrays_back_tile_views()
     print("All map structure and integrity tests PASSED.")
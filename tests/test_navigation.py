@@ -0,0 +1,183 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import heapq
+import random
+from environment import MaroonedEnv
+from config import MapLevel, MAP_SIZES, ActionType, ENERGY_COST_WALK
+from models import Action, Position
+from navigation import NavigationService, movement_energy_cost
+from pathfinding import AStarPathfinder
+
+STEP = {
+    ActionType.MOVE_NORTH: (0, -1),
+    ActionType.MOVE_SOUTH: (0, 1),
+    ActionType.MOVE_EAST: (1, 0),
+    ActionType.MOVE_WEST: (-1, 0),
+}
+
+def _follow(world, start, path):
+    x, y = start.x, start.y
+    for action in path:
+        dx, dy = STEP[action]
+        x, y = x + dx, y + dy
+        assert world.is_walkable(Position(x, y, start.level)), f"Path steps onto blocked tile ({x},{y})"
+    return Position(x, y, start.level)
+
+def test_paths_match_astar():
+    env = MaroonedEnv(seed=42)
+    env.reset()
+    world = env.state.world_map
+    # Carve a wall into the ground level so paths have to detour
+    ground = world.terrain[MapLevel.GROUND]
+    ground.walkable[10, 2:28] = False
+    nav = NavigationService(world)
+    astar = AStarPathfinder(env)
+    rng = random.Random(0)
+    for _ in range(60):
+        level = rng.choice(list(MAP_SIZES))
+        w, h = MAP_SIZES[level]
+        start = Position(rng.randrange(w), rng.randrange(h), level)
+        goal = Position(rng.randrange(w), rng.randrange(h), level)
+        if not (world.is_walkable(start) and world.is_walkable(goal)):
+            continue
+        path = nav.path(start, goal)
+        expected = astar.find_path(start, goal, max_distance=500)
+        assert path is not None and expected is not None
+        assert len(path) == len(expected) == nav.distance(start, goal)
+        assert _follow(world, start, path) == goal
+        assert _follow(world, start, expected) == goal
+        if path:
+            assert nav.next_step(start, goal) == path[0]
+    print("test_paths_match_astar Passed")
+
+def test_landmarks_and_base_distance():
+    env = MaroonedEnv(seed=7)
+    env.reset()
+    nav = env.navigation
+    base = nav.base_camp
+    assert nav.landmarks[0] == base
+    for pos1, pos2 in env.state.world_map.level_transitions:
+        assert pos1 in nav.landmarks and pos2 in nav.landmarks
+    assert nav.distance_to_base(base) == 0
+    assert nav.distance_to_base(Position(base.x + 3, base.y - 4, MapLevel.GROUND)) == 7
+    assert nav.distance_to_base(Position(0, 0, MapLevel.CAVE)) is None
+    nav.precompute()
+    assert len(nav._landmark_fields) == len(nav.landmarks)
+    # A new episode gets a new service
+    env.reset()
+    assert env.navigation is not nav
+    print("test_landmarks_and_base_distance Passed")
+
+def test_path_cache_and_unreachable():
+    env = MaroonedEnv(seed=3)
+    env.reset()
+    world = env.state.world_map
+    cave = world.terrain[MapLevel.CAVE]
+    # Wall off the cave's top-left corner
+    cave.walkable[0:3, 3] = False
+    cave.walkable[3, 0:4] = False
+    nav = NavigationService(world, field_cache_size=2, path_cache_size=2)
+    start = Position(10, 10, MapLevel.CAVE)
+    assert nav.path(start, Position(1, 1, MapLevel.CAVE)) is None
+    assert nav.next_step(start, Position(1, 1, MapLevel.CAVE)) is None
+
+    goal = Position(12, 5, MapLevel.CAVE)
+    first = nav.path(start, goal)
+    first.append(ActionType.WAIT)  # Callers get their own copy
+    assert nav.path(start, goal) == first[:-1]
+    assert nav.hits == 1
+    assert nav.path(start, goal, max_length=3) is None
+    for x in range(5):
+        nav.path(start, Position(x, 12, MapLevel.CAVE))
+    assert len(nav._paths) == 2 and len(nav._fields) == 2
+    print("test_path_cache_and_unreachable Passed")
+
+def _climb_moves(env, sailor_id, pos):
+    """Climbs from pos and their energy cost, measured by running the env's handler"""
+    sailor = env.state.sailors[sailor_id]
+    saved = (sailor.position, sailor.energy)
+    moves = []
+    for action in (ActionType.CLIMB_UP, ActionType.CLIMB_DOWN):
+        sailor.position, sailor.energy = pos, 1000
+        if env._execute_action(sailor_id, Action(sailor_id=sailor_id, action_type=action)).get("success"):
+            moves.append((sailor.position, 1000 - sailor.energy))
+    sailor.position, sailor.energy = saved
+    return moves
+
+def _tile_dijkstra(env, sailor_id, start, goal):
+    """Reference: Dijkstra over every tile of every level"""
+    world = env.state.world_map
+    walk = movement_energy_cost(ENERGY_COST_WALK, env.state.is_traitor(sailor_id))
+    best = {start: 0}
+    heap = [(0, 0, start)]
+    counter = 1
+    while heap:
+        cost, _, pos = heapq.heappop(heap)
+        if pos == goal:
+            return cost
+        if cost > best[pos]:
+            continue
+        moves = [(Position(pos.x + dx, pos.y + dy, pos.level), walk) for dx, dy in STEP.values()]
+        if world.get_transitions_at(pos):
+            moves.extend(_climb_moves(env, sailor_id, pos))
+        for nxt, step_cost in moves:
+            if world.is_walkable(nxt) and cost + step_cost < best.get(nxt, float("inf")):
+                best[nxt] = cost + step_cost
+                heapq.heappush(heap, (cost + step_cost, counter, nxt))
+                counter += 1
+    return None
+
+def test_multi_level_routes_are_minimum_energy():
+    env = MaroonedEnv(seed=11)
+    env.reset()
+    nav = env.navigation
+    traitor_id = next(sid for sid in env.sailor_names if env.state.is_traitor(sid))
+    colonist_id = next(sid for sid in env.sailor_names if not env.state.is_traitor(sid))
+    rng = random.Random(1)
+    levels = list(MAP_SIZES)
+    for trial in range(8):
+        sailor_id = traitor_id if trial % 2 else colonist_id
+        is_traitor = env.state.is_traitor(sailor_id)
+        start_level, goal_level = rng.sample(levels, 2)
+        start = Position(rng.randrange(MAP_SIZES[start_level][0]), rng.randrange(MAP_SIZES[start_level][1]), start_level)
+        goal = Position(rng.randrange(MAP_SIZES[goal_level][0]), rng.randrange(MAP_SIZES[goal_level][1]), goal_level)
+
+        route = nav.plan_route(start, goal, is_traitor=is_traitor)
+        assert route is not None, f"No route {start} -> {goal}"
+        assert route.energy_cost == _tile_dijkstra(env, sailor_id, start, goal)
+        assert route.waypoints, "Cross-level route should use a staircase"
+
+        # Executing the route lands on the goal and costs exactly energy_cost
+        sailor = env.state.sailors[sailor_id]
+        sailor.position, sailor.energy = start, 1000
+        for action_type in route.actions:
+            result = env._execute_action(sailor_id, Action(sailor_id=sailor_id, action_type=action_type))
+            assert result.get("success"), f"{action_type} failed: {result}"
+        assert sailor.position == goal
+        assert 1000 - sailor.energy == route.energy_cost
+    print("test_multi_level_routes_are_minimum_energy Passed")
+
+def test_round_trip_affordability():
+    env = MaroonedEnv(seed=11)
+    env.reset()
+    nav = env.navigation
+    cave_stairs = next(p2 for p1, p2 in env.state.world_map.level_transitions if p2.level == MapLevel.CAVE)
+    goal = Position(cave_stairs.x + 4, cave_stairs.y + 2, MapLevel.CAVE)
+    route = nav.plan_route(nav.base_camp, goal, energy=1000)
+    back = nav.plan_route(goal, nav.base_camp)
+    assert route.return_cost == back.energy_cost
+    assert route.can_return
+    total = route.energy_cost + route.return_cost
+    assert nav.plan_route(nav.base_camp, goal, energy=total + 1).can_return
+    # Arriving back with 0 energy is death, so exactly `total` is not enough
+    assert not nav.plan_route(nav.base_camp, goal, energy=total).can_return
+    assert nav.plan_route(nav.base_camp, goal).can_return is None
+    print("test_round_trip_affordability Passed")
+
+if __name__ == "__main__":
+    test_paths_match_astar()
+    test_landmarks_and_base_distance()
+    test_path_cache_and_unreachable()
+    test_multi_level_routes_are_minimum_energy()
+    test_round_trip_affordability()
+    print("All navigation tests PASSED.")
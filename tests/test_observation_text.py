@@ -0,0 +1,121 @@
+import sys
+sys.path.insert(0, './marooned_env')
+from dataclasses import replace
+from environment import MaroonedEnv
+from config import MapLevel, MAP_SIZES, BASE_CAMP_POSITION, ResourceType
+from models import Action, Position, Resource, SpatialView, RESOURCE_GLYPHS, TERRAIN_GLYPHS
+from config import ActionType
+from llm_interface import observation_to_prompt, ACTION_INSTRUCTIONS
+
+def _reference_level_rows(obs, level):
+    """Cell-by-cell scan, the way the static map used to be drawn"""
+    width, height = MAP_SIZES[level]
+    rows = []
+    for y in range(height):
+        row = f"{y:2} "
+        for x in range(width):
+            if any(p.x == x and p.y == y and p.level == level for p in obs.all_poison_positions):
+                row += "☠️"
+                continue
+            res = next((r for r in obs.all_resources
+                        if (r.position.x, r.position.y, r.position.level) == (x, y, level)), None)
+            if res:
+                row += RESOURCE_GLYPHS.get(res.resource_type.value, "❓")
+            elif (x, y) == BASE_CAMP_POSITION[:2] and level == MapLevel.GROUND:
+                row += "🏠"
+            elif obs.get_transitions_at(Position(x, y, level)):
+                row += "⬆️" if obs.get_transitions_at(Position(x, y, level))[0].going_up else "⬇️"
+            else:
+                row += TERRAIN_GLYPHS[level]
+        rows.append(row)
+    return rows
+
+def test_static_map_matches_cell_scan():
+    env = MaroonedEnv(seed=42)
+    obs = env.reset()["Alice"]
+    for level in MAP_SIZES:
+        text = obs.get_static_terrain_map(level)
+        for row in _reference_level_rows(obs, level):
+            assert "\n" + row + "\n" in text, f"Row missing from {level.name} map: {row[:12]}..."
+    print("test_static_map_matches_cell_scan Passed")
+
+def test_static_map_rendered_once_per_episode():
+    env = MaroonedEnv(seed=3)
+    obs = env.reset()
+    alice, bob = obs["Alice"], obs["Bob"]
+    assert alice.static_map_cache is bob.static_map_cache
+    full = alice.get_static_terrain_map()
+    assert bob.get_static_terrain_map() is full, "Second sailor should reuse the cached text"
+    assert set(alice.static_map_cache) == {None, MapLevel.GROUND, MapLevel.MOUNTAIN, MapLevel.CAVE}
+
+    later = env.step({})[0]["Charlie"]
+    assert later.get_static_terrain_map() is full
+
+    # A hand-built observation renders fresh and gets the same text
+    fresh = replace(alice, static_map_cache={})
+    assert fresh.get_static_terrain_map() == full
+
+    # New episode, new cache
+    assert env.reset()["Alice"].static_map_cache is not alice.static_map_cache
+    print("test_static_map_rendered_once_per_episode Passed")
+
+def test_spatial_view_grid_layer_priority():
+    env = MaroonedEnv(seed=42)
+    obs = env.reset()["Alice"]
+    stairs, _ = obs.level_transitions[0]
+    here = Position(stairs.x + 2, stairs.y, stairs.level)
+    wood = Resource("WOOD_X", ResourceType.WOOD, Position(here.x + 1, here.y, here.level))
+    apple = Resource("APPLE_X", ResourceType.APPLE, Position(here.x + 1, here.y, here.level))
+    berry = Resource("BERRY_X", ResourceType.BERRY, Position(here.x, here.y + 1, here.level))
+    view = SpatialView(
+        center_position=here,
+        visible_resources=[wood, apple, berry],
+        visible_sailor_positions={"Bob": Position(here.x, here.y + 1, here.level),
+                                  "Eve": Position(here.x, here.y + 1, here.level)},
+        visible_poison=[Position(here.x + 1, here.y, here.level), Position(here.x, here.y + 1, here.level)],
+    )
+    grid = replace(obs, position=here, spatial_view=view).get_spatial_view_grid()
+    rows = {line[:2].strip(): line[3:] for line in grid.splitlines() if line[:2].strip().isdigit()}
+
+    row = rows[str(here.y)]
+    assert row.count("A ") == 1, "Self marker missing"
+    assert "☠️" in row, "Poison should beat the wood/apple on the same tile"
+    assert "🌲" not in row and "🍎" not in row
+    assert ("⬆️" if obs.get_transitions_at(stairs)[0].going_up else "⬇️") in row
+    below = rows[str(here.y + 1)]
+    assert "B " in below and "E " not in below, "First listed sailor wins, and beats poison/resources"
+    assert "🍓" not in below
+    print("test_spatial_view_grid_layer_priority Passed")
+
+def test_prompt_sections_reused_across_turns_and_sailors():
+    env = MaroonedEnv(seed=42)
+    obs = env.reset()
+    alice, bob = obs["Alice"], obs["Bob"]
+    cache = alice.section_cache
+    assert cache is bob.section_cache
+    prompt = observation_to_prompt(alice)
+    assert prompt == alice.to_text() + "\n" + ACTION_INSTRUCTIONS
+    bob.to_text()
+    assert ("personal_status", "Alice") in cache and ("personal_status", "Bob") in cache
+    ship, evidence = cache["ship_and_inventory"][1], cache["evidence"][1]
+
+    wait = {sid: Action(sailor_id=sid, action_type=ActionType.WAIT) for sid in env.sailor_names}
+    later = env.step(wait)[0]["Alice"]
+    text = later.to_text()
+    assert cache["ship_and_inventory"][1] is ship and cache["evidence"][1] is evidence
+    assert text == replace(later, section_cache={}).to_text(), "Cached sections differ from a fresh render"
+
+    # Only the section whose inputs changed is rendered again
+    env.state.add_to_common_inventory(ResourceType.WOOD, 3)
+    later = env.step(wait)[0]["Alice"]
+    text = later.to_text()
+    assert cache["ship_and_inventory"][1] is not ship and cache["evidence"][1] is evidence
+    assert text == replace(later, section_cache={}).to_text()
+    print("test_prompt_sections_reused_across_turns_and_sailors Passed")
+
+if __name__ == "__main__":
+    test_static_map_matches_cell_scan()
+    test_static_map_rendered_once_per_episode()
+    test_spatial_view_grid_layer_priority()
+    test_prompt_sections_reused_across_turns_and_sailors()
+    print("All observation text tests PASSED.")
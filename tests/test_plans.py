@@ -0,0 +1,118 @@
+import sys
+sys.path.insert(0, './marooned_env')
+from environment import MaroonedEnv
+from models import Action
+from config import ActionType, ResourceType, ENERGY_SOS_THRESHOLD
+from llm_interface import parse_llm_plan
+
+PLAN = """REASONING: Fetch wood and bring it back.
+ACTION 1: GATHER_NEAREST wood
+ACTION 2: GOTO 15 15 GROUND
+ACTION 3: DEPOSIT wood 1
+"""
+
+def _run_plan(env, sailor_id):
+    """Step with no decisions until the sailor's plan ends, return (turns, last info)"""
+    turns, info = 0, {}
+    while env.running_plan(sailor_id) is not None:
+        assert sailor_id not in env.agents_to_act()
+        _, _, _, _, info = env.step({})
+        turns += 1
+    return turns, info[sailor_id]
+
+def test_plan_runs_without_decisions():
+    env = MaroonedEnv(seed=5, macro_interrupts=(), plan_interrupts=())
+    env.reset()
+    alice = env.state.sailors["Alice"]
+
+    actions, error = parse_llm_plan(PLAN, "Alice", alice.position)
+    assert error == "" and [a.action_type for a in actions] == [
+        ActionType.GATHER_NEAREST, ActionType.GOTO, ActionType.DEPOSIT_ITEM]
+    report = env.set_plan("Alice", actions)
+    assert report == {"status": "running", "size": 3, "turns": 0, "steps_left": 3}
+    assert "Alice" not in env.agents_to_act()
+
+    wood_before = env.state.get_common_inventory_count(ResourceType.WOOD)
+    turns, info = _run_plan(env, "Alice")
+    assert info["plan"] == {"status": "done", "size": 3, "turns": turns, "steps_left": 0}
+    assert turns > 3, "Macro steps take several turns of the plan"
+    assert env.state.get_common_inventory_count(ResourceType.WOOD) == wood_before + 1
+    assert "Alice" in env.agents_to_act()
+    print("test_plan_runs_without_decisions Passed")
+
+def test_plan_cut_short():
+    env = MaroonedEnv(seed=5)
+    env.reset()
+    alice = env.state.sailors["Alice"]
+    wait = Action("Alice", ActionType.WAIT)
+
+    # A vote being called
+    env.set_plan("Alice", [wait] * 5)
+    _, _, _, _, info = env.step({"Bob": Action("Bob", ActionType.CALL_VOTE, vote_target="Charlie")})
+    assert info["Alice"]["plan"] == {"status": "interrupted", "size": 5, "turns": 1,
+                                     "steps_left": 4, "reason": "vote_called"}
+    assert "Alice" in env.agents_to_act()
+
+    # Low energy
+    env.reset()
+    alice = env.state.sailors["Alice"]
+    env.set_plan("Alice", [wait] * 5)
+    alice.energy = ENERGY_SOS_THRESHOLD - 3  # WAIT regenerates 2
+    _, _, _, _, info = env.step({})
+    assert info["Alice"]["plan"]["reason"] == "low_energy"
+
+    # A plan made on low energy (e.g. to walk home and eat) is not cut for it
+    env.set_plan("Alice", [wait] * 3)
+    assert alice.energy < ENERGY_SOS_THRESHOLD
+    _, _, _, _, info = env.step({})
+    assert info["Alice"]["plan"]["status"] == "running" and info["Alice"]["plan"]["turns"] == 1
+
+    # Someone else gathers the planned target (and the queued step is then illegal)
+    env.reset()
+    env.step({"Bob": Action("Bob", ActionType.GATHER_NEAREST, resource_type=ResourceType.WOOD)})
+    target = env._macros["Bob"].target_resource_id
+    env.set_plan("Alice", [Action("Alice", ActionType.WAIT)] * 3
+                 + [Action("Alice", ActionType.GATHER_RESOURCE, target_resource_id=target)])
+    turns, info = _run_plan(env, "Alice")
+    assert info["plan"]["status"] == "interrupted" and info["plan"]["reason"] == "target_gone"
+    assert env.state.world_map.resources[target].gathered
+
+    # Queued steps are checked when their turn comes
+    env.reset()
+    env.set_plan("Alice", [Action("Alice", ActionType.DEPOSIT_ITEM, resource_type=ResourceType.WOOD), wait])
+    _, _, _, _, info = env.step({})
+    assert not info["Alice"]["success"]
+    assert info["Alice"]["plan"]["status"] == "failed" and info["Alice"]["plan"]["reason"] == "illegal_step"
+    print("test_plan_cut_short Passed")
+
+def test_plan_replaced_and_rollback():
+    env = MaroonedEnv(seed=5)
+    env.reset()
+    actions, _ = parse_llm_plan(PLAN, "Alice", env.state.sailors["Alice"].position)
+    env.set_plan("Alice", actions)
+    env.step({})
+
+    token = env.checkpoint()
+    plan, macro = env.running_plan("Alice"), env.running_macro("Alice")
+    env.step({})
+    env.rollback(token)
+    assert env.running_plan("Alice") == plan and env.running_macro("Alice") == macro
+    env.release(token)
+
+    # A decision in step() replaces the plan and its running macro
+    _, _, _, _, info = env.step({"Alice": Action("Alice", ActionType.WAIT)})
+    assert info["Alice"]["plan"]["status"] == "replaced" and info["Alice"]["macro"]["status"] == "replaced"
+    assert env.running_plan("Alice") is None and env.running_macro("Alice") is None
+
+    try:
+        env.set_plan("Alice", [Action("Bob", ActionType.WAIT)])
+        assert False, "Plans only hold the sailor's own actions"
+    except ValueError:
+        pass
+    print("test_plan_replaced_and_rollback Passed")
+
+if __name__ == "__main__":
+    test_plan_runs_without_decisions()
+    test_plan_cut_short()
+    test_plan_replaced_and_rollback()
+    print("All plan tests PASSED.")
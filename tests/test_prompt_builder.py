@@ -0,0 +1,133 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import re
+from environment import MaroonedEnv
+from config import EvidenceType, PROMPT_SECTION_PRIORITIES, PROMPT_PRIORITY_REQUIRED
+from models import Action
+from config import ActionType
+from llm_interface import observation_to_prompt, observation_to_prompt_parts, get_system_prompt
+from prompt_builder import PromptBuilder, PrefixTokenCache
+
+class WordTokenizer:
+    """Words and newlines as tokens, so per-section counts add up exactly"""
+    def __init__(self):
+        self.vocab = {}
+    def encode(self, text):
+        return [self.vocab.setdefault(word, len(self.vocab)) for word in re.findall(r"\S+|\n", text)]
+
+class ChatTokenizer(WordTokenizer):
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=False):
+        text = "".join(f"<|{m['role']}|>\n{m['content']}<|end|>\n" for m in messages)
+        return text + ("<|assistant|>\n" if add_generation_prompt else "")
+
+def _count(text):
+    return len(WordTokenizer().encode(text))
+
+def _long_game_observation():
+    env = MaroonedEnv(seed=42)
+    env.reset()
+    state = env.state
+    for i in range(40):
+        state.evidence_log.add_evidence(1, EvidenceType.POISON_COLLECTION, f"Seen near poison #{i}", ["Bob"])
+    for resource in list(state.world_map.resources.values())[:60]:
+        state.shared_knowledge.report_resource(resource, "Alice")
+    return env.step({})[0]["Alice"]
+
+def test_unlimited_budget_matches_prompt():
+    env = MaroonedEnv(seed=42)
+    obs = env.reset()["Alice"]
+    builder = PromptBuilder(WordTokenizer(), budget=100000)
+    prompt = builder.build(obs)
+    assert prompt.text == observation_to_prompt(obs)
+    assert prompt.total_tokens == _count(prompt.text) == sum(prompt.section_tokens.values())
+    assert not prompt.cut_sections
+
+    # Section counts are cached: a second build tokenizes nothing new
+    misses = builder.misses
+    builder.build(obs)
+    assert builder.misses == misses
+    print("test_unlimited_budget_matches_prompt Passed")
+
+def test_budget_cuts_lowest_priority_first():
+    obs = _long_game_observation()
+    builder = PromptBuilder(WordTokenizer(), budget=100000)
+    full = builder.build(obs)
+    required = sum(n for name, n in full.section_tokens.items()
+                   if PROMPT_SECTION_PRIORITIES[name] >= PROMPT_PRIORITY_REQUIRED)
+    for budget in (full.total_tokens - 50, full.total_tokens // 2, required + 40):
+        prompt = builder.build(obs, budget)
+        assert prompt.total_tokens <= budget and _count(prompt.text) == prompt.total_tokens
+        for name, n in prompt.section_tokens.items():
+            if name not in prompt.cut_sections:
+                assert n == full.section_tokens[name], f"{name} changed without being cut"
+        # A section is only cut once every lower-priority section has been cut
+        for name in prompt.cut_sections:
+            for other, n in full.section_tokens.items():
+                if n and PROMPT_SECTION_PRIORITIES[other] < PROMPT_SECTION_PRIORITIES[name]:
+                    assert other in prompt.cut_sections, f"{name} cut before {other}"
+    assert builder.build(obs, full.total_tokens - 50).cut_sections == {"island_map": "summarized"}
+    print("test_budget_cuts_lowest_priority_first Passed")
+
+def test_summaries_and_impossible_budget():
+    obs = _long_game_observation()
+    builder = PromptBuilder(WordTokenizer(), budget=100000)
+    full = builder.build(obs)
+    # Drop the island map, then summarize the growing shared resource list
+    budget = full.total_tokens - full.section_tokens["island_map"] - 20
+    prompt = builder.build(obs, budget)
+    assert prompt.cut_sections == {"island_map": "dropped", "shared_knowledge": "summarized"}
+    assert "SHARED RESOURCE MAP (discovered by team)" in prompt.text
+    assert "SHARED RESOURCE MAP (reported by team)" not in prompt.text
+    assert "YOUR TURN - CHOOSE ONE ACTION" in prompt.text
+
+    try:
+        builder.build(obs, 50)
+        assert False, "Budget below the required sections should raise"
+    except ValueError:
+        pass
+    print("test_summaries_and_impossible_budget Passed")
+
+def test_stable_prefix_layout():
+    env = MaroonedEnv(seed=42)
+    obs = env.reset()
+    parts = observation_to_prompt_parts(obs["Alice"])
+    assert parts.prefix.startswith("━") and "ISLAND MAP KNOWLEDGE" in parts.prefix
+    assert parts.suffix.startswith("=" * 80) and "ISLAND MAP KNOWLEDGE" not in parts.suffix
+    assert observation_to_prompt(obs["Alice"], stable_prefix=True) == parts.text
+    # Same content as the default layout, only reordered
+    assert sorted(parts.text.split()) == sorted(observation_to_prompt(obs["Alice"]).split())
+
+    wait = {sid: Action(sailor_id=sid, action_type=ActionType.WAIT) for sid in env.sailor_names}
+    later = env.step(wait)[0]
+    for sid in env.sailor_names:
+        assert observation_to_prompt_parts(later[sid]).prefix == parts.prefix
+    assert get_system_prompt("teacher") != get_system_prompt("colonist") == get_system_prompt("unknown")
+    print("test_stable_prefix_layout Passed")
+
+def test_prefix_tokens_cached_per_role():
+    for tokenizer in (WordTokenizer(), ChatTokenizer()):
+        env = MaroonedEnv(seed=7)
+        obs = env.reset()
+        prefixes = PrefixTokenCache(tokenizer)
+        wait = {sid: Action(sailor_id=sid, action_type=ActionType.WAIT) for sid in env.sailor_names}
+        for _ in range(3):
+            for sid in env.sailor_names:
+                role = env.state.sailors[sid].role.value
+                tokens = prefixes.encode(role, obs[sid])
+                prefix, suffix = prefixes.split(role, obs[sid])
+                assert tokens.input_ids == tokenizer.encode(prefix + suffix)
+                assert tokens.input_ids[:tokens.prefix_length] == tokenizer.encode(prefix)
+            obs = env.step(wait)[0]
+        assert prefixes.misses == 2, "One prefix per role per episode"
+
+        prefixes.encode("colonist", env.reset(seed=8)["Alice"])
+        assert prefixes.misses == 3, "A new island is a new prefix"
+    print("test_prefix_tokens_cached_per_role Passed")
+
+if __name__ == "__main__":
+    test_unlimited_budget_matches_prompt()
+    test_budget_cuts_lowest_priority_first()
+    test_summaries_and_impossible_budget()
+    test_stable_prefix_layout()
+    test_prefix_tokens_cached_per_role()
+    print("All prompt builder tests PASSED.")
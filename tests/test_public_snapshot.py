@@ -0,0 +1,105 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import pickle
+from environment import MaroonedEnv
+from models import Action
+from config import ActionType, ResourceType, EvidenceType
+
+def _wait_all(env):
+    return {sid: Action(sailor_id=sid, action_type=ActionType.WAIT) for sid in env.sailor_names}
+
+def test_public_part_is_shared_per_step():
+    env = MaroonedEnv(seed=42)
+    obs = env.reset()
+    alice, bob = obs["Alice"], obs["Bob"]
+    assert alice.public is bob.public
+    assert alice.evidence_log is bob.evidence_log
+    assert alice.common_inventory is bob.common_inventory
+    assert isinstance(alice.all_resources, tuple) and isinstance(alice.voting_history, tuple)
+
+    # Shared between sailors, so changing one sailor's copy is refused
+    for mapping in (alice.all_sailors_energy, alice.all_sailors_poison_state,
+                    alice.shared_knowledge.discovered_resources, alice.ship_progress.components):
+        try:
+            mapping["Alice"] = 0
+            assert False, "Shared observation data should be read-only"
+        except TypeError:
+            pass
+    assert bob.all_sailors_energy["Alice"] == 100
+
+    obs2, _, _, _, _ = env.step(_wait_all(env))
+    assert obs2["Alice"].public is not alice.public
+    # Per-episode static data is reused across steps
+    assert obs2["Alice"].all_resources is alice.all_resources
+    assert obs2["Alice"].level_transitions is alice.level_transitions
+    print("test_public_part_is_shared_per_step Passed")
+
+def test_stored_observations_do_not_change():
+    env = MaroonedEnv(seed=7)
+    obs = env.reset()
+    kept = obs["Alice"]
+    text = kept.to_text()
+
+    state = env.state
+    state.add_to_common_inventory(ResourceType.WOOD, 5)
+    state.evidence_log.add_evidence(1, EvidenceType.POISON_COLLECTION, "Saw poison", ["Bob"], strength=80)
+    state.sailors["Alice"].add_to_backpack(ResourceType.APPLE, 2)
+    state.ship_progress.total_percentage = 40
+    state.shared_knowledge.report_resource(next(iter(state.world_map.resources.values())), "Alice")
+    env.step({"Alice": Action(sailor_id="Alice", action_type=ActionType.SEND_MESSAGE, message_content="hello")})
+
+    assert kept.to_text() == text, "Stored observation changed after the game moved on"
+    assert kept.evidence_log.all_evidence == () and kept.ship_progress.total_percentage == 0
+    assert not kept.shared_knowledge.discovered_resources
+
+    # Observations survive a pickle round trip (replay buffers, worker processes)
+    restored = pickle.loads(pickle.dumps(kept))
+    assert restored.to_text() == text
+    print("test_stored_observations_do_not_change Passed")
+
+def test_frozen_logs_follow_rollback():
+    env = MaroonedEnv(seed=3)
+    env.reset()
+    log = env.state.evidence_log
+    log.add_evidence(1, EvidenceType.POISON_COLLECTION, "first", ["Bob"])
+    env.step(_wait_all(env))
+
+    token = env.checkpoint()
+    env.state.journal.touch_length(log.all_evidence)
+    env.state.journal.touch(log)
+    log.add_evidence(1, EvidenceType.POISON_COLLECTION, "branch A", ["Charlie"])
+    obs, _, _, _, _ = env.step(_wait_all(env))
+    assert [e.description for e in obs["Alice"].evidence_log.all_evidence] == ["first", "branch A"]
+
+    env.rollback(token)
+    env.state.journal.touch_length(log.all_evidence)
+    env.state.journal.touch(log)
+    log.add_evidence(1, EvidenceType.POISON_COLLECTION, "branch B", ["Diana"])
+    obs, _, _, _, _ = env.step(_wait_all(env))
+    assert [e.description for e in obs["Alice"].evidence_log.all_evidence] == ["first", "branch B"]
+    env.release(token)
+    print("test_frozen_logs_follow_rollback Passed")
+
+def test_observations_after_rollback_match_fresh_env():
+    env = MaroonedEnv(seed=5)
+    env.reset()
+    fresh = MaroonedEnv(seed=5)
+    fresh.reset()
+
+    token = env.checkpoint()
+    env._generate_observation("Alice")  # Cache the snapshot of this state
+    env.step({"Alice": Action(sailor_id="Alice", action_type=ActionType.MOVE_NORTH)})
+    env._generate_observation("Alice")
+    env.rollback(token)
+
+    for sid in env.sailor_names:
+        assert env._generate_observation(sid).to_text() == fresh._generate_observation(sid).to_text()
+    env.release(token)
+    print("test_observations_after_rollback_match_fresh_env Passed")
+
+if __name__ == "__main__":
+    test_public_part_is_shared_per_step()
+    test_stored_observations_do_not_change()
+    test_frozen_logs_follow_rollback()
+    test_observations_after_rollback_match_fresh_env()
+    print("All public snapshot tests PASSED.")
@@ -0,0 +1,119 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import json
+import tempfile
+from dataclasses import replace
+import httpx
+import llm_interface
+from environment import MaroonedEnv
+from models import Action
+from config import ActionType, ENERGY_SOS_THRESHOLD
+from llm_interface import teacher_validate_student_output
+from teacher_cache import TeacherVerdictCache, normalize_student_output
+from teacher_client import TeacherClient
+
+VERDICT = "VALID: NO\nACTION: MOVE NORTH\nPENALTY: -0.5\nCRITIQUE: Use MOVE NORTH not MOVING NORTH."
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"choices": [{"message": {"content": VERDICT}}]}
+
+def test_key_ignores_reasoning_and_turn():
+    env = MaroonedEnv(seed=2)
+    obs = env.reset()
+    cache = TeacherVerdictCache(directory=None)
+
+    key = cache.key("REASONING: wood is north\nACTION: MOVING NORTH", obs["Alice"])
+    assert key == cache.key("REASONING:  I want the   forest\n\nACTION:   MOVING NORTH  ", obs["Alice"])
+    assert key != cache.key("REASONING: wood is north\nACTION: MOVE NORTH", obs["Alice"])
+    assert key != cache.key("ACTION: MOVING NORTH", obs["Alice"]), "A missing REASONING line is judged"
+    assert key != cache.key("REASONING: x\nACTION: MOVING NORTH", obs["Alice"], legal_actions=["MOVE NORTH"])
+    assert normalize_student_output("REASONING: a b\nACTION:  WAIT ") == "REASONING: ...\nACTION: WAIT"
+
+    # A later turn in the same situation hits; moving changes the key
+    obs2, _, _, _, _ = env.step({"Alice": Action("Alice", ActionType.WAIT)})
+    assert obs2["Alice"].turn != obs["Alice"].turn
+    assert cache.key("REASONING: x\nACTION: MOVING NORTH", obs2["Alice"]) == key
+    obs3, _, _, _, _ = env.step({"Alice": Action("Alice", ActionType.MOVE_NORTH)})
+    assert cache.key("REASONING: x\nACTION: MOVING NORTH", obs3["Alice"]) != key
+
+    # Energy is bucketed only above the SOS threshold, where CALL_SOS stops being legal
+    at_threshold = replace(obs["Alice"], energy=ENERGY_SOS_THRESHOLD)
+    assert cache.key("REASONING: x\nACTION: CALL_SOS", at_threshold) != \
+        cache.key("REASONING: x\nACTION: CALL_SOS", replace(obs["Alice"], energy=ENERGY_SOS_THRESHOLD + 5))
+    assert cache.key("REASONING: x\nACTION: CALL_SOS", replace(obs["Alice"], energy=ENERGY_SOS_THRESHOLD + 1)) == \
+        cache.key("REASONING: x\nACTION: CALL_SOS", replace(obs["Alice"], energy=ENERGY_SOS_THRESHOLD + 5))
+    print("test_key_ignores_reasoning_and_turn Passed")
+
+def test_cache_in_front_of_teacher():
+    env = MaroonedEnv(seed=2)
+    obs = env.reset()
+    cache = TeacherVerdictCache(directory=None)
+    calls = []
+
+    def fake_post(url, json, timeout):
+        calls.append(json)
+        return FakeResponse()
+
+    post = llm_interface.requests.post
+    llm_interface.requests.post = fake_post
+    try:
+        first = teacher_validate_student_output("REASONING: a\nACTION: MOVING NORTH", obs["Alice"], "Alice", cache=cache)
+        again = teacher_validate_student_output("REASONING: b\nACTION: MOVING NORTH", obs["Alice"], "Alice", cache=cache)
+    finally:
+        llm_interface.requests.post = post
+
+    assert len(calls) == 1
+    assert again["teacher_response"] == first["teacher_response"] == VERDICT
+    assert again["action"].action_type == ActionType.MOVE_NORTH and again["penalty"] == -0.5
+    stats = cache.stats
+    assert (stats["lookups"], stats["memory_hits"], stats["misses"]) == (2, 1, 1)
+    assert stats["hit_rate"] == 0.5 and stats["saved_seconds"] >= 0.0
+
+    # The batched client shares the cache; a hit is re-parsed for the asking sailor
+    requests_seen = []
+    def handler(request):
+        requests_seen.append(json.loads(request.content))
+        return httpx.Response(200, json={"choices": [{"message": {"content": VERDICT}}]})
+    with TeacherClient(transport=httpx.MockTransport(handler), model=llm_interface.TEACHER_MODEL_NAME,
+                       cache=cache) as client:
+        results = client.validate_batch([("REASONING: c\nACTION: MOVING NORTH", obs["Alice"], "Alice")])
+    assert not requests_seen and results[0]["action"].sailor_id == "Alice"
+    assert cache.stats["memory_hits"] == 2
+    print("test_cache_in_front_of_teacher Passed")
+
+def test_disk_tier_survives_restart():
+    env = MaroonedEnv(seed=2)
+    obs = env.reset()
+    student = "REASONING: x\nACTION: GATHER wood"
+    with tempfile.TemporaryDirectory() as directory:
+        with TeacherVerdictCache(directory=directory) as cache:
+            cache.put(cache.key(student, obs["Bob"]), VERDICT, latency=2.0)
+
+        with TeacherVerdictCache(directory=directory, max_entries=1) as cache:
+            key = cache.key(student, obs["Bob"])
+            assert cache.get(key) == VERDICT
+            assert cache.get(key) == VERDICT
+            stats = cache.stats
+            assert (stats["disk_hits"], stats["memory_hits"], stats["saved_seconds"]) == (1, 1, 4.0)
+
+            # Failed teacher calls are not cached
+            def unreachable(request):
+                raise httpx.ConnectError("connection refused", request=request)
+            with TeacherClient(transport=httpx.MockTransport(unreachable), cache=cache) as client:
+                result = client.validate("REASONING: y\nACTION: CHECK_STATUS", obs["Bob"], "Bob")
+            assert result["action"].action_type == ActionType.WAIT
+            assert cache.stats["disk_entries"] == 1 and cache.stats["misses"] == 1
+
+            cache.clear()
+            assert cache.get(key) is None and cache.stats["disk_entries"] == 0
+    print("test_disk_tier_survives_restart Passed")
+
+if __name__ == "__main__":
+    test_key_ignores_reasoning_and_turn()
+    test_cache_in_front_of_teacher()
+    test_disk_tier_survives_restart()
+    print("All teacher cache tests PASSED.")
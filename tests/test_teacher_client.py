@@ -0,0 +1,98 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import asyncio
+import json
+import random
+import httpx
+from environment import MaroonedEnv
+from config import ActionType
+from llm_interface import build_teacher_payload, TEACHER_ERROR_RESPONSE, TEACHER_UNAVAILABLE_RESPONSE
+from teacher_client import TeacherClient
+
+def _teacher_reply(text):
+    return httpx.Response(200, json={"choices": [{"message": {"content": text}}]})
+
+class FakeTeacher:
+    """vLLM stand-in: answers after a random delay, with the request number as the penalty"""
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.payloads = []
+
+    async def __call__(self, request):
+        payload = json.loads(request.content)
+        self.payloads.append(payload)
+        number = int(payload["messages"][1]["content"].split("#")[1].split()[0])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.rng.random() * 0.01)
+        self.in_flight -= 1
+        return _teacher_reply(f"VALID: YES\nACTION: MOVE NORTH\nPENALTY: {number / 100}\nCRITIQUE: ok #{number}")
+
+def _requests(count):
+    env = MaroonedEnv(seed=3)
+    observations = env.reset()
+    sailors = env.sailor_names
+    return [(f"REASONING: #{i} go\nACTION: MOVE NORTH", observations[sailors[i % 5]], sailors[i % 5])
+            for i in range(count)]
+
+def test_batch_results_in_request_order():
+    teacher = FakeTeacher(seed=1)
+    requests = _requests(12)
+    with TeacherClient(max_concurrency=4, transport=httpx.MockTransport(teacher)) as client:
+        results = client.validate_batch(requests)
+        pooled = client._client
+        client.validate_batch(requests[:2])
+        assert client._client is pooled, "Connections are reused between batches"
+
+    assert [r["penalty"] for r in results] == [i / 100 for i in range(12)]
+    assert all(r["valid"] and r["action"].action_type == ActionType.MOVE_NORTH for r in results)
+    assert [r["action"].sailor_id for r in results] == [sid for _, _, sid in requests]
+    assert teacher.max_in_flight == 4, "Requests overlap up to the concurrency limit"
+
+    # Same request body as teacher_validate_student_output()
+    response, obs, _ = requests[0]
+    assert teacher.payloads[0] == build_teacher_payload(response, obs)
+    print("test_batch_results_in_request_order Passed")
+
+def test_async_api_and_legal_actions():
+    teacher = FakeTeacher()
+    response, obs, sid = _requests(1)[0]
+
+    async def run():
+        async with TeacherClient(transport=httpx.MockTransport(teacher)) as client:
+            single = await client.avalidate(response, obs, sid, legal_actions=["MOVE NORTH", "WAIT"])
+            batch = await client.avalidate_batch([(response, obs, sid)])
+            try:
+                client.validate_batch([(response, obs, sid)])
+                assert False, "Blocking calls are refused inside a running loop"
+            except RuntimeError:
+                pass
+        return single, batch
+
+    single, batch = asyncio.run(run())
+    assert single["penalty"] == batch[0]["penalty"] == 0.0
+    assert "LEGAL ACTIONS" in teacher.payloads[0]["messages"][1]["content"]
+    assert "LEGAL ACTIONS" not in teacher.payloads[1]["messages"][1]["content"]
+    print("test_async_api_and_legal_actions Passed")
+
+def test_errors_fall_back_to_wait():
+    def failing(request):
+        if "#0" in json.loads(request.content)["messages"][1]["content"]:
+            return httpx.Response(500, text="overloaded")
+        raise httpx.ConnectError("connection refused", request=request)
+
+    with TeacherClient(transport=httpx.MockTransport(failing)) as client:
+        server_error, unreachable = client.validate_batch(_requests(2))
+    assert server_error["teacher_response"] == TEACHER_ERROR_RESPONSE
+    assert unreachable["teacher_response"] == TEACHER_UNAVAILABLE_RESPONSE
+    for result in (server_error, unreachable):
+        assert result["action"].action_type == ActionType.WAIT and result["penalty"] == -2.0
+    print("test_errors_fall_back_to_wait Passed")
+
+if __name__ == "__main__":
+    test_batch_results_in_request_order()
+    test_async_api_and_legal_actions()
+    test_errors_fall_back_to_wait()
+    print("All teacher client tests PASSED.")
@@ -0,0 +1,156 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import asyncio
+import json
+import time
+import httpx
+from environment import MaroonedEnv
+from config import ActionType
+from llm_interface import TEACHER_ERROR_RESPONSE, TEACHER_UNAVAILABLE_RESPONSE
+from teacher_client import TeacherClient
+
+URLS = [f"http://teacher-{name}/v1/chat/completions" for name in "abc"]
+
+class Replicas:
+    """Several vLLM stand-ins behind one transport, told apart by host"""
+    def __init__(self, delay=0.002):
+        self.delay = delay
+        self.down = set()
+        self.garbled = set()
+        self.slow_next = False
+        self.served = {}
+        self.in_flight = {}
+        self.max_in_flight = {}
+
+    async def __call__(self, request):
+        host = request.url.host
+        if host in self.down:
+            raise httpx.ConnectError("connection refused", request=request)
+        delay, self.slow_next = (2.0 if self.slow_next else self.delay), False
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.max_in_flight[host] = max(self.max_in_flight.get(host, 0), self.in_flight[host])
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight[host] -= 1
+        self.served[host] = self.served.get(host, 0) + 1
+        if host in self.garbled:
+            return httpx.Response(200, json={"error": {"message": "model overloaded"}})
+        return httpx.Response(200, json={"choices": [{"message": {
+            "content": f"VALID: YES\nACTION: MOVE NORTH\nPENALTY: 0.3\nCRITIQUE: {host}"}}]})
+
+def _requests(count):
+    env = MaroonedEnv(seed=3)
+    observations = env.reset()
+    return [(f"REASONING: #{i} go\nACTION: MOVE NORTH", observations["Alice"], "Alice") for i in range(count)]
+
+def test_least_outstanding_balancing():
+    replicas = Replicas()
+    with TeacherClient(url=URLS, max_concurrency=6, transport=httpx.MockTransport(replicas)) as client:
+        results = client.validate_batch(_requests(12))
+        stats = client.stats
+
+    assert all(r["valid"] and r["penalty"] == 0.3 for r in results)
+    assert sorted(replicas.served) == ["teacher-a", "teacher-b", "teacher-c"]
+    assert all(count == 2 for count in replicas.max_in_flight.values()), "6 in flight spread over 3 replicas"
+    for endpoint in stats["endpoints"]:
+        assert endpoint["state"] == "up" and endpoint["outstanding"] == 0 and endpoint["failures"] == 0
+        assert sum(endpoint["histogram"].values()) == endpoint["requests"] == 4
+        assert 0 < endpoint["p50"] <= endpoint["p95"] < 0.1
+    assert (stats["hedges"], stats["fallbacks"]) == (0, 0)
+    print("test_least_outstanding_balancing Passed")
+
+def test_hedge_beats_slow_replica():
+    replicas = Replicas()
+    with TeacherClient(url=URLS[:2], transport=httpx.MockTransport(replicas)) as client:
+        for request in _requests(40):
+            client.validate(*request)
+        assert all(e.hedge_delay() is not None for e in client.endpoints), "p95 known after warm-up"
+        hedges = client.hedges
+
+        replicas.slow_next = True
+        started = time.perf_counter()
+        result = client.validate(*_requests(1)[0])
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 1.0, "The duplicate answered; the slow call was not waited for"
+        assert result["valid"] and result["action"].action_type == ActionType.MOVE_NORTH
+        assert client.hedges == hedges + 1 and client.hedge_wins >= 1
+        assert all(e.outstanding == 0 for e in client.endpoints), "The slow call was cancelled"
+    print("test_hedge_beats_slow_replica Passed")
+
+def test_breaker_routes_around_down_replica():
+    replicas = Replicas(delay=0.0)
+    replicas.down.add("teacher-b")
+    with TeacherClient(url=URLS[:2], breaker_failures=2, transport=httpx.MockTransport(replicas)) as client:
+        a, b = client.endpoints
+        results = client.validate_batch(_requests(8))
+        assert all(r["valid"] for r in results), "Failed requests were retried on the healthy replica"
+        # The whole batch went out before the first failure came back: half of it to b
+        assert b.state == "down" and b.failures == b.requests == 4
+        client.validate_batch(_requests(4))
+        assert b.requests == 4 and replicas.served["teacher-a"] == 12, "No traffic to a down replica"
+
+        # Every replica down: local rules settle what they can, the rest get WAIT at once
+        replicas.down.add("teacher-a")
+        client.validate_batch(_requests(4))
+        assert a.state == "down" and a.requests == 16
+        env = MaroonedEnv(seed=3)
+        obs = env.reset()
+        legal_commands = ["WAIT", "CALL_VOTE"]
+        legal, unclear = client.validate_batch([
+            ("REASONING: x\nACTION: CALL_VOTE", obs["Bob"], "Bob", legal_commands),
+            ("REASONING: x\nACTION: MOVE NORTH", obs["Bob"], "Bob", legal_commands),
+        ])
+        assert a.requests == 16, "Nothing was sent"
+        assert legal["tier"] == "fallback" and legal["action"].action_type == ActionType.CALL_VOTE
+        assert unclear["teacher_response"] == TEACHER_UNAVAILABLE_RESPONSE and unclear["penalty"] == -2.0
+
+        # Without legal actions nothing decides legality: WAIT even for a canonical command
+        for command in ("CALL_VOTE", "SABOTAGE hull", "GATHER WOOD_999"):
+            result = client.validate(f"REASONING: x\nACTION: {command}", obs["Bob"], "Bob")
+            assert "tier" not in result and not result["valid"]
+            assert result["teacher_response"] == TEACHER_UNAVAILABLE_RESPONSE
+        assert client.stats["fallbacks"] == 9
+
+        # After the cooldown one trial request decides; a success brings the replica back
+        replicas.down.clear()
+        b.down_since -= b.breaker_cooldown
+        assert b.state == "trial"
+        result = client.validate(*_requests(1)[0])
+        assert result["critique"].endswith("teacher-b") and b.state == "up"
+    print("test_breaker_routes_around_down_replica Passed")
+
+def test_malformed_reply_fails_over():
+    replicas = Replicas(delay=0.0)
+    replicas.garbled.add("teacher-b")
+    with TeacherClient(url=URLS[:2], breaker_failures=2, transport=httpx.MockTransport(replicas)) as client:
+        a, b = client.endpoints
+        results = client.validate_batch(_requests(8))
+        assert all(r["valid"] and r["critique"] == "teacher-a" for r in results), "Retried on the healthy replica"
+        assert b.state == "down" and b.failures == b.requests == 4
+        assert a.failures == 0 and client.stats["fallbacks"] == 0
+
+    # No endpoint with a usable reply: the batch still finishes, with the error fallback
+    with TeacherClient(url=URLS[1], local_fallback=False, transport=httpx.MockTransport(replicas)) as client:
+        results = client.validate_batch(_requests(2))
+        assert client.endpoints[0].failures == 2 and client.stats["fallbacks"] == 2
+    assert all(r["teacher_response"] == TEACHER_ERROR_RESPONSE and r["penalty"] == -2.0 for r in results)
+
+    # A bad line in a streamed reply counts the same way
+    def stream_handler(request):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"},
+                              content=b"data: {\"choices\": [\n\n")
+    with TeacherClient(url=URLS[0], local_fallback=False, stream=True,
+                       transport=httpx.MockTransport(stream_handler)) as client:
+        result = client.validate(*_requests(1)[0])
+        assert client.endpoints[0].failures == 1
+    assert result["teacher_response"] == TEACHER_ERROR_RESPONSE
+    print("test_malformed_reply_fails_over Passed")
+
+if __name__ == "__main__":
+    test_least_outstanding_balancing()
+    test_hedge_beats_slow_replica()
+    test_breaker_routes_around_down_replica()
+    test_malformed_reply_fails_over()
+    print("All teacher endpoint tests PASSED.")
@@ -0,0 +1,120 @@
+import sys
+sys.path.insert(0, './marooned_env')
+import random
+import numpy as np
+from environment import MaroonedEnv
+from models import Action
+from config import ActionType, ResourceType, DeathCause, BASE_CAMP_POSITION, MAX_ENERGY
+from tensor_encoder import ObservationEncoder, PLANE_CHANNELS, CHANNEL_INDEX, SCALAR_FEATURES
+
+FEATURE = {name: i for i, name in enumerate(SCALAR_FEATURES)}
+ACTIONS = [ActionType.MOVE_NORTH, ActionType.MOVE_SOUTH, ActionType.MOVE_EAST, ActionType.MOVE_WEST,
+           ActionType.CLIMB_UP, ActionType.CLIMB_DOWN, ActionType.GATHER_RESOURCE, ActionType.WAIT]
+
+def _random_actions(env, rng):
+    actions = {}
+    for sid, sailor in env.state.sailors.items():
+        action = Action(sailor_id=sid, action_type=rng.choice(ACTIONS))
+        here = env.state.world_map.get_resources_at(sailor.position)
+        if here:
+            action.target_resource_id = here[0].resource_id
+        actions[sid] = action
+    return actions
+
+def test_shapes_and_named_features():
+    env = MaroonedEnv(seed=42)
+    obs = env.reset()
+    encoder = ObservationEncoder()
+    alice = obs["Alice"]
+    arrays = encoder.encode(alice)
+    assert arrays["planes"].shape == (3, len(PLANE_CHANNELS), 30, 30) and arrays["planes"].dtype == np.float32
+    assert arrays["scalars"].shape == (len(SCALAR_FEATURES),)
+
+    planes, scalars = arrays["planes"], arrays["scalars"]
+    ground = 0
+    bx, by, _ = BASE_CAMP_POSITION
+    assert planes[ground, CHANNEL_INDEX["base_camp"], by, bx] == 1
+    assert planes[ground, CHANNEL_INDEX["self"], alice.position.y, alice.position.x] == 1
+    assert planes[:, CHANNEL_INDEX["self"]].sum() == 1
+    # Smaller levels are zero-padded
+    assert planes[1, CHANNEL_INDEX["walkable"], 10:, :].sum() == 0
+    assert scalars[FEATURE["energy"]] == alice.energy / MAX_ENERGY
+    assert scalars[FEATURE["poison_healthy"]] == 1 and scalars[FEATURE["phase_morning"]] == 1
+    for resource in alice.spatial_view.visible_resources:
+        pos = resource.position
+        assert planes[ground, CHANNEL_INDEX[f"resource_{resource.resource_type.value}"], pos.y, pos.x] > 0
+
+    env.state.sailors["Alice"].add_to_backpack(ResourceType.WOOD, 3)
+    scalars = encoder.encode_state(env.state, ["Alice"])["scalars"][0]
+    assert scalars[FEATURE["backpack_wood"]] == 3
+    print("test_shapes_and_named_features Passed")
+
+def test_state_encoding_matches_observations():
+    encoder = ObservationEncoder()
+    for seed in (5, 17):
+        env = MaroonedEnv(seed=seed)
+        obs = env.reset()
+        rng = random.Random(seed)
+        for _ in range(120):
+            obs = env.step(_random_actions(env, rng))[0]
+            batch = encoder.encode_state(env.state, env.sailor_names)
+            single = encoder.encode_many(obs[sid] for sid in env.sailor_names)
+            assert np.array_equal(batch["planes"], single["planes"])
+            assert np.array_equal(batch["scalars"], single["scalars"])
+            if env.state.game_over:
+                break
+    print("test_state_encoding_matches_observations Passed")
+
+def test_dead_sailors_and_static_cache():
+    env = MaroonedEnv(seed=3)
+    env.reset()
+    encoder = ObservationEncoder()
+    first = encoder.encode_state(env.state)
+    static = encoder._static[1]
+    env.step({})
+    encoder.encode_state(env.state)
+    assert encoder._static[1] is static, "Static planes are built once per episode"
+
+    env.state.kill_sailor("Bob", DeathCause.STARVATION)
+    row = env.sailor_names.index("Bob")
+    dead = encoder.encode_state(env.state)
+    assert not dead["planes"][row].any()
+    assert dead["scalars"][row, FEATURE["poison_dead"]] == 1
+    assert dead["scalars"][0, FEATURE[f"sailor{row}_alive"]] == 0
+    assert first["scalars"][0, FEATURE[f"sailor{row}_alive"]] == 1
+    obs = env.step({})[0]
+    single = encoder.encode_many(obs[sid] for sid in env.sailor_names)
+    assert np.array_equal(single["planes"], encoder.encode_state(env.state)["planes"])
+
+    both = encoder.encode_states([env.state, env.state])
+    assert both["planes"].shape[:2] == (2, 5) and both["scalars"].shape == (2, 5, len(SCALAR_FEATURES))
+    print("test_dead_sailors_and_static_cache Passed")
+
+def test_poison_tablet_counted_once():
+    env = MaroonedEnv(seed=42)
+    env.reset()
+    encoder = ObservationEncoder()
+    world = env.state.world_map
+    poison_id, pos = next(iter(world.poison_tablets.items()))
+    traitor = next(sid for sid in env.sailor_names if env.state.is_traitor(sid))
+    env.state.sailors[traitor].position = pos
+    channel = CHANNEL_INDEX["resource_poison_tablet"]
+    row = env.sailor_names.index(traitor)
+
+    planes = encoder.encode_state(env.state)["planes"][row]
+    assert planes[:, channel, pos.y, pos.x].sum() == 1
+
+    action = Action(sailor_id=traitor, action_type=ActionType.GATHER_RESOURCE, target_resource_id=poison_id)
+    obs = env.step({traitor: action})[0]
+    assert world.resources[poison_id].gathered
+    planes = encoder.encode_state(env.state)["planes"][row]
+    assert planes[:, channel, pos.y, pos.x].sum() == 0, "Gathered tablets leave the plane"
+    assert np.array_equal(encoder.encode(obs[traitor])["planes"], planes)
+    print("test_poison_tablet_counted_once Passed")
+
+if __name__ == "__main__":
+    test_shapes_and_named_features()
+    test_state_encoding_matches_observations()
+    test_dead_sailors_and_static_cache()
+    test_poison_tablet_counted_once()
+    print("All tensor encoder tests PASSED.")